@@ -28,6 +28,7 @@ import payu.subcommands
 from payu.logger import setup_logger
 import payu.subcommands.args as arg_templates
 from payu.telemetry import write_queued_job_file
+from payu import profiling
 import payu.errors as errors
 
 # Default configuration
@@ -44,6 +45,10 @@ def parse():
     if '--stacktrace' in sys.argv:
         arg_count = arg_count - 1
 
+    # filter out --profile-payu when counting argument numbers
+    if '--profile-payu' in sys.argv:
+        arg_count = arg_count - 1
+
     # filter out --log-level {CHOICE} when counting argument numbers
     if '--log-level' in sys.argv:
         arg_count = arg_count - 2
@@ -64,15 +69,20 @@ def parse():
     # We pop --stacktrace and --log_level here so they will not be propagated to runcmd() in subcommands
     stacktrace = args.pop('stacktrace', False)
     log_level = args.pop('log_level', None)
+    profile = args.pop('profile_payu', False)
 
     # Override the STACKTRACE and LOG_LEVEL environment variables if flags are provided
     if log_level:
         os.environ['PAYU_LOG_LEVEL'] = str(log_level)
     if stacktrace:
         os.environ['PAYU_STACKTRACE'] = str(stacktrace)
+    # Profile any submitted jobs as well
+    if profile:
+        os.environ[profiling.PROFILE_ENV] = '1'
     
         
-    _execute_command(run_cmd, stacktrace=stacktrace, log_level=log_level, **args)
+    _execute_command(run_cmd, stacktrace=stacktrace, log_level=log_level,
+                     profile=profile, **args)
 
 
 def generate_parser(is_interactive=False):
@@ -100,9 +110,11 @@ def generate_parser(is_interactive=False):
         # It will be extracted in the parse() and not propagated to subcommand's runcmd()
         cmd_parser.add_argument(*arg_templates.stacktrace['flags'], **arg_templates.stacktrace['parameters'])
         cmd_parser.add_argument(*arg_templates.log_level['flags'], **arg_templates.log_level['parameters'])
+        cmd_parser.add_argument(*arg_templates.profile_payu['flags'], **arg_templates.profile_payu['parameters'])
 
         for arg in cmd.arguments:
-            if '--stacktrace' in arg['flags'] or '--log-level' in arg['flags']:
+            if ('--stacktrace' in arg['flags'] or '--log-level' in arg['flags']
+                    or '--profile-payu' in arg['flags']):
                 continue
             cmd_parser.add_argument(*arg['flags'], **arg['parameters'])
 
@@ -133,7 +145,8 @@ def get_model_type(model_type, config):
 
 def set_env_vars(init_run=None, n_runs=None, lab_path=None, dir_path=None,
                  reproduce=False, force=False, force_prune_restarts=False,
-                 sync_restarts=False, sync_ignore_last=False):
+                 sync_restarts=False, sync_ignore_last=False,
+                 sync_verify=False):
     """Construct the environment variables used by payu for resubmissions."""
     payu_env_vars = {}
 
@@ -190,6 +203,9 @@ def set_env_vars(init_run=None, n_runs=None, lab_path=None, dir_path=None,
     if sync_ignore_last:
         payu_env_vars['PAYU_SYNC_IGNORE_LAST'] = sync_ignore_last
 
+    if sync_verify:
+        payu_env_vars['PAYU_SYNC_VERIFY'] = sync_verify
+
     if force_prune_restarts:
         payu_env_vars['PAYU_FORCE_PRUNE_RESTARTS'] = force_prune_restarts
 
@@ -204,6 +220,8 @@ def set_env_vars(init_run=None, n_runs=None, lab_path=None, dir_path=None,
         payu_env_vars['PAYU_STACKTRACE'] = os.environ.get('PAYU_STACKTRACE')
     if os.environ.get('PAYU_LOG_LEVEL'):
         payu_env_vars['PAYU_LOG_LEVEL'] = os.environ.get('PAYU_LOG_LEVEL')
+    if os.environ.get(profiling.PROFILE_ENV):
+        payu_env_vars[profiling.PROFILE_ENV] = os.environ.get(profiling.PROFILE_ENV)
 
     return payu_env_vars
 
@@ -311,17 +329,23 @@ def set_stacktrace_runscript(stacktrace=None):
         )
         return False
 
-def _execute_command(func, stacktrace=None, log_level=None, **args):
+def _execute_command(func, stacktrace=None, log_level=None, profile=None,
+                     **args):
     """Execute a payu command with error handling and logging.
     Sets up logging, captures warnings through the logging system,
     and catches exceptions to provide clean error messages.
+    If profiling is enabled, the command is run with cProfile.
     """
     set_logger_runscript(log_level)
     stacktrace = set_stacktrace_runscript(stacktrace)
 
     try: 
         # Pass arguments to the command as dictionary
-        func(**args)
+        if profiling.is_profile_enabled(profile):
+            command = func.__module__.rsplit('.', 1)[-1].removesuffix('_cmd')
+            profiling.run_profiled(func, command, **args)
+        else:
+            func(**args)
     except errors.PayuError as e:
         # Show stacktrace when enabled.
         logging.exception(e, exc_info=stacktrace)
@@ -360,7 +384,8 @@ def _parse_runscript(cmd_name):
     parser = argparse.ArgumentParser(**cmd.parameters)
 
     # Add global flags to each command
-    for arg in [arg_templates.stacktrace, arg_templates.log_level]:
+    for arg in [arg_templates.stacktrace, arg_templates.log_level,
+                arg_templates.profile_payu]:
         parser.add_argument(*arg['flags'], **arg['parameters'])
 
     for arg in cmd.arguments:
@@ -369,5 +394,7 @@ def _parse_runscript(cmd_name):
     args = vars(parser.parse_args())
     log_level = args.pop('log_level', 'INFO')
     stacktrace = args.pop('stacktrace', False)
+    profile = args.pop('profile_payu', False)
 
-    _execute_command(cmd.runscript, stacktrace=stacktrace, log_level=log_level, **args)
\ No newline at end of file
+    _execute_command(cmd.runscript, stacktrace=stacktrace, log_level=log_level,
+                     profile=profile, **args)
\ No newline at end of file
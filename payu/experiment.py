@@ -31,6 +31,8 @@ from packaging import version
 # Local
 import payu
 from payu import envmod
+from payu import iostats
+from payu import profiling
 from payu.fsops import make_symlink, read_config, movetree
 from payu.fsops import list_sorted_archive_dirs
 from payu.fsops import run_script_command
@@ -40,11 +42,14 @@ from payu.schedulers import index as scheduler_index, DEFAULT_SCHEDULER_CONFIG
 from payu.models import index as model_index
 from payu.runlog import Runlog
 from payu.manifest import Manifest
+from payu.restart_index import RestartIndex
 from payu.calendar import parse_date_offset
 from payu.sync import SyncToRemoteArchive
+from payu.status import index_scheduler_logs
 from payu.metadata import Metadata
 import payu.telemetry as telemetry
 from payu.git_utils import get_git_repository
+from payu.trace import Tracer, traced
 import payu.errors as errors
 
 # Setup logger
@@ -58,14 +63,18 @@ core_modules = ['python', 'payu']
 default_restart_freq = 5
 
 
-def timeit(time_name):
+def timeit(time_name, stage=None):
     """Decorator to time a function and store the elapsed time in seconds
-    to the timings dictionary in the class"""
+    to the timings dictionary in the class, trace it as a span and account
+    its I/O as a stage. The stage name defaults to the function name"""
     def decorator(func):
         @wraps(func)
         def wrapper(self, *args, **kwargs):
             start_time = time.perf_counter()
-            result = func(self, *args, **kwargs)
+            stage_name = stage or func.__name__
+            with self.tracer.span(stage_name), \
+                    iostats.account(self.io_stats, stage_name):
+                result = func(self, *args, **kwargs)
             elapsed_time = time.perf_counter() - start_time
             self.timings[time_name] = elapsed_time
             return result
@@ -122,12 +131,17 @@ class Experiment(object):
         # TODO: Move to run/collate/sweep?
         self.set_expt_pathnames()
         self.set_counters()
+        profiling.set_output_dir(self.archive_path, self.counter)
 
         for model in self.models:
             model.set_input_paths()
 
         self.set_output_paths()
 
+        # Cache of parsed restart datetimes in the archive
+        self.restart_index = RestartIndex(self.archive_path,
+                                          self.model.model_type)
+
         if parent_info is None:
             parent_info = {}
 
@@ -179,6 +193,10 @@ class Experiment(object):
         self.scheduler = scheduler_index[self.scheduler_name]()
         self.job_file = None
 
+        # Per-file collation sizes and timings
+        self.collate_files = {}
+        self.collate_watchers = []
+
     def _get_parent_branch_time(self):
         """Get the parent experiment model time based on the prior restart path, if available."""
         if self.prior_restart_path is None:
@@ -217,10 +235,13 @@ class Experiment(object):
 
 
     def init_timings(self):
-        """Initialize an timings dictionary with the current time."""
+        """Initialize an timings dictionary with the current time,
+        a tracer for the stages of the run, and I/O totals of each stage."""
         self.timings = {
             "payu_start_time": datetime.datetime.now(),
         }
+        self.tracer = Tracer()
+        self.io_stats = {}
 
     def init_models(self):
 
@@ -314,6 +335,7 @@ class Experiment(object):
         resource.setrlimit(resource.RLIMIT_STACK,
                            (stacksize, resource.RLIM_INFINITY))
 
+    @traced()
     def setup_modules(self):
         """Setup modules and get paths added to $PATH by user-modules"""
         envmod.setup()
@@ -329,6 +351,7 @@ class Experiment(object):
         self.user_modules_paths = paths
         self.loaded_user_modules = [] if loaded_mods is None else loaded_mods
 
+    @traced()
     def load_modules(self):
         # Scheduler
         sched_modname = self.config.get('scheduler', 'pbs')
@@ -514,13 +537,14 @@ class Experiment(object):
             )
 
         # Setup the payu run job file
-        telemetry.setup_run_job_file(
-            file_path=self.job_file,
-            scheduler=self.scheduler,
-            metadata=self.metadata,
-            extra_info=self.setup_run_info(),
-            timings=self.timings,
-        )
+        with self.tracer.span("setup_run_job_file"):
+            telemetry.setup_run_job_file(
+                file_path=self.job_file,
+                scheduler=self.scheduler,
+                metadata=self.metadata,
+                extra_info=self.setup_run_info(),
+                timings=self.timings,
+            )
 
         # Confirm that no output path already exists
         if os.path.exists(self.output_path):
@@ -560,24 +584,38 @@ class Experiment(object):
 
         # Set up executable paths - first search through paths added by modules
         self.setup_modules()
-        for model in self.models:
-            model.setup_executable_paths()
+        with self.tracer.span("setup_executable_paths"):
+            for model in self.models:
+                model.setup_executable_paths()
 
         # Set up all file manifests
-        self.manifest.setup()
+        with self.tracer.span("manifest_setup"), \
+                iostats.account(self.io_stats, "manifest"):
+            self.manifest.setup()
 
         for model in self.models:
-            model.setup()
+            with self.tracer.span(f"{model.name}.setup", category="model"):
+                model.setup()
 
         # Call the macro-model setup
         if len(self.models) > 1:
-            self.model.setup()
+            with self.tracer.span(f"{self.model.name}.setup",
+                                  category="model"):
+                self.model.setup()
 
-        self.manifest.check_manifests()
+        with self.tracer.span("check_manifests"), \
+                iostats.account(self.io_stats, "manifest"):
+            start_time = time.perf_counter()
+            self.manifest.check_manifests()
+            self.timings["payu_check_manifests_duration_seconds"] = (
+                time.perf_counter() - start_time
+            )
 
         # Copy manifests to work directory so they archived on completion
         manifest_path = os.path.join(self.work_path, 'manifests')
-        self.manifest.copy_manifests(manifest_path)
+        with self.tracer.span("copy_manifests"), \
+                iostats.account(self.io_stats, "manifest"):
+            self.manifest.copy_manifests(manifest_path)
 
         setup_script = self.userscripts.get('setup')
         if setup_script:
@@ -749,15 +787,27 @@ class Experiment(object):
         # NOTE: This may not be necessary, since env seems to be getting
         # correctly updated.  Need to look into this.
         print(cmd)
+
+        # Collate closed output tile sets while the model is running
+        self.start_collate_watchers()
+
         runcmd_start_time = time.perf_counter()
-        if env:
-            # TODO: Replace with mpirun -x flag inputs
-            proc = sp.Popen(shlex.split(cmd), stdout=f_out, stderr=f_err,
-                            env=os.environ.copy())
-            proc.wait()
-            rc = proc.returncode
-        else:
-            rc = sp.call(shlex.split(cmd), stdout=f_out, stderr=f_err)
+        try:
+            with self.tracer.span("model_run", category="model"):
+                if env:
+                    # TODO: Replace with mpirun -x flag inputs
+                    proc = sp.Popen(shlex.split(cmd), stdout=f_out,
+                                    stderr=f_err, env=os.environ.copy())
+                    proc.wait()
+                    rc = proc.returncode
+                else:
+                    rc = sp.call(shlex.split(cmd), stdout=f_out,
+                                 stderr=f_err)
+        finally:
+            self.stop_collate_watchers()
+        # The model has finished, so output collated while it was running
+        # can be checked against the final tiles
+        self.finalize_collate_watchers()
         f_out.close()
         f_err.close()
 
@@ -835,6 +885,45 @@ class Experiment(object):
         if run_script:
             self.run_userscript(run_script, 'run')
 
+    def start_collate_watchers(self):
+        """Start collating model output while the model is running, for
+        models that support streaming collation, if enabled"""
+        self.collate_watchers = []
+        for model in self.models:
+            try:
+                watcher = model.collate_watcher()
+            except Exception as e:
+                warnings.warn("Unable to start streaming collation for "
+                              f"{model.name}: {e}")
+                continue
+            if watcher is not None:
+                watcher.start()
+                self.collate_watchers.append(watcher)
+
+    def stop_collate_watchers(self):
+        """Stop any streaming collation"""
+        for watcher in self.collate_watchers:
+            watcher.stop()
+
+    def finalize_collate_watchers(self):
+        """Keep output collated while the model was running, once the model
+        has finished, and record the collated files"""
+        for watcher in self.collate_watchers:
+            watcher.finalize()
+            self.collate_files.update(watcher.collate_files)
+
+    def stream_collation_complete(self):
+        """Return True if all model output was collated while the model
+        was running, so no collation job is required"""
+        collate_config = self.config.get('collate', {})
+        if (not self.collate_watchers
+                or len(self.collate_watchers) != len(self.models)
+                or collate_config.get('restart', False)):
+            return False
+
+        return not any(watcher.has_uncollated_output()
+                       for watcher in self.collate_watchers)
+
     def setup_run_info(self):
         """Return a dictionary with initial run state information"""
         return {
@@ -856,10 +945,15 @@ class Experiment(object):
 
     def model_run_info(self):
         """Return a dictionary with run state information after model run"""
-        return {
+        info = {
             'payu_model_run_status': self.run_job_status,
         }
+        if self.collate_files:
+            # Files collated while the model was running
+            info['collate_files'] = self.collate_files
+        return info
 
+    @traced()
     def get_model_restart_datetimes(self):
         """Return dictionary of current and previous restart datetimes
         for the model. Catches any exceptions raised"""
@@ -867,10 +961,10 @@ class Experiment(object):
         prior_restart_path = self.prior_restart_path
         datetimes = {}
         try:
-            restart_dt = self.model.get_restart_datetime(restart_path)
+            restart_dt = self.get_restart_datetime(restart_path)
             datetimes = {'model_finish_time': restart_dt}
             if prior_restart_path is not None:
-                prior_restart_dt = self.model.get_restart_datetime(
+                prior_restart_dt = self.get_restart_datetime(
                     prior_restart_path
                 )
                 datetimes['model_start_time'] = prior_restart_dt
@@ -878,8 +972,17 @@ class Experiment(object):
             # Ignore if model does not support parsing restart datetimes
             # or if there was error during file parsing
             pass
+        self.restart_index.save()
         return datetimes
 
+    def get_restart_datetime(self, restart_path):
+        """Return the model datetime of a restart directory. Datetimes of
+        restarts in the archive are cached in the restart index, so restart
+        files are only parsed once"""
+        return self.restart_index.get_datetime(
+            restart_path, self.model.get_restart_datetime
+        )
+
     def get_model_cur_expt_time(self):
         return self.model.get_cur_expt_time()
 
@@ -917,17 +1020,21 @@ class Experiment(object):
         os.makedirs(self.restart_path, exist_ok=True)
 
         for model in self.models:
-            model.archive()
+            with self.tracer.span(f"{model.name}.archive", category="model"):
+                model.archive()
 
         # Postprocess the model suite
         if len(self.models) > 1:
-            self.model.archive()
+            with self.tracer.span(f"{self.model.name}.archive",
+                                  category="model"):
+                self.model.archive()
 
         # Double-check that the run path does not exist
         if os.path.exists(self.output_path):
             raise errors.PayuRuntimeError('output path already exists')
 
-        movetree(self.work_path, self.output_path)
+        with self.tracer.span("movetree"):
+            movetree(self.work_path, self.output_path)
 
         # Remove any outdated restart files
         try:
@@ -937,12 +1044,14 @@ class Experiment(object):
             warnings.warn(f"Skipping pruning restarts due to error: {e}")
             restarts_to_prune = []
 
-        for restart in restarts_to_prune:
-            restart_path = os.path.join(self.archive_path, restart)
-            # Only delete real directories; ignore symbolic restart links
-            if (os.path.isdir(restart_path) and
-                    not os.path.islink(restart_path)):
-                shutil.rmtree(restart_path)
+        with self.tracer.span("prune_restarts",
+                              n_restarts=len(restarts_to_prune)):
+            for restart in restarts_to_prune:
+                restart_path = os.path.join(self.archive_path, restart)
+                # Only delete real directories; ignore symbolic restart links
+                if (os.path.isdir(restart_path) and
+                        not os.path.islink(restart_path)):
+                    shutil.rmtree(restart_path)
 
         # Ensure dynamic library support for subsequent python calls
         ld_libpaths = os.environ.get('LD_LIBRARY_PATH', None)
@@ -958,22 +1067,31 @@ class Experiment(object):
             self.run_userscript(archive_script, 'archive')
     
         # Record model restart datetimes and output volume in telemetry
+        with self.tracer.span("get_size"):
+            output_volume_gb = get_size(self.output_path)
+            restart_volume_gb = get_size(self.restart_path)
         telemetry.update_run_job_file(
             file_path=self.job_file,
             model_restart_datetimes=self.get_model_restart_datetimes(),
-            output_volume_gb=get_size(self.output_path),
-            restart_volume_gb=get_size(self.restart_path),
+            output_volume_gb=output_volume_gb,
+            restart_volume_gb=restart_volume_gb,
         )
 
         collate_config = self.config.get('collate', {})
         collating = collate_config.get('enable', True)
+        if collating and self.stream_collation_complete():
+            print('payu: all output was collated while the model was '
+                  'running, skipping collation job.')
+            collating = False
+
         if collating:
             cmd = '{python} {payu} collate -i {expt}'.format(
                 python=sys.executable,
                 payu=self.payu_path,
                 expt=self.counter
             )
-            sp.check_call(shlex.split(cmd))
+            with self.tracer.span("submit_collate"):
+                sp.check_call(shlex.split(cmd))
 
         if self.config.get('hpctoolkit', False):
             cmd = '{python} {payu} profile -i {expt}'.format(
@@ -1001,7 +1119,8 @@ class Experiment(object):
 
         full_mapping_collate_dict = {}
         for model in self.models:
-            mapping_collate_dict = model.collate()
+            with self.tracer.span(f"{model.name}.collate", category="model"):
+                mapping_collate_dict = model.collate()
             if mapping_collate_dict is not None:
                 full_mapping_collate_dict.update(mapping_collate_dict)
 
@@ -1009,11 +1128,13 @@ class Experiment(object):
         # This is used to determine the job file path
         self.set_counters(keep_run_number=True)
 
-        # Write the full_mapping_collate_dict to job file in
+        # Write the full_mapping_collate_dict and per-file collation info
+        # to job file in
         # archive/payu_jobs/{latest_run_number}/collate/{job_id}-gadi-pbs.json
         telemetry.update_job_file(
             file_path=self.get_job_file(type='collate'),
-            data={"collate_mapping": full_mapping_collate_dict}
+            data={"collate_mapping": full_mapping_collate_dict,
+                  "collate_files": self.collate_files}
         )
 
     def profile(self):
@@ -1057,8 +1178,35 @@ class Experiment(object):
 
             sp.check_call(shlex.split(cmd))
 
-    @timeit("payu_sync_duration_seconds")
     def sync(self):
+        """Sync the archive to the remote archive, and record the transfers
+        and I/O of the sync in the sync job file"""
+        remote_archive = self.sync_archive()
+
+        # Record per-path transfer times and bytes, and the I/O once the
+        # sync stage has finished, in the sync job file in
+        # archive/payu_jobs/{current_run_number}/sync/{job_id}.json
+        sync_infos = (list(remote_archive.sync_paths.values())
+                      + list(remote_archive.sync_batches.values()))
+        transferred_bytes = [info['transferred_bytes'] for info in sync_infos
+                             if info['transferred_bytes'] is not None]
+        telemetry.update_job_file(
+            file_path=self.get_job_file(type='sync'),
+            data={"sync_paths": remote_archive.sync_paths,
+                  "sync_skipped_paths": remote_archive.skipped_paths,
+                  "sync_resumed_paths": remote_archive.resumed_paths,
+                  "sync_batches": remote_archive.sync_batches,
+                  "sync_verification": remote_archive.verification,
+                  "sync_workers": remote_archive.workers,
+                  "sync_transferred_bytes": sum(transferred_bytes),
+                  "io_stats": {"sync": self.io_stats.get("sync", {})}},
+            timings=self.timings,
+        )
+
+    @timeit("payu_sync_duration_seconds", stage="sync")
+    def sync_archive(self):
+        """Run the sync userscript and rsync commands, and return the
+        remote archive with the transfer information"""
         # RUN any user scripts before syncing archive
         envmod.setup()
         pre_sync_script = self.userscripts.get('sync')
@@ -1066,7 +1214,9 @@ class Experiment(object):
             self.run_userscript(pre_sync_script, 'sync')
 
         # Run rsync commmands
-        SyncToRemoteArchive(self).run()
+        remote_archive = SyncToRemoteArchive(self)
+        remote_archive.run()
+        return remote_archive
 
     def resubmit(self):
         next_run = self.counter + 1
@@ -1097,9 +1247,10 @@ class Experiment(object):
         userscripts"""
         start_time = time.perf_counter()
         try:
-            self.set_userscript_env_vars()
-            run_script_command(script_cmd,
-                               control_path=Path(self.control_path))
+            with self.tracer.span(f"{type}_userscript", category="userscript"):
+                self.set_userscript_env_vars()
+                run_script_command(script_cmd,
+                                   control_path=Path(self.control_path))
         finally:
             # Always record the time taken
             elapsed_time = time.perf_counter() - start_time
@@ -1141,6 +1292,13 @@ class Experiment(object):
             print('Moving log {0}'.format(f))
             shutil.move(f, os.path.join(pbs_log_path, f))
 
+        if not hard_sweep:
+            # Record the moved log paths in the job index for payu status
+            index_scheduler_logs(
+                archive_path=Path(self.archive_path),
+                log_paths=[Path(pbs_log_path) / f for f in logs]
+            )
+
         if hard_sweep:
             if os.path.isdir(self.archive_path):
                 print('Removing archive path {0}'.format(self.archive_path))
@@ -1169,6 +1327,7 @@ class Experiment(object):
             print('Removing symlink {0}'.format(self.work_sym_path))
             os.remove(self.work_sym_path)
 
+    @traced()
     def get_restarts_to_prune(self,
                               ignore_intermediate_restarts=False,
                               force=False):
@@ -1218,7 +1377,7 @@ class Experiment(object):
                 # Use model-driver to parse restart directory for a datetime
                 restart_path = os.path.join(self.archive_path, restart)
                 try:
-                    restart_dt = self.model.get_restart_datetime(restart_path)
+                    restart_dt = self.get_restart_datetime(restart_path)
                 except NotImplementedError as e:
                     raise errors.PayuConfigError(
                         'Date-based restart pruning is not '
@@ -1249,6 +1408,10 @@ class Experiment(object):
                     previous_intermediate_restarts = intermediate_restarts
                     intermediate_restarts = []
 
+            # Drop any pruned restarts from the index and save new entries
+            self.restart_index.prune(restarts)
+            self.restart_index.save()
+
         if ignore_intermediate_restarts:
             # Return all restarts that'll eventually be pruned
             restarts_to_prune.extend(intermediate_restarts)
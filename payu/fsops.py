@@ -16,7 +16,7 @@ import shutil
 import sys
 import shlex
 import subprocess
-from typing import Union, List, Any
+from typing import Union, List, Any, Optional
 import tempfile
 import json
 import stat
@@ -29,6 +29,7 @@ from ruamel.yaml.constructor import DuplicateKeyError
 
 # Local imports
 import payu.errors as errors
+from payu.iostats import counted_stat
 ureg = UnitRegistry()
 
 DEFAULT_CONFIG_FNAME = 'config.yaml'
@@ -42,6 +43,15 @@ EXTENSION_TO_INTERPRETER = {'.py': sys.executable,
                             '.sh': '/bin/bash',
                             '.csh': '/bin/tcsh'}
 
+# Size of blocks read when searching log files for lines
+LINE_SEARCH_CHUNK_SIZE = 64 * 1024
+# Number of bytes before a cached search offset used to check a file has
+# only been appended to since it was last searched
+LINE_SEARCH_FINGERPRINT_SIZE = 64
+
+# Cached line searches, keyed by path, pattern and search direction
+_line_search_cache = {}
+
 duplicate_key_warning = """
     ---------------------------
     Duplicate key found in config file.
@@ -58,7 +68,7 @@ def movetree(src, dst, symlinks=False):
     for name in names:
         srcname = os.path.join(src, name)
         dstname = os.path.join(dst, name)
-        if symlinks and os.path.islink(srcname):
+        if symlinks and counted_stat(os.path.islink, srcname):
             linkto = os.readlink(srcname)
             os.symlink(linkto, dstname)
         else:
@@ -157,7 +167,7 @@ def make_symlink(src_path, lnk_path):
     # os.symlink will happily make a symlink to a non-existent
     # file, but we don't want that behaviour
     # XXX: Do we want to be doing this?
-    if not os.path.exists(src_path):
+    if not counted_stat(os.path.exists, src_path):
         return
 
     try:
@@ -165,7 +175,7 @@ def make_symlink(src_path, lnk_path):
     except EnvironmentError as exc:
         if exc.errno != errno.EEXIST:
             raise
-        elif not os.path.islink(lnk_path):
+        if not counted_stat(os.path.islink, lnk_path):
             # Warn the user, but do not interrupt the job
             print("Warning: Cannot create symbolic link to {p}; a file named "
                   "{f} already exists.".format(p=src_path, f=lnk_path))
@@ -256,7 +266,8 @@ def list_sorted_archive_dirs(archive_path: Union[Path, str],
     dirs = []
     for path in archive_path.iterdir():
         real_path = path.resolve()
-        if real_path.is_dir() and naming_pattern.match(path.name):
+        if (counted_stat(real_path.is_dir)
+                and naming_pattern.match(path.name)):
             dirs.append(path.name)
 
     dirs.sort(key=lambda d: int(d.removeprefix(dir_type)))
@@ -401,8 +412,155 @@ def get_size(work_path):
         for f in filenames:
             fp = os.path.join(dirpath, f)
             # skip if it is symbolic link
-            if not os.path.islink(fp):
-                total_size += os.path.getsize(fp)
+            if not counted_stat(os.path.islink, fp):
+                total_size += counted_stat(os.path.getsize, fp)
 
     # Convert the total size from bytes to gigabytes
-    return (int(total_size) * ureg.byte).to(ureg.gibibyte).magnitude
\ No newline at end of file
+    return (int(total_size) * ureg.byte).to(ureg.gibibyte).magnitude
+
+
+def _get_complete_lines_end(f, size: int) -> int:
+    """Return the offset after the last newline in binary file f, so a
+    partially written last line is ignored"""
+    pos = size
+    while pos > 0:
+        chunk_size = min(LINE_SEARCH_CHUNK_SIZE, pos)
+        f.seek(pos - chunk_size)
+        index = f.read(chunk_size).rfind(b'\n')
+        if index >= 0:
+            return pos - chunk_size + index + 1
+        pos -= chunk_size
+    return 0
+
+
+def _read_lines_reversed(f, start: int, end: int):
+    """Yield the lines of binary file f between offsets start and end,
+    starting with the last line"""
+    pos = end
+    remainder = b''
+    while pos > start:
+        chunk_size = min(LINE_SEARCH_CHUNK_SIZE, pos - start)
+        pos -= chunk_size
+        f.seek(pos)
+        lines = (f.read(chunk_size) + remainder).split(b'\n')
+        # First line may continue in the previous chunk
+        remainder = lines.pop(0)
+        yield from reversed(lines)
+    yield remainder
+
+
+def _read_partial_line(f, end: int, size: int) -> Optional[str]:
+    """Return the last line of binary file f if it has no trailing
+    newline, e.g. if it is still being written"""
+    if end >= size:
+        return None
+    f.seek(end)
+    return f.read(size - end).decode(errors='replace')
+
+
+def _get_cached_search(f, key, file_id, end: int) -> Optional[dict]:
+    """Return a cached line search of file f if the file has only been
+    appended to since it was searched"""
+    cached = _line_search_cache.get(key)
+    if (cached is None or cached['file_id'] != file_id
+            or cached['offset'] > end):
+        return None
+    fingerprint_start = max(0, cached['offset'] - LINE_SEARCH_FINGERPRINT_SIZE)
+    f.seek(fingerprint_start)
+    if f.read(cached['offset'] - fingerprint_start) != cached['fingerprint']:
+        return None
+    return cached
+
+
+def _cache_search(f, key, file_id, offset: int, line: Optional[str]) -> None:
+    """Cache the result of a line search of file f up to offset"""
+    fingerprint_start = max(0, offset - LINE_SEARCH_FINGERPRINT_SIZE)
+    f.seek(fingerprint_start)
+    _line_search_cache[key] = {
+        'file_id': file_id,
+        'offset': offset,
+        'fingerprint': f.read(offset - fingerprint_start),
+        'line': line,
+    }
+
+
+def find_last_line(path: Union[Path, str], pattern: str) -> Optional[str]:
+    """
+    Return the last line in a file matching a regular expression,
+    or None if no line matches.
+
+    The file is read backwards from the end, so only the lines after the
+    last match are read. The result is cached, so if the file has only
+    been appended to since the last search, only the appended lines are
+    read, e.g. when probing a running model's log file repeatedly.
+    """
+    path = os.path.abspath(path)
+    regex = re.compile(pattern)
+    key = (path, pattern, 'last')
+    with open(path, 'rb') as f:
+        stat_result = os.fstat(f.fileno())
+        file_id = (stat_result.st_dev, stat_result.st_ino)
+        end = _get_complete_lines_end(f, stat_result.st_size)
+
+        # A line without a trailing newline may still be written, so it is
+        # not cached
+        partial_line = _read_partial_line(f, end, stat_result.st_size)
+        if partial_line is not None and regex.search(partial_line):
+            return partial_line
+
+        start, line = 0, None
+        cached = _get_cached_search(f, key, file_id, end)
+        if cached is not None:
+            start, line = cached['offset'], cached['line']
+
+        for raw_line in _read_lines_reversed(f, start, end):
+            text = raw_line.decode(errors='replace')
+            if regex.search(text):
+                line = text
+                break
+
+        _cache_search(f, key, file_id, end, line)
+    return line
+
+
+def find_first_line(path: Union[Path, str], pattern: str) -> Optional[str]:
+    """
+    Return the first line in a file matching a regular expression,
+    or None if no line matches.
+
+    The file is read forwards until the first match, e.g. for settings
+    written at the start of a log file. The result is cached, so repeated
+    searches of a file that has only been appended to do not re-read it.
+    """
+    path = os.path.abspath(path)
+    regex = re.compile(pattern)
+    key = (path, pattern, 'first')
+    with open(path, 'rb') as f:
+        stat_result = os.fstat(f.fileno())
+        file_id = (stat_result.st_dev, stat_result.st_ino)
+        end = _get_complete_lines_end(f, stat_result.st_size)
+
+        offset = 0
+        cached = _get_cached_search(f, key, file_id, end)
+        if cached is not None:
+            if cached['line'] is not None:
+                return cached['line']
+            offset = cached['offset']
+
+        line = None
+        f.seek(offset)
+        while offset < end:
+            raw_line = f.readline()
+            offset += len(raw_line)
+            text = raw_line.rstrip(b'\n').decode(errors='replace')
+            if regex.search(text):
+                line = text
+                break
+
+        _cache_search(f, key, file_id, min(offset, end), line)
+
+        if line is None:
+            partial_line = _read_partial_line(f, end, stat_result.st_size)
+            if partial_line is not None and regex.search(partial_line):
+                return partial_line
+    return line
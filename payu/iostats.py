@@ -0,0 +1,137 @@
+"""
+Accounting of the filesystem I/O of payu stages (e.g. setup, manifest,
+archive, collate and sync), to tell metadata-bound stages (many small
+operations) from bandwidth-bound stages (large reads and writes).
+
+Bytes and the number of read and write calls come from /proc/self/io where
+it is available (Linux), so they include all files read and written by the
+payu process. Files opened and directory listings are counted with a
+Python audit hook, so they include libraries used by payu (e.g. manifest
+hashing), while stat calls are counted by payu's own file helpers.
+
+Subprocesses (e.g. the model run, mppnccombine collation or rsync) only
+record the bytes they read from and wrote to storage, from the resource
+usage of finished child processes. This is block device I/O, so it can be
+zero on network filesystems, and their files opened, stat calls and
+directory listings are not counted.
+"""
+
+from contextlib import contextmanager
+import resource
+import sys
+import threading
+from typing import Any, Callable
+
+PROC_IO_PATH = "/proc/self/io"
+PROC_IO_FIELDS = {
+    "rchar": "bytes_read",
+    "wchar": "bytes_written",
+    "syscr": "read_calls",
+    "syscw": "write_calls",
+}
+# Size of the blocks counted in resource usage
+RUSAGE_BLOCK_SIZE = 512
+# Audit events raised by Python for file opens and directory listings,
+# os.walk uses os.scandir
+AUDIT_EVENTS = {
+    "open": "files_opened",
+    "os.listdir": "dir_listings",
+    "os.scandir": "dir_listings",
+}
+
+_counters = {
+    "files_opened": 0,
+    "stat_calls": 0,
+    "dir_listings": 0,
+}
+_audit_hook_added = False
+# Per-thread flag to stop counting payu's own reads of the counters, so
+# I/O made by other threads at the same time is still counted
+_local = threading.local()
+
+
+def _audit_hook(event: str, args: tuple) -> None:
+    name = AUDIT_EVENTS.get(event)
+    if name is not None and not getattr(_local, 'paused', False):
+        _counters[name] += 1
+
+
+def enable() -> None:
+    """Start counting file opens and directory listings. Audit hooks can
+    not be removed, so this is only done once I/O is accounted"""
+    global _audit_hook_added
+    if not _audit_hook_added:
+        sys.addaudithook(_audit_hook)
+        _audit_hook_added = True
+
+
+def count_stat(n: int = 1) -> None:
+    """Count stat calls made by payu's file helpers"""
+    _counters["stat_calls"] += n
+
+
+def counted_stat(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Count a stat call made by payu's file helpers and return the result
+    of func (e.g. os.path.exists or os.path.islink) with the given
+    arguments"""
+    count_stat()
+    return func(*args, **kwargs)
+
+
+def read_proc_io() -> dict[str, int]:
+    """Return the I/O counters of the payu process, or an empty dictionary
+    if they are not available"""
+    # Don't count reading the counters as payu I/O
+    _local.paused = True
+    try:
+        with open(PROC_IO_PATH, 'r') as f:
+            lines = f.readlines()
+    except OSError:
+        return {}
+    finally:
+        _local.paused = False
+
+    proc_io = {}
+    for line in lines:
+        field, _, value = line.partition(":")
+        if field in PROC_IO_FIELDS:
+            proc_io[PROC_IO_FIELDS[field]] = int(value)
+    return proc_io
+
+
+def read_children_io() -> dict[str, int]:
+    """Return the bytes read from and written to storage by finished
+    child processes"""
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        "child_bytes_read": usage.ru_inblock * RUSAGE_BLOCK_SIZE,
+        "child_bytes_written": usage.ru_oublock * RUSAGE_BLOCK_SIZE,
+    }
+
+
+def snapshot() -> dict[str, int]:
+    """Return the current I/O counters"""
+    counters = read_proc_io()
+    counters.update(read_children_io())
+    counters.update(_counters)
+    return counters
+
+
+def get_delta(start: dict[str, int],
+              end: dict[str, int]) -> dict[str, int]:
+    """Return the I/O between two snapshots"""
+    return {key: value - start.get(key, 0) for key, value in end.items()}
+
+
+@contextmanager
+def account(io_stats: dict[str, Any], stage: str):
+    """Add the I/O of the enclosed block to the stage's totals in io_stats.
+    The I/O of nested stages is included in the enclosing stage"""
+    enable()
+    start = snapshot()
+    try:
+        yield
+    finally:
+        totals = io_stats.setdefault(stage, {})
+        for key, value in get_delta(start, snapshot()).items():
+            totals[key] = totals.get(key, 0) + value
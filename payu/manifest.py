@@ -19,6 +19,7 @@ from pathlib import Path
 from yamanifest.manifest import Manifest as YaManifest
 
 from payu.fsops import make_symlink
+from payu.iostats import counted_stat
 
 # Internal
 import payu.errors as errors
@@ -140,7 +141,7 @@ class PayuManifest(YaManifest):
         """
 
         # Ignore directories
-        if os.path.isdir(fullpath):
+        if counted_stat(os.path.isdir, fullpath):
             return False
 
         # Iteratively check if ignore patterns match any part in fullpath
@@ -185,7 +186,7 @@ class PayuManifest(YaManifest):
         Payu integration function for creating symlinks in work directories
         which point back to the original file.
         """
-        if not os.path.exists(self.fullpath(filepath)):
+        if not counted_stat(os.path.exists, self.fullpath(filepath)):
             raise FileNotFoundError(
                 "Unable to create symlink in work directory. "
                 f"File not found: {self.fullpath(filepath)}"
@@ -196,7 +197,7 @@ class PayuManifest(YaManifest):
                 # Make destination directory if not already exists
                 # Necessary because sometimes this is called before
                 # individual model setup
-                if not os.path.exists(destdir):
+                if not counted_stat(os.path.exists, destdir):
                     os.makedirs(destdir)
                 if self.copy_file(filepath):
                     shutil.copy(self.fullpath(filepath), filepath)
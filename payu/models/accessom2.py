@@ -15,6 +15,7 @@ import shutil
 import json
 import cftime
 
+from payu.fsops import find_last_line
 from payu.models.model import Model
 
 class AccessOm2(Model):
@@ -107,13 +108,11 @@ class AccessOm2(Model):
         log_path = os.path.join(self.expt.work_path, 'atmosphere', 'log', 
                                     'matmxx.pe00000.log')
             
-        with open(log_path, 'r') as f:
-            for line in reversed(f.readlines()):
-                if 'cur_exp-datetime' in line:
-                    line_json = json.loads(line)
-                    time_str = line_json.get('cur_exp-datetime', None)
-                    if time_str is not None:
-                        return cftime.datetime.strptime(time_str, '%Y-%m-%dT%H:%M:%S')
+        line = find_last_line(log_path, 'cur_exp-datetime')
+        if line is not None:
+            time_str = json.loads(line).get('cur_exp-datetime', None)
+            if time_str is not None:
+                return cftime.datetime.strptime(time_str, '%Y-%m-%dT%H:%M:%S')
 
         raise ValueError(f"Key 'cur_exp-datetime' not found in {log_path}")
 
@@ -17,7 +17,7 @@ import shutil
 import cftime
 from warnings import warn
 
-from payu.fsops import make_symlink
+from payu.fsops import make_symlink, find_last_line
 from payu.models.model import Model
 from payu.models.fms import fms_collate
 from payu.models.mom6 import mom6_add_parameter_files, mom6_save_docs_files
@@ -454,11 +454,10 @@ class AccessOm3(CesmCmeps):
         """
         log_path = os.path.join(self.expt.work_path, 'log', 'med.log')
             
-        with open(log_path, 'r') as f:
-            for line in reversed(f.readlines()):
-                if line.startswith(" memory_write: model date"):
-                    time_str = line.split()[4]
-                    return cftime.datetime.strptime(time_str, '%Y-%m-%dT%H:%M:%S')
+        line = find_last_line(log_path, r'^ memory_write: model date')
+        if line is not None:
+            time_str = line.split()[4]
+            return cftime.datetime.strptime(time_str, '%Y-%m-%dT%H:%M:%S')
         
         raise ValueError(f"Key string 'memory_write: model date' not found in {log_path}, cannot determine current experiment time")
 
@@ -6,6 +6,8 @@
 from __future__ import print_function
 
 from collections import defaultdict
+from functools import partial
+import json
 from pathlib import Path
 import multiprocessing
 import os
@@ -14,8 +16,11 @@ import shlex
 import shutil
 import subprocess as sp
 import sys
+import threading
+import time
 from itertools import count
 import fnmatch
+import hashlib
 import re
 import warnings
 
@@ -23,8 +28,9 @@ from yamanifest.hashing import hash
 
 from payu.models.model import Model
 from payu import envmod
-from payu.fsops import required_libs
-from payu.manifest import full_hashes
+from payu.fsops import required_libs, atomic_write_file
+from payu.manifest import fast_hashes, full_hashes, PayuManifest
+from payu.nccombine import nccombine_thread, DEFAULT_COMPLEVEL
 import payu.errors as errors
 
 # Only need one hashfn in the list of full_hashes to calculate the collate mapping.
@@ -36,6 +42,126 @@ full_hashes = full_hashes[0]
 # than this, but mppnccombine-fast is very slow with large numbers of files
 MPI_FORK_MAX_FILE_LIMIT = 1000
 
+# Directory of journals of completed collations, in the archive payu_jobs
+# directory. Journals are not written in the collated directories, as that
+# would modify the restart directories used to validate the restart index
+COLLATE_JOURNAL_DIRNAME = 'collate_journals'
+
+# Default seconds between polls of the work directory for streaming
+# collation, and seconds since last modification for a tile set to be closed
+DEFAULT_STREAM_INTERVAL = 60
+DEFAULT_STREAM_IDLE = 300
+
+# Suffix of files collated while the model is running. These are renamed to
+# the collated filename once the model has finished, if their tiles are
+# unchanged
+STREAM_PROVISIONAL_SUFFIX = '.payu-stream'
+
+# Seconds to wait for a running streaming collation once the model has
+# finished, before leaving its tile set for the collate job
+STREAM_STOP_TIMEOUT = 60
+
+# Supported collation engines: the external mppnccombine programs, or native
+# python collation using netCDF4
+COLLATE_ENGINES = ('mppnccombine', 'python')
+
+
+class CollateJournal(object):
+    """
+    Journal of completed tile set collations and tile hashes in a
+    directory. This is updated as each file is collated, so an interrupted
+    collation job can be resubmitted without repeating completed work.
+
+    Parameters
+    ----------
+    path: The directory containing the uncollated tiles
+    archive_path: The experiment archive, which contains the journal
+    """
+
+    def __init__(self, path, archive_path):
+        self.path = path
+        self.file_path = (Path(archive_path) / 'payu_jobs'
+                          / COLLATE_JOURNAL_DIRNAME
+                          / get_journal_fname(path, archive_path))
+        self.collated = {}
+        self.tiles = {}
+        self.load()
+
+    def load(self):
+        if not self.file_path.is_file():
+            return
+        try:
+            with open(self.file_path, 'r') as f:
+                journal = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            warnings.warn(f"Ignoring unreadable collate journal "
+                          f"{self.file_path}: {e}")
+            return
+        self.collated = journal.get('collated', {})
+        self.tiles = journal.get('tiles', {})
+
+    def save(self):
+        atomic_write_file(file_path=self.file_path,
+                          data={'collated': self.collated,
+                                'tiles': self.tiles})
+
+    def remove(self):
+        if self.file_path.is_file():
+            self.file_path.unlink()
+
+    def get_tile_hash(self, tile):
+        """Return the journal full hash of a tile if the tile size and
+        modification time are unchanged, otherwise None"""
+        entry = self.tiles.get(tile)
+        if entry is None:
+            return None
+        st = os.stat(os.path.join(self.path, tile))
+        if (entry['size'] == st.st_size
+                and entry['mtime_ns'] == st.st_mtime_ns):
+            return entry['hash']
+        return None
+
+    def set_tile_hash(self, tile, tile_hash):
+        """Add the full hash of a tile to the journal"""
+        st = os.stat(os.path.join(self.path, tile))
+        self.tiles[tile] = {'size': st.st_size,
+                            'mtime_ns': st.st_mtime_ns,
+                            'hash': tile_hash}
+
+    def is_complete(self, nc_fname, tiles):
+        """Return True if the tile set was collated and the collated file
+        is unchanged since"""
+        entry = self.collated.get(nc_fname)
+        if entry is None or entry['tiles'] != list(tiles):
+            return False
+        nc_path = os.path.join(self.path, nc_fname)
+        if not os.path.isfile(nc_path):
+            return False
+        st = os.stat(nc_path)
+        return (st.st_size == entry['collated_bytes']
+                and st.st_mtime_ns == entry['collated_mtime_ns'])
+
+    def record_complete(self, nc_fname, tiles, tile_hashes=None):
+        """Record a successful collation and save the journal"""
+        st = os.stat(os.path.join(self.path, nc_fname))
+        self.collated[nc_fname] = {
+            'tiles': list(tiles),
+            'tile_hashes': tile_hashes,
+            'collated_bytes': st.st_size,
+            'collated_mtime_ns': st.st_mtime_ns,
+        }
+        self.save()
+
+    def completed_tile_hashes(self):
+        """Return tile hashes of completed collations, keyed by collated
+        file path, for collated files that still exist"""
+        return {
+            os.path.join(self.path, nc_fname): entry['tile_hashes']
+            for nc_fname, entry in self.collated.items()
+            if entry.get('tile_hashes') is not None
+            and os.path.isfile(os.path.join(self.path, nc_fname))
+        }
+
 
 def cmdthread(cmd, cwd):
     # This is run in a thread, so the GIL of python makes it sensible to
@@ -43,12 +169,35 @@ def cmdthread(cmd, cwd):
     # it doesn't get scrambled when collates are run in parallel
     output = ''
     returncode = None
+    start_time = time.perf_counter()
     try:
         output = sp.check_output(shlex.split(cmd), cwd=cwd, stderr=sp.STDOUT)
     except sp.CalledProcessError as e:
         output = e.output
         returncode = e.returncode
-    return returncode, output
+    elapsed_time = time.perf_counter() - start_time
+    return returncode, output, elapsed_time
+
+
+def get_journal_fname(path, archive_path):
+    """Return the collate journal filename for a directory, named after its
+    path in the archive (e.g. output000.ocean.json), or a hash of the path
+    for directories outside of the archive"""
+    rel_path = os.path.relpath(os.path.realpath(path),
+                               start=os.path.realpath(archive_path))
+    if rel_path.startswith(os.pardir):
+        name = hashlib.md5(os.path.realpath(path).encode()).hexdigest()
+    else:
+        name = rel_path.replace(os.sep, '.')
+    return f'{name}.json'
+
+
+def record_collation(journal, nc_fname, tiles, tile_hashes, result):
+    """Callback to record a successful collation in the collate journal"""
+    returncode = result[0]
+    if returncode is None and os.path.isfile(os.path.join(journal.path,
+                                                          nc_fname)):
+        journal.record_complete(nc_fname, tiles, tile_hashes)
 
 
 def get_uncollated_files(dir):
@@ -67,6 +216,51 @@ def get_uncollated_files(dir):
             in sorted(tile_fnames, key=lambda e: int(e.suffixes[-1][1:]))]
 
 
+def schedule_tile_sets(mnc_tiles):
+    """
+    Return a list of tile sets to collate, ordered by the total size of the
+    uncollated tiles so the most expensive files are collated first.
+
+    Parameters
+    ----------
+    mnc_tiles: A dictionary structured as:
+               {path: {collated_filename: [list_of_tile_filenames]}}
+
+    Returns
+    -------
+        A list of (path, collated_filename, tile_filenames, tile_bytes)
+        tuples, largest first
+    """
+    tile_sets = []
+    for path, file_dict in mnc_tiles.items():
+        for nc_fname, tiles in file_dict.items():
+            tile_bytes = sum(os.path.getsize(os.path.join(path, tile))
+                             for tile in tiles)
+            tile_sets.append((path, nc_fname, tiles, tile_bytes))
+
+    # Stable sort, so equal sized files keep their directory listing order
+    tile_sets.sort(key=lambda tile_set: tile_set[3], reverse=True)
+    return tile_sets
+
+
+def get_collate_ncpus(nc_fname, default_ncpus, file_ncpus=None):
+    """
+    Return the number of cpus to use for collating a file. The first
+    filename pattern in file_ncpus that matches the collated filename is
+    used, otherwise default to default_ncpus.
+
+    Parameters
+    ----------
+    nc_fname: The collated filename
+    default_ncpus: Number of cpus used if no patterns match
+    file_ncpus: Dictionary of filename glob patterns to number of cpus
+    """
+    for pattern, ncpus in (file_ncpus or {}).items():
+        if fnmatch.fnmatch(nc_fname, pattern):
+            return int(ncpus)
+    return default_ncpus
+
+
 def get_avail_collate_flags(mppnc_path):
     """
     Returns a set of the available mppnccombine flags parsed from the help string
@@ -83,7 +277,167 @@ def get_avail_collate_flags(mppnc_path):
     return set(re.findall(r"\B-[A-Za-z0-9]+\b", collate_help.stdout))
 
 
-def get_restart_uncollated_hashes(mnc_tiles, model):
+def full_hash(path):
+    """Return the full hash of a file. Defined at module level so it can be
+    used by a process pool"""
+    return hash(path, hashfn=full_hashes)
+
+
+def hash_files(paths, nprocesses=1):
+    """
+    Return a list of full hashes of the given files, calculated in parallel
+    across a process pool if nprocesses is greater than one
+    """
+    paths = list(paths)
+    nprocesses = min(nprocesses, len(paths))
+    if nprocesses <= 1:
+        return [full_hash(path) for path in paths]
+
+    with multiprocessing.Pool(processes=nprocesses) as pool:
+        return pool.map(full_hash, paths, chunksize=1)
+
+
+def get_manifest_hashes(model, paths):
+    """
+    Return full hashes stored in the run's restart manifests, keyed by the
+    real path of each file. Restart tiles collated from the prior restart
+    directory are in the restart manifest of the run, so these hashes do not
+    need to be recalculated. As with manifest checks, a stored full hash is
+    only used if the file's fast hashes match the manifest, so files
+    modified since the manifest was written are rehashed.
+
+    Parameters
+    ----------
+    model: The payu model class
+    paths: Paths of the files to return hashes for
+    """
+    real_paths = {os.path.realpath(path) for path in paths}
+    manifest_paths = [
+        os.path.join(model.expt.output_path, 'manifests', 'restart.yaml'),
+        os.path.join(model.expt.control_path, 'manifests', 'restart.yaml'),
+    ]
+    manifest_hashes = {}
+    for manifest_path in manifest_paths:
+        if not os.path.isfile(manifest_path):
+            continue
+        manifest = PayuManifest(manifest_path)
+        try:
+            manifest.load()
+        except Exception as e:
+            print(f'Error loading restart manifest {manifest_path}: {e}')
+            continue
+        for filepath in manifest:
+            fullpath = os.path.realpath(manifest.fullpath(filepath))
+            if fullpath not in real_paths or fullpath in manifest_hashes:
+                continue
+            file_hash = manifest.get(filepath, full_hashes)
+            if (file_hash is not None
+                    and is_manifest_current(manifest, filepath, fullpath)):
+                manifest_hashes[fullpath] = file_hash
+    return manifest_hashes
+
+
+def is_manifest_current(manifest, filepath, fullpath):
+    """Return True if the fast hashes of a file match those stored in the
+    manifest, i.e. the file is unchanged since the manifest was written"""
+    if not os.path.isfile(fullpath):
+        return False
+    for hashfn in fast_hashes:
+        stored_hash = manifest.get(filepath, hashfn)
+        if stored_hash is None or hash(fullpath, hashfn) != stored_hash:
+            return False
+    return True
+
+
+def get_mppnc_path(model, collate_config, default_exe='mppnccombine'):
+    """
+    Return the path to the FMS collation tool, either configured with the
+    collate exe option or found in the laboratory bin directory
+
+    Parameters
+    ----------
+    model: The payu model class
+    collate_config: The collate configuration dictionary
+    default_exe: Executable name to search for in the laboratory bin path
+    """
+    # Check config for collate executable
+    mppnc_path = collate_config.get('exe')
+    if mppnc_path is None:
+        for f in os.listdir(model.expt.lab.bin_path):
+            if f == default_exe:
+                mppnc_path = os.path.join(model.expt.lab.bin_path, f)
+                break
+    else:
+        mppnc_path = model.expand_executable_path(mppnc_path)
+
+    if not mppnc_path:
+        raise FileNotFoundError('No mppnccombine program found')
+
+    return mppnc_path
+
+
+def get_collate_flags(collate_config, mppnc_path, mpi=False):
+    """
+    Return the configured collate command line options, or the default
+    options for the collation tool
+
+    Parameters
+    ----------
+    collate_config: The collate configuration dictionary
+    mppnc_path: The mppnccombine executable path
+    mpi: Whether mppnccombine-fast is used
+    """
+    collate_flags = collate_config.get('flags')
+    if collate_flags is None:
+        if mpi:
+            collate_flags = '-r'
+        else:
+            collate_flags = '-n4 -m -r'
+
+            # Unfortunately there are two versions of mppnccombine floating around that support
+            # different flags:
+            # 1. https://github.com/ACCESS-NRI/MOM5/tree/master/src/postprocessing/mppnccombine
+            # 2. https://github.com/NOAA-GFDL/FRE-NCtools/tree/main/src/mpp-nccombine
+            # Here we parse the available flags from the help string to determine which version
+            # we are using and set the compression flag accordingly
+            avail_collate_flags = get_avail_collate_flags(mppnc_path)
+            
+            if "-z" in avail_collate_flags:
+                # Legacy mppnccombine uses -z to turn on compression
+                # Default deflate level is 5
+                collate_flags += " -z"
+            elif "-d" in avail_collate_flags:
+                # Set deflate level to 5
+                collate_flags += " -d 5"
+            else:
+                warnings.warn("No compression flag set for mppnccombine")
+
+    return collate_flags
+
+
+def get_collate_engine(collate_config):
+    """Return the configured collation engine"""
+    engine = collate_config.get('engine', 'mppnccombine')
+    if engine not in COLLATE_ENGINES:
+        raise errors.PayuConfigError(
+            f"Unsupported collate engine: {engine}. Supported engines are: "
+            f"{', '.join(COLLATE_ENGINES)}"
+        )
+    return engine
+
+
+def get_collate_ignore(collate_config):
+    """Return the list of collated filenames to ignore"""
+    collate_ignore = collate_config.get('ignore')
+    if collate_ignore is None:
+        collate_ignore = []
+    elif type(collate_ignore) != list:
+        collate_ignore = [collate_ignore]
+    return collate_ignore
+
+
+def get_restart_uncollated_hashes(mnc_tiles, model, journals=None,
+                                  nprocesses=1, manifest_hashes=None):
     """
     Map future collated restart files to the full hashes of each uncollated tile.
     
@@ -92,6 +446,14 @@ def get_restart_uncollated_hashes(mnc_tiles, model):
     mnc_tiles: A dictionary structured as:
                {restart_path: {collated_filename: [list_of_tile_filenames]}}
     model: The payu model class
+    journals: Optional dictionary of CollateJournal objects keyed by path.
+              Tile hashes are re-used from the journal where possible, and
+              restart files completed in a previous collation attempt are
+              included.
+    nprocesses: Number of processes used to calculate tile hashes
+    manifest_hashes: Optional dictionary of full hashes keyed by real file
+                     path, e.g. from the restart manifest, which are re-used
+                     rather than recalculated
 
     Returns
     -------
@@ -105,26 +467,73 @@ def get_restart_uncollated_hashes(mnc_tiles, model):
         }
     """
     uncollate_hashes = {}
-
-    for path, file_dict in mnc_tiles.items():
+    journals = journals or {}
+    manifest_hashes = manifest_hashes or {}
+
+    # Full hashes of tiles, keyed by tile path
+    known_hashes = {}
+    unhashed_tiles = []
+
+    # Include journal paths, as tiles may have all been removed by a
+    # previous collation attempt
+    paths = list(mnc_tiles) + [p for p in journals if p not in mnc_tiles]
+    restart_paths = {}
+    for path in paths:
         # Get the relative path from the archive dir to the targeted restart dir
         # e.g., /restart001/ocean/, then use 'restart001' as base_directory
         rel_path = os.path.relpath(os.path.realpath(path), start=model.expt.archive_path)
         base_directory = os.path.split(rel_path)[0]
 
         # Only consider base_directory that matches the restart directory pattern, e.g., restart001
-        if re.match(r'^restart\d+$', base_directory):
-            uncollate_hashes[base_directory] = {}
-
-            # calculate full hashes of all tiles
-            for nc_fname, tiles in file_dict.items():
-                uncollate_hashes[base_directory][os.path.join(path, nc_fname)] = [
-                    hash(os.path.join(path, tile), hashfn=full_hashes) for tile in tiles
-                ]
+        if not re.match(r'^restart\d+$', base_directory):
+            continue
+        restart_paths[path] = base_directory
+        uncollate_hashes[base_directory] = {}
+
+        journal = journals.get(path)
+        if journal is not None:
+            # Restart files collated in a previous collation attempt
+            uncollate_hashes[base_directory].update(
+                journal.completed_tile_hashes()
+            )
+
+        # Re-use any known tile hashes from the journal or manifests
+        for tiles in mnc_tiles.get(path, {}).values():
+            for tile in tiles:
+                tile_path = os.path.join(path, tile)
+                tile_hash = None
+                if journal is not None:
+                    tile_hash = journal.get_tile_hash(tile)
+                if tile_hash is None:
+                    tile_hash = manifest_hashes.get(os.path.realpath(tile_path))
+                if tile_hash is None:
+                    unhashed_tiles.append(tile_path)
+                else:
+                    known_hashes[tile_path] = tile_hash
+
+    # calculate full hashes of all remaining tiles
+    known_hashes.update(
+        zip(unhashed_tiles, hash_files(unhashed_tiles, nprocesses))
+    )
+
+    for path, base_directory in restart_paths.items():
+        file_dict = mnc_tiles.get(path, {})
+        for nc_fname, tiles in file_dict.items():
+            uncollate_hashes[base_directory][os.path.join(path, nc_fname)] = [
+                known_hashes[os.path.join(path, tile)] for tile in tiles
+            ]
+
+        journal = journals.get(path)
+        if journal is not None and file_dict:
+            for tiles in file_dict.values():
+                for tile in tiles:
+                    journal.set_tile_hash(tile,
+                                          known_hashes[os.path.join(path, tile)])
+            journal.save()
 
     return uncollate_hashes
 
-def restart_mapping_log(uncollate_hashes_dict):
+def restart_mapping_log(uncollate_hashes_dict, nprocesses=1):
     """ Return a dictionary of collate mapping.
     Example mapping_collate_dict structure:
     {   
@@ -137,12 +546,16 @@ def restart_mapping_log(uncollate_hashes_dict):
     """
     mapping_collate_dict = {}
 
+    # calculate full hashes of the final collated files
+    nc_fpaths = [nc_fpath for uncollate_hashes in uncollate_hashes_dict.values()
+                 for nc_fpath in uncollate_hashes]
+    collate_hashes = dict(zip(nc_fpaths, hash_files(nc_fpaths, nprocesses)))
+
     for restart_dir, uncollate_hashes in uncollate_hashes_dict.items():
         mapping_collate_dict[restart_dir] = {}
 
         for nc_fpath, tile_hashes in uncollate_hashes.items():
-            # calculate full hash of the final collated file
-            collate_hash = hash(nc_fpath, hashfn=full_hashes)
+            collate_hash = collate_hashes[nc_fpath]
 
             # match the collated file hash with the list of uncollated tile hashes
             mapping_collate_dict[restart_dir][collate_hash] = tile_hashes
@@ -151,8 +564,9 @@ def restart_mapping_log(uncollate_hashes_dict):
 
 def fms_collate(model):
     """
-    Collate model output using mppnccombine. This is broken out of the Fms class so that it can
-    be used by other models
+    Collate model output using mppnccombine, or the native python collation
+    engine in payu.nccombine. This is broken out of the Fms class so that it
+    can be used by other models
 
     Parameters
     ----------
@@ -165,8 +579,14 @@ def fms_collate(model):
 
     collate_config = model.expt.config.get('collate', {})
 
+    python_engine = get_collate_engine(collate_config) == 'python'
+
     # The mpi flag implies using mppnccombine-fast
     mpi = collate_config.get('mpi', False)
+    if mpi and python_engine:
+        warnings.warn("collate: mpi is not supported by the python collate "
+                      "engine and is ignored")
+        mpi = False
 
     if mpi:
         # Load mpi modules for collation
@@ -175,45 +595,11 @@ def fms_collate(model):
     else:
         default_exe = 'mppnccombine'
 
-    # Locate the FMS collation tool
-    # Check config for collate executable
-    mppnc_path = collate_config.get('exe')
-    if mppnc_path is None:
-        for f in os.listdir(model.expt.lab.bin_path):
-            if f == default_exe:
-                mppnc_path = os.path.join(model.expt.lab.bin_path, f)
-                break
+    if python_engine:
+        complevel = int(collate_config.get('complevel', DEFAULT_COMPLEVEL))
     else:
-        mppnc_path = model.expand_executable_path(mppnc_path)
-
-    if not mppnc_path:
-        raise FileNotFoundError('No mppnccombine program found')
-
-    # Check config for collate command line options
-    collate_flags = collate_config.get('flags')
-    if collate_flags is None:
-        if mpi:
-            collate_flags = '-r'
-        else:
-            collate_flags = '-n4 -m -r'
-
-            # Unfortunately there are two versions of mppnccombine floating around that support
-            # different flags:
-            # 1. https://github.com/ACCESS-NRI/MOM5/tree/master/src/postprocessing/mppnccombine
-            # 2. https://github.com/NOAA-GFDL/FRE-NCtools/tree/main/src/mpp-nccombine
-            # Here we parse the available flags from the help string to determine which version
-            # we are using and set the compression flag accordingly
-            avail_collate_flags = get_avail_collate_flags(mppnc_path)
-            
-            if "-z" in avail_collate_flags:
-                # Legacy mppnccombine uses -z to turn on compression
-                # Default deflate level is 5
-                collate_flags += " -z"
-            elif "-d" in avail_collate_flags:
-                # Set deflate level to 5
-                collate_flags += " -d 5"
-            else:
-                warnings.warn("No compression flag set for mppnccombine")
+        mppnc_path = get_mppnc_path(model, collate_config, default_exe)
+        collate_flags = get_collate_flags(collate_config, mppnc_path, mpi)
 
     if mpi:
         # The output file is the first argument after the flags
@@ -225,11 +611,13 @@ def fms_collate(model):
         envmod.module("list")
 
     # Import list of collated files to ignore
-    collate_ignore = collate_config.get('ignore')
-    if collate_ignore is None:
-        collate_ignore = []
-    elif type(collate_ignore) != list:
-        collate_ignore = [collate_ignore]
+    collate_ignore = get_collate_ignore(collate_config)
+
+    # Remove any files collated while the model was running that were not
+    # confirmed once it finished, as their tiles are collated here
+    for provisional_path in Path(model.output_path).glob(
+            '*' + STREAM_PROVISIONAL_SUFFIX):
+        provisional_path.unlink()
 
     # Generate collated file list and identify the first tile
     tile_fnames = {}
@@ -259,30 +647,49 @@ def fms_collate(model):
 
     # print(mnc_tiles)
 
-    if mpi and collate_config.get('glob', True):
-        for t_base in mnc_tiles:
-            globstr = "{}.*".format(t_base)
-            # Try an equivalent glob and check the same files are returned
-            mnc_glob = fnmatch.filter(os.listdir(model.output_path),
-                                      globstr)
-            if mnc_tiles[t_base] == sorted(mnc_glob):
-                mnc_tiles[t_base] = [globstr, ]
-                print("Note: using globstr ({}) for collating {}"
-                      .format(globstr, t_base))
-            else:
-                print("Warning: cannot use globstr {} to collate {}"
-                      .format(globstr, t_base))
-                if len(mnc_tiles[t_base]) > MPI_FORK_MAX_FILE_LIMIT:
-                    print("Warning: large number of tiles: {} "
-                          .format(len(mnc_tiles[t_base])))
-                    print("Warning: collation will be slow and may fail")
+    # Command line tile arguments for each tile set
+    tile_args = {t_dir: dict(mnc_tiles[t_dir]) for t_dir in mnc_tiles}
 
-    # generate a dictionary of full hashes for uncollated tile files
-    uncollate_hashes_dict = get_restart_uncollated_hashes(mnc_tiles, model)
+    if mpi and collate_config.get('glob', True):
+        for t_dir in mnc_tiles:
+            dir_fnames = os.listdir(t_dir)
+            for t_base, tiles in mnc_tiles[t_dir].items():
+                globstr = "{}.*".format(t_base)
+                # Try an equivalent glob and check the same files are returned
+                mnc_glob = fnmatch.filter(dir_fnames, globstr)
+                if sorted(tiles) == sorted(mnc_glob):
+                    tile_args[t_dir][t_base] = [globstr, ]
+                    print("Note: using globstr ({}) for collating {}"
+                          .format(globstr, t_base))
+                else:
+                    print("Warning: cannot use globstr {} to collate {}"
+                          .format(globstr, t_base))
+                    if len(tiles) > MPI_FORK_MAX_FILE_LIMIT:
+                        print("Warning: large number of tiles: {} "
+                              .format(len(tiles)))
+                        print("Warning: collation will be slow and may fail")
 
     cpucount = int(collate_config.get('ncpus',
                    multiprocessing.cpu_count()))
 
+    # Journals of completed collations from any previous collation attempts
+    journals = {t_dir: CollateJournal(t_dir, model.expt.archive_path)
+                for t_dir in tile_fnames}
+
+    # generate a dictionary of full hashes for uncollated tile files
+    tile_paths = [os.path.join(t_dir, tile)
+                  for t_dir in mnc_tiles
+                  for tiles in mnc_tiles[t_dir].values()
+                  for tile in tiles]
+    uncollate_hashes_dict = get_restart_uncollated_hashes(
+        mnc_tiles, model, journals,
+        nprocesses=cpucount,
+        manifest_hashes=get_manifest_hashes(model, tile_paths)
+    )
+    tile_hashes = {}
+    for uncollate_hashes in uncollate_hashes_dict.values():
+        tile_hashes.update(uncollate_hashes)
+
     if mpi:
         # Default to one for mpi
         nprocesses = int(collate_config.get('threads', 1))
@@ -294,38 +701,72 @@ def fms_collate(model):
     if ncpusperprocess == 1 and mpi:
         print("Warning: running collate with mpirun on a single processor")
 
+    # Per-file cpu counts for mppnccombine-fast, keyed by filename pattern
+    file_ncpus = collate_config.get('file_ncpus', {})
+
     pool = multiprocessing.Pool(processes=nprocesses)
 
-    # Collate each tileset into a single file
+    # Collate each tileset into a single file, submitting the largest
+    # tilesets first so they are not left running on their own at the end
     results = []
     codes = []
     outputs = []
-    for output_path in mnc_tiles:
-        for nc_fname in mnc_tiles[output_path]:
-            nc_path = os.path.join(output_path, nc_fname)
-
-            # Remove the collated file if it already exists, since it is
-            # probably from a failed collation attempt
-            # TODO: Validate this somehow
-            if os.path.isfile(nc_path):
-                os.remove(nc_path)
-
+    collate_files = {}
+    for output_path, nc_fname, tiles, tile_bytes in schedule_tile_sets(
+            mnc_tiles):
+        nc_path = os.path.join(output_path, nc_fname)
+
+        journal = journals[output_path]
+        if journal.is_complete(nc_fname, tiles):
+            print(f"Skipping {nc_path}: already collated")
+            continue
+
+        # Remove the collated file if it already exists, since it is
+        # from a failed collation attempt that was not recorded as complete
+        if os.path.isfile(nc_path):
+            os.remove(nc_path)
+
+        collate_info = {
+            'ntiles': len(tiles),
+            'tile_bytes': tile_bytes,
+        }
+        if python_engine:
+            print(f"Collating {nc_path} from {len(tiles)} tiles")
+            collate_func = nccombine_thread
+            collate_args = (nc_fname, tiles, output_path, complevel)
+        else:
             cmd = ' '.join([mppnc_path, collate_flags, nc_fname,
-                            ' '.join(mnc_tiles[output_path][nc_fname])])
+                            ' '.join(tile_args[output_path][nc_fname])])
             if mpi:
-                cmd = "mpirun -n {} {}".format(ncpusperprocess, cmd)
-
+                ncpus = get_collate_ncpus(nc_fname, ncpusperprocess,
+                                          file_ncpus)
+                cmd = "mpirun -n {} {}".format(ncpus, cmd)
+                collate_info['ncpus'] = ncpus
             print(cmd)
-            results.append(
-                pool.apply_async(cmdthread, args=(cmd, output_path)))
+            collate_func = cmdthread
+            collate_args = (cmd, output_path)
+
+        collate_files[nc_path] = collate_info
+        # Record each completed collation as soon as it finishes
+        callback = partial(record_collation, journal, nc_fname, tiles,
+                           tile_hashes.get(nc_path))
+        results.append(
+            pool.apply_async(collate_func, args=collate_args,
+                             callback=callback))
 
     pool.close()
     pool.join()
 
-    for result in results:
-        rc, op = result.get()
+    for nc_path, result in zip(collate_files, results):
+        rc, op, elapsed_time = result.get()
         codes.append(rc)
         outputs.append(op)
+        collate_files[nc_path]['duration_seconds'] = elapsed_time
+        if rc is None and os.path.isfile(nc_path):
+            collate_files[nc_path]['collated_bytes'] = os.path.getsize(nc_path)
+
+    # Record per-file collation sizes and timings for the collate job file
+    model.expt.collate_files.update(collate_files)
 
     # TODO: Categorise the return codes
     if any(rc is not None for rc in codes):
@@ -339,9 +780,214 @@ def fms_collate(model):
                 )
 
     # Get full hash for collated files and write collate mapping into job file
-    mapping_collate_dict = restart_mapping_log(uncollate_hashes_dict)
+    mapping_collate_dict = restart_mapping_log(uncollate_hashes_dict,
+                                               nprocesses=cpucount)
+
+    # Collation is complete, so journals are no longer required
+    for journal in journals.values():
+        journal.remove()
+
     return mapping_collate_dict
 
+class CollateWatcher(object):
+    """
+    Collate history tile sets in a model work directory while the model is
+    running. The work directory is polled and a tile set is collated once
+    none of its tiles have been modified for ``idle`` seconds and the tiles
+    are unchanged since the previous poll.
+
+    A tile set that is idle may still be written to by the model, so tile
+    sets are collated into provisional files and no tiles are removed while
+    the model is running. Once the model has finished, ``finalize`` renames
+    each provisional file to the collated filename and removes its tiles,
+    if the tiles are unchanged since they were collated. Otherwise the
+    provisional file is removed and the tile set is left for the collate
+    job.
+
+    Parameters
+    ----------
+    model: The payu model class
+    interval: Seconds between polls of the work directory
+    idle: Seconds since the last modification of a tile set before it is
+          collated
+    """
+
+    def __init__(self, model, interval=DEFAULT_STREAM_INTERVAL,
+                 idle=DEFAULT_STREAM_IDLE):
+        self.model = model
+        self.path = model.work_path
+        self.interval = interval
+        self.idle = idle
+
+        collate_config = model.expt.config.get('collate', {})
+        self.python_engine = get_collate_engine(collate_config) == 'python'
+        if self.python_engine:
+            self.complevel = int(collate_config.get('complevel',
+                                                    DEFAULT_COMPLEVEL))
+        else:
+            self.mppnc_path = get_mppnc_path(model, collate_config)
+            collate_flags = get_collate_flags(collate_config, self.mppnc_path)
+            self.collate_flags = ' '.join(
+                f for f in collate_flags.split() if f != '-r'
+            )
+        self.collate_ignore = get_collate_ignore(collate_config)
+
+        # Tile signatures from the previous poll
+        self.signatures = {}
+        # Provisional collations, keyed by collated filename
+        self.provisional = {}
+        self.collate_files = {}
+        self.failed = set()
+
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._abandoned = False
+        self._thread = None
+
+    def start(self):
+        print(f"payu: collating idle tile sets in {self.path} while "
+              "the model is running")
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=STREAM_STOP_TIMEOUT):
+        """Stop polling, waiting up to timeout seconds for any running
+        collation to finish. A collation still running after the timeout is
+        discarded and its tile set is left for the collate job"""
+        self._stop.set()
+        if self._thread is None:
+            return
+        self._thread.join(timeout)
+        with self._lock:
+            if self._thread.is_alive():
+                warnings.warn(f"Streaming collation in {self.path} did not "
+                              f"finish within {timeout} seconds, leaving "
+                              "the remaining output for the collate job")
+                self._abandoned = True
+
+    def run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                warnings.warn(f"Streaming collation failed in {self.path}: "
+                              f"{e}")
+
+    def get_tile_signature(self, tiles):
+        """Return the names, sizes and modification times of tiles"""
+        signature = []
+        for tile in tiles:
+            st = os.stat(os.path.join(self.path, tile))
+            signature.append((tile, st.st_size, st.st_mtime_ns))
+        return tuple(signature)
+
+    def poll(self):
+        """Collate any tile sets in the work directory which are idle"""
+        mnc_tiles = defaultdict(list)
+        for t_fname in get_uncollated_files(self.path):
+            t_base = os.path.splitext(t_fname)[0]
+            if t_base not in self.collate_ignore:
+                mnc_tiles[t_base].append(t_fname)
+
+        signatures = {}
+        idle_time_ns = (time.time() - self.idle) * 1e9
+        for nc_fname, tiles in mnc_tiles.items():
+            if nc_fname in self.failed or nc_fname in self.provisional:
+                continue
+            try:
+                signature = self.get_tile_signature(tiles)
+            except FileNotFoundError:
+                continue
+            signatures[nc_fname] = signature
+
+            idle = (signature == self.signatures.get(nc_fname)
+                    and all(mtime < idle_time_ns
+                            for _, _, mtime in signature))
+            if idle and not self._stop.is_set():
+                self.collate(nc_fname, tiles, signature)
+
+        self.signatures = signatures
+
+    def collate(self, nc_fname, tiles, signature):
+        """Collate an idle tile set into a provisional file"""
+        provisional_fname = nc_fname + STREAM_PROVISIONAL_SUFFIX
+        provisional_path = os.path.join(self.path, provisional_fname)
+        if os.path.isfile(provisional_path):
+            os.remove(provisional_path)
+
+        if self.python_engine:
+            print(f"Collating {provisional_path} from {len(tiles)} tiles")
+            rc, output, elapsed_time = nccombine_thread(
+                provisional_fname, tiles, self.path, self.complevel,
+                remove_tiles=False
+            )
+        else:
+            cmd = ' '.join([self.mppnc_path, self.collate_flags,
+                            provisional_fname, ' '.join(tiles)])
+            print(cmd)
+            rc, output, elapsed_time = cmdthread(cmd, self.path)
+
+        if rc is not None:
+            # Leave the tiles for the collate job
+            if os.path.isfile(provisional_path):
+                os.remove(provisional_path)
+            self.failed.add(nc_fname)
+            warnings.warn(f"Streaming collation of {nc_fname} failed "
+                          f"with error code {rc}: {output.decode()}")
+            return
+
+        with self._lock:
+            # The model has finished and this tile set is left for the
+            # collate job, which removes the provisional file
+            if self._abandoned:
+                return
+            self.provisional[nc_fname] = {
+                'tiles': tiles,
+                'signature': signature,
+                'collated_bytes': os.path.getsize(provisional_path),
+                'duration_seconds': elapsed_time,
+            }
+
+    def finalize(self):
+        """Replace tiles with their provisional collated files, if the tiles
+        are unchanged since they were collated. This must only be called
+        once the model has finished, so no tiles are still being written"""
+        for nc_fname, info in self.provisional.items():
+            nc_path = os.path.join(self.path, nc_fname)
+            provisional_path = nc_path + STREAM_PROVISIONAL_SUFFIX
+            try:
+                unchanged = (self.get_tile_signature(info['tiles'])
+                             == info['signature']
+                             and os.path.getsize(provisional_path)
+                             == info['collated_bytes'])
+            except FileNotFoundError:
+                unchanged = False
+
+            if not unchanged:
+                print(f"payu: tiles of {nc_fname} changed after streaming "
+                      "collation, leaving them for the collate job")
+                if os.path.isfile(provisional_path):
+                    os.remove(provisional_path)
+                continue
+
+            os.replace(provisional_path, nc_path)
+            for tile in info['tiles']:
+                os.remove(os.path.join(self.path, tile))
+
+            self.collate_files[nc_path] = {
+                'ntiles': len(info['tiles']),
+                'tile_bytes': sum(size for _, size, _ in info['signature']),
+                'collated_bytes': info['collated_bytes'],
+                'duration_seconds': info['duration_seconds'],
+            }
+        self.provisional = {}
+
+    def has_uncollated_output(self):
+        """Return True if the model's archived output has tiles that still
+        need to be collated"""
+        return bool(get_uncollated_files(self.model.output_path))
+
+
 class Fms(Model):
 
     def __init__(self, expt, name, config):
@@ -373,3 +1019,22 @@ class Fms(Model):
     def collate(self):
         mapping_collate_dict = fms_collate(self)
         return mapping_collate_dict
+
+    def collate_watcher(self):
+        collate_config = self.expt.config.get('collate', {})
+        if not (collate_config.get('enable', True)
+                and collate_config.get('stream', False)):
+            return None
+
+        if (collate_config.get('mpi', False)
+                and get_collate_engine(collate_config) != 'python'):
+            warnings.warn("Streaming collation is not supported with "
+                          "collate mpi enabled")
+            return None
+
+        return CollateWatcher(
+            self,
+            interval=collate_config.get('stream_interval',
+                                        DEFAULT_STREAM_INTERVAL),
+            idle=collate_config.get('stream_idle', DEFAULT_STREAM_IDLE),
+        )
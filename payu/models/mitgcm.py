@@ -9,14 +9,17 @@
 
 # Standard Library
 import errno
+import multiprocessing
 import os
 import sys
 import shlex
 import shutil as sh
 import subprocess as sp
+import time
 
 # Extensions
 import f90nml
+import netCDF4
 from ruamel.yaml import YAML
 yaml = YAML()
 yaml.default_flow_style = False
@@ -281,32 +284,109 @@ class Mitgcm(Model):
             sh.move(f_src, self.restart_path)
 
     def collate(self, clear_tiles=True, partition=None):
-        from mnctools import mnctools as mnc
-
-        # Use leading tiles to construct a tile manifest
-        # Don't collate the pickup files
-        # Tiled format: <field>.t###.nc
-        output_fnames = [f.replace('.t001.', '.')
-                         for f in os.listdir(self.output_path)
-                         if f.endswith('.t001.nc') and
-                         not f.startswith('pickup')]
-
-        tile_fnames = {}
-        for fname in output_fnames:
-            f_header = fname.rsplit('.', 1)[0]
-
-            tile_fnames[fname] = [os.path.join(self.output_path, f)
-                                  for f in os.listdir(self.output_path)
-                                  if f.startswith(f_header + '.') and
-                                  f.split('.')[-2].startswith('t') and
-                                  f.split('.')[-2].lstrip('t').isdigit()]
-
-        for fname in tile_fnames:
-            mnc.collate(tile_fnames[fname],
-                        os.path.join(self.output_path, fname),
-                        partition)
-
-        if clear_tiles:
-            for fname in tile_fnames:
+        collate_config = self.expt.config.get('collate', {})
+
+        tile_fnames = get_tile_fnames(self.output_path)
+        if not tile_fnames:
+            return
+
+        ncpus = int(collate_config.get('ncpus', multiprocessing.cpu_count()))
+        nprocesses = int(collate_config.get('threads', ncpus))
+        nprocesses = max(min(nprocesses, len(tile_fnames)), 1)
+
+        # Fields are independent, so collate them in parallel
+        with multiprocessing.Pool(processes=nprocesses) as pool:
+            results = [
+                pool.apply_async(
+                    collate_field,
+                    args=(tiles, os.path.join(self.output_path, fname),
+                          partition)
+                )
+                for fname, tiles in tile_fnames.items()
+            ]
+            results = [result.get() for result in results]
+
+        # Only remove the tiles of fields which were collated successfully
+        error_msgs = []
+        for fname, (error_msg, elapsed_time) in zip(tile_fnames, results):
+            output_fname = os.path.join(self.output_path, fname)
+            if error_msg is None:
+                error_msg = verify_collated(tile_fnames[fname], output_fname)
+
+            if error_msg is not None:
+                error_msgs.append(f'{fname}: {error_msg}')
+                continue
+
+            print(f'payu: collated {fname} from {len(tile_fnames[fname])} '
+                  f'tiles in {elapsed_time:.1f}s')
+            if clear_tiles:
                 for tile_fname in tile_fnames[fname]:
                     os.remove(tile_fname)
+
+        if error_msgs:
+            raise errors.PayuRuntimeError(
+                'Failed to collate MITgcm output:\n' + '\n'.join(error_msgs)
+            )
+
+
+def get_tile_fnames(output_path):
+    """
+    Return the tile paths of each collated output file in a single scan of
+    the output directory, for tiled files of format <field>.t###.nc. Only
+    fields with a leading tile (t001) are collated, and pickup files are
+    skipped.
+    """
+    tile_fnames = {}
+    for f in sorted(os.listdir(output_path)):
+        if f.startswith('pickup'):
+            continue
+        parts = f.split('.')
+        if (len(parts) < 3 or parts[-1] != 'nc'
+                or not parts[-2].startswith('t')
+                or not parts[-2][1:].isdigit()):
+            continue
+        fname = '.'.join(parts[:-2] + ['nc'])
+        tile_fnames.setdefault(fname, []).append(
+            os.path.join(output_path, f)
+        )
+
+    return {fname: tiles for fname, tiles in tile_fnames.items()
+            if any(tile.endswith('.t001.nc') for tile in tiles)}
+
+
+def collate_field(tile_fnames, output_fname, partition=None):
+    """
+    Collate the tiles of a single field in a process pool, returning an
+    error message (None on success) and the elapsed time
+    """
+    from mnctools import mnctools as mnc
+
+    start_time = time.perf_counter()
+    try:
+        mnc.collate(tile_fnames, output_fname, partition)
+        error_msg = None
+    except Exception as e:
+        error_msg = f'{type(e).__name__}: {e}'
+    return error_msg, time.perf_counter() - start_time
+
+
+def verify_collated(tile_fnames, output_fname):
+    """
+    Check a collated file can be read and has the global grid and variables
+    of its tiles, returning an error message or None if it is valid
+    """
+    try:
+        with netCDF4.Dataset(tile_fnames[0], 'r') as tile, \
+                netCDF4.Dataset(output_fname, 'r') as output:
+            for dim, size in (('X', tile.Nx), ('Y', tile.Ny)):
+                if (dim in output.dimensions
+                        and len(output.dimensions[dim]) != size):
+                    return (f'collated dimension {dim} has size '
+                            f'{len(output.dimensions[dim])}, expected {size}')
+            missing_vars = set(tile.variables) - set(output.variables)
+            if missing_vars:
+                return ('collated file is missing variables: '
+                        f'{", ".join(sorted(missing_vars))}')
+    except (OSError, AttributeError) as e:
+        return f'unable to verify collated file: {e}'
+    return None
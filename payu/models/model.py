@@ -259,61 +259,64 @@ class Model(object):
         os.makedirs(self.work_output_path, exist_ok=True)
 
         # Copy configuration files from control path
-        self.setup_configuration_files()
+        with self.expt.tracer.span(f"{self.name}.setup_configuration_files"):
+            self.setup_configuration_files()
 
         # Add restart files from prior run to restart manifest
-        if self.prior_restart_path:
-            restart_files = self.get_prior_restart_files()
-            for f_name in restart_files:
-                f_orig = os.path.join(self.prior_restart_path, f_name)
-                f_link = os.path.join(self.work_init_path_local, f_name)
-                self.expt.manifest.add_filepath(
-                    'restart',
-                    f_link,
-                    f_orig,
-                    self.copy_restarts
-                )
+        with self.expt.tracer.span(f"{self.name}.link_restarts"):
+            if self.prior_restart_path:
+                restart_files = self.get_prior_restart_files()
+                for f_name in restart_files:
+                    f_orig = os.path.join(self.prior_restart_path, f_name)
+                    f_link = os.path.join(self.work_init_path_local, f_name)
+                    self.expt.manifest.add_filepath(
+                        'restart',
+                        f_link,
+                        f_orig,
+                        self.copy_restarts
+                    )
 
         # Add input files to input manifest
-        for input_path in self.input_paths:
-            if os.path.isfile(input_path):
-                # Build a mock walk iterator for a single file
-                fwalk = iter([(
-                    os.path.dirname(input_path),
-                    [],
-                    [os.path.basename(input_path)]
-                )])
-                # Overwrite the input_path as a directory
-                input_path = os.path.dirname(input_path)
-            else:
-                fwalk = os.walk(input_path)
-
-            for path, dirs, files in fwalk:
-                workrelpath = os.path.relpath(path, input_path)
-                subdir = os.path.normpath(
-                    os.path.join(self.work_input_path_local,
-                                 workrelpath)
-                )
-
-                if not os.path.exists(subdir):
-                    os.mkdir(subdir)
-
-                for f_name in files:
-                    f_orig = os.path.join(path, f_name)
-                    f_link = os.path.join(
-                        self.work_input_path_local,
-                        workrelpath,
-                        f_name
+        with self.expt.tracer.span(f"{self.name}.link_inputs"):
+            for input_path in self.input_paths:
+                if os.path.isfile(input_path):
+                    # Build a mock walk iterator for a single file
+                    fwalk = iter([(
+                        os.path.dirname(input_path),
+                        [],
+                        [os.path.basename(input_path)]
+                    )])
+                    # Overwrite the input_path as a directory
+                    input_path = os.path.dirname(input_path)
+                else:
+                    fwalk = os.walk(input_path)
+
+                for path, dirs, files in fwalk:
+                    workrelpath = os.path.relpath(path, input_path)
+                    subdir = os.path.normpath(
+                        os.path.join(self.work_input_path_local,
+                                     workrelpath)
                     )
-                    # Do not use input file if already linked
-                    # as a restart file
-                    if not os.path.exists(f_link):
-                        self.expt.manifest.add_filepath(
-                            'input',
-                            f_link,
-                            f_orig,
-                            self.copy_inputs
+
+                    if not os.path.exists(subdir):
+                        os.mkdir(subdir)
+
+                    for f_name in files:
+                        f_orig = os.path.join(path, f_name)
+                        f_link = os.path.join(
+                            self.work_input_path_local,
+                            workrelpath,
+                            f_name
                         )
+                        # Do not use input file if already linked
+                        # as a restart file
+                        if not os.path.exists(f_link):
+                            self.expt.manifest.add_filepath(
+                                'input',
+                                f_link,
+                                f_orig,
+                                self.copy_inputs
+                            )
 
         # Make symlink to executable in work directory
         if self.exec_path:
@@ -338,7 +341,8 @@ class Model(object):
             )
 
             # Populate information about required dynamically loaded libraries
-            self.required_libs = required_libs(self.exec_path)
+            with self.expt.tracer.span(f"{self.name}.required_libs"):
+                self.required_libs = required_libs(self.exec_path)
 
         timestep = self.config.get('timestep')
         if timestep:
@@ -365,6 +369,13 @@ class Model(object):
         """Collate any tiled output into a single file."""
         raise NotImplementedError
 
+    def collate_watcher(self):
+        """Return a watcher which collates tiled output while the model is
+        running, or None if streaming collation is not supported. Watchers
+        provide start(), stop(), finalize() once the model has finished,
+        and has_uncollated_output() once the output is archived."""
+        return None
+
 
     def profile(self):
         # TODO: Replace with call to "profile" drivers
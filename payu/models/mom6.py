@@ -12,7 +12,6 @@
 import os
 from datetime import timedelta
 import cftime
-from collections import deque
 
 # Extensions
 import f90nml
@@ -21,6 +20,7 @@ from warnings import warn
 from glob import glob
 
 # Local
+from payu.fsops import find_last_line
 from payu.models.fms import Fms
 from payu.models.mom_mixin import MomMixin
 from payu.git_utils import GitRepository
@@ -147,10 +147,11 @@ class Mom6(MomMixin, Fms):
 
     def read_timestep(self, stats_path):
         """ Read the current timestep from ocean.stats."""
-        with open(stats_path, 'r') as f:
-            line = deque(f, maxlen=1)[0]
-            timestep = float(line.split(',')[1])
-            return timestep
+        line = find_last_line(stats_path, r'\S')
+        if line is None:
+            raise ValueError(f"No timestep found in {stats_path}")
+        timestep = float(line.split(',')[1])
+        return timestep
 
     def get_cur_expt_time(self):
         """Get the current experiment time from log file.
@@ -24,7 +24,7 @@ yaml = YAML()
 yaml.default_flow_style = False
 
 # Local
-from payu.fsops import make_symlink
+from payu.fsops import make_symlink, find_first_line, find_last_line
 from payu.models.model import Model
 import payu.calendar as cal
 
@@ -264,14 +264,17 @@ class UnifiedModel(Model):
         step_per_period = 0
         secs_per_period = 0
 
-        with open(log_path, 'r') as f:
-            for line in f:
-                if 'STEPS_PER_PERIODim' in line:
-                    step_per_period = int(line.split('=')[-1].strip())
-                if 'SECS_PER_PERIODim' in line:
-                    secs_per_period = int(line.split('=')[-1].strip())
-                if 'Atm_Step: Timestep' in line:
-                    timestep = int(line.split()[-1])
+        # Period settings are written at the start of the log, and the
+        # latest timestep at the end, so avoid reading the whole log
+        line = find_first_line(log_path, 'STEPS_PER_PERIODim')
+        if line is not None:
+            step_per_period = int(line.split('=')[-1].strip())
+        line = find_first_line(log_path, 'SECS_PER_PERIODim')
+        if line is not None:
+            secs_per_period = int(line.split('=')[-1].strip())
+        line = find_last_line(log_path, 'Atm_Step: Timestep')
+        if line is not None:
+            timestep = int(line.split()[-1])
 
         if timestep is not None and secs_per_period > 0 and step_per_period > 0:
             secs_per_step = secs_per_period / step_per_period 
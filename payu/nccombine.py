@@ -0,0 +1,218 @@
+"""payu.nccombine
+   ==============
+
+   Native Python collation of FMS domain-decomposed netCDF tiles, an
+   alternative to the external mppnccombine tools.
+
+   :copyright: Copyright 2011 Marshall Ward, see AUTHORS for details.
+   :license: Apache License, Version 2.0, see LICENSE for details.
+"""
+
+# Standard Library
+import os
+import time
+import traceback
+
+# Extensions
+import netCDF4
+import numpy as np
+
+# Attribute on decomposed coordinate variables with the 1-based
+# [global_start, global_end, local_start, local_end] indices of a tile
+DECOMPOSITION_ATTR = 'domain_decomposition'
+
+# Global attribute with the number of tiles in a set, not used in output
+NUM_FILES_ATTR = 'NumFilesInSet'
+
+# Maximum bytes read from a tile variable at a time
+DEFAULT_BLOCK_SIZE = 256 * 1024**2
+
+DEFAULT_COMPLEVEL = 5
+
+# Data types which require the enhanced netCDF4 data model
+NETCDF4_ONLY_DTYPES = (np.int64, np.uint8, np.uint16, np.uint32, np.uint64)
+
+
+def get_decomposition(dataset):
+    """
+    Return a dictionary of decomposed dimension names to their
+    (global_start, global_end, local_start, local_end) indices in a tile
+    """
+    decomposition = {}
+    for dim in dataset.dimensions:
+        if dim in dataset.variables:
+            var = dataset.variables[dim]
+            if DECOMPOSITION_ATTR in var.ncattrs():
+                indices = [int(i) for i in var.getncattr(DECOMPOSITION_ATTR)]
+                decomposition[dim] = tuple(indices)
+    return decomposition
+
+
+def get_output_format(dataset):
+    """Use the classic data model unless any variables require netCDF4"""
+    for var in dataset.variables.values():
+        if var.dtype in NETCDF4_ONLY_DTYPES:
+            return 'NETCDF4'
+    return 'NETCDF4_CLASSIC'
+
+
+def get_fill_value(var):
+    """Use _FillValue or otherwise missing_value to initialise output
+    variables, equivalent to mppnccombine -m"""
+    attrs = var.ncattrs()
+    if '_FillValue' in attrs:
+        return var.getncattr('_FillValue')
+    if 'missing_value' in attrs:
+        return np.array(var.getncattr('missing_value'),
+                        dtype=var.dtype).item()
+    return None
+
+
+def get_chunksizes(var, dimensions, decomposition, global_sizes):
+    """
+    Chunks are aligned with the tile decomposition, so each tile is written
+    into whole chunks, with a single record per chunk along unlimited
+    dimensions
+    """
+    chunksizes = []
+    for dim in var.dimensions:
+        if dimensions[dim].isunlimited():
+            chunksizes.append(1)
+        elif dim in decomposition:
+            _, _, local_start, local_end = decomposition[dim]
+            chunksizes.append(local_end - local_start + 1)
+        else:
+            chunksizes.append(max(global_sizes[dim], 1))
+    return chunksizes
+
+
+def define_output(tile, output, complevel):
+    """Create the dimensions, variables and attributes of the collated
+    output using the first tile"""
+    decomposition = get_decomposition(tile)
+
+    global_sizes = {}
+    for name, dim in tile.dimensions.items():
+        if name in decomposition:
+            global_start, global_end, _, _ = decomposition[name]
+            global_sizes[name] = global_end - global_start + 1
+        else:
+            global_sizes[name] = len(dim)
+        output.createDimension(
+            name, None if dim.isunlimited() else global_sizes[name]
+        )
+
+    attrs = {k: tile.getncattr(k) for k in tile.ncattrs()
+             if k != NUM_FILES_ATTR}
+    if 'filename' in attrs:
+        attrs['filename'] = os.path.basename(output.filepath())
+    output.setncatts(attrs)
+
+    for name, var in tile.variables.items():
+        kwargs = {}
+        if var.dimensions and var.dtype != str:
+            kwargs = {
+                'zlib': complevel > 0,
+                'complevel': complevel,
+                'chunksizes': get_chunksizes(var, tile.dimensions,
+                                             decomposition, global_sizes),
+            }
+        out_var = output.createVariable(name, var.dtype, var.dimensions,
+                                        fill_value=get_fill_value(var),
+                                        **kwargs)
+        out_var.set_auto_maskandscale(False)
+        out_var.setncatts({k: var.getncattr(k) for k in var.ncattrs()
+                           if k not in ('_FillValue', DECOMPOSITION_ATTR)})
+
+
+def copy_variable(var, out_var, decomposition, block_size):
+    """Copy a tile variable into its region of the output variable, in
+    blocks along the leading dimension to limit memory use"""
+    region = []
+    for dim in var.dimensions:
+        if dim in decomposition:
+            global_start, _, local_start, local_end = decomposition[dim]
+            start = local_start - global_start
+            region.append(slice(start, start + local_end - local_start + 1))
+        else:
+            region.append(slice(None))
+
+    if var.ndim == 0:
+        out_var.assignValue(var.getValue())
+        return
+
+    nlead = var.shape[0]
+    block_bytes = max(var.size * var.dtype.itemsize // max(nlead, 1), 1)
+    nblock = max(block_size // block_bytes, 1)
+    for i in range(0, nlead, nblock):
+        j = min(i + nblock, nlead)
+        lead = region[0]
+        start = 0 if lead.start is None else lead.start
+        out_region = tuple([slice(start + i, start + j)] + region[1:])
+        out_var[out_region] = var[i:j]
+
+
+def combine(tile_paths, output_path, complevel=DEFAULT_COMPLEVEL,
+            block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Collate a set of FMS netCDF tiles into a single output file
+
+    Parameters
+    ----------
+    tile_paths: list of str
+        Paths to the uncollated tiles
+    output_path: str
+        Path to the collated output file. This is overwritten if it exists
+    complevel: int, default 5
+        Deflate level of output variables, or 0 to disable compression
+    block_size: int
+        Maximum number of bytes read from a tile variable at a time
+    """
+    if len(tile_paths) == 0:
+        raise ValueError(f'No tiles to collate into {output_path}')
+
+    with netCDF4.Dataset(tile_paths[0], 'r') as first_tile:
+        output_format = get_output_format(first_tile)
+        output = netCDF4.Dataset(output_path, 'w', format=output_format)
+        try:
+            define_output(first_tile, output, complevel)
+
+            for tile_path in tile_paths:
+                with netCDF4.Dataset(tile_path, 'r') as tile:
+                    tile.set_auto_maskandscale(False)
+                    tile.set_auto_chartostring(False)
+                    decomposition = get_decomposition(tile)
+                    for name, var in tile.variables.items():
+                        is_decomposed = any(dim in decomposition
+                                            for dim in var.dimensions)
+                        # Variables which aren't decomposed are the same in
+                        # all tiles, so only copy from the first tile
+                        if is_decomposed or tile_path == tile_paths[0]:
+                            copy_variable(var, output.variables[name],
+                                          decomposition, block_size)
+        finally:
+            output.close()
+
+
+def nccombine_thread(nc_fname, tiles, cwd, complevel=DEFAULT_COMPLEVEL,
+                     remove_tiles=True):
+    """
+    Collate a tile set in a process pool, returning results in the same
+    form as running mppnccombine in payu.models.fms.cmdthread:
+    (returncode, output, elapsed_time). The returncode is None on success.
+    """
+    start_time = time.perf_counter()
+    output_path = os.path.join(cwd, nc_fname)
+    tile_paths = [os.path.join(cwd, tile) for tile in tiles]
+    returncode = None
+    output = b''
+    try:
+        combine(tile_paths, output_path, complevel=complevel)
+        if remove_tiles:
+            for tile_path in tile_paths:
+                os.remove(tile_path)
+    except Exception:
+        returncode = 1
+        output = traceback.format_exc().encode()
+    elapsed_time = time.perf_counter() - start_time
+    return returncode, output, elapsed_time
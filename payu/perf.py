@@ -0,0 +1,205 @@
+"""
+Methods used by the `payu perf` command to summarise the throughput of
+payu runs from the metrics recorded in run job files, and to flag
+performance regressions after configuration or executable changes
+"""
+import hashlib
+import json
+from pathlib import Path
+from statistics import median
+from typing import Any, Optional
+
+from payu.status import get_job_file_list, format_table
+from payu.telemetry import read_job_file, get_run_metrics
+
+# Fractional drop in SYPD that is flagged as a performance regression
+REGRESSION_THRESHOLD = 0.1
+
+
+def get_fingerprint(value: Any) -> Optional[str]:
+    """Return a short hash of a JSON serialisable value, or None if the
+    value is empty"""
+    if not value:
+        return None
+    serialised = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.md5(serialised.encode()).hexdigest()[:8]
+
+
+def get_exe_hashes(data: dict[str, Any]) -> dict[str, Any]:
+    """Return the hashes of the executables in a run job file's manifests"""
+    exe_manifest = data.get("manifests", {}).get("exe", {})
+    return {
+        path: entry.get("hashes", {})
+        for path, entry in exe_manifest.items()
+        if isinstance(entry, dict)
+    }
+
+
+def get_run_perf_info(job_file: Path, data: dict[str, Any]) -> dict[str, Any]:
+    """Return the throughput metrics and configuration and executable
+    fingerprints of a run"""
+    # Older job files do not store the metrics
+    metrics = data.get("run_metrics") or get_run_metrics(data)
+    return {
+        "run_number": data.get("payu_current_run"),
+        "job_id": data.get("scheduler_job_id"),
+        "start_time": data.get("timings", {}).get("payu_start_time"),
+        "sypd": metrics.get("sypd"),
+        "core_hours_per_simulated_year": metrics.get(
+            "core_hours_per_simulated_year"
+        ),
+        "queue_wait_fraction": metrics.get("queue_wait_fraction"),
+        "simulated_years": metrics.get("simulated_years"),
+        "config": get_fingerprint(data.get("payu_config")),
+        "exe": get_fingerprint(get_exe_hashes(data)),
+        "job_file": str(job_file),
+    }
+
+
+def get_runs_perf_info(archive_path: Path) -> list[dict[str, Any]]:
+    """
+    Return the throughput information of the successful runs in the archive,
+    sorted by run number. If a run number was run more than once, the latest
+    successful run is used.
+    """
+    runs = {}
+    for job_file in get_job_file_list(archive_path, all_runs=True, type="run"):
+        data = read_job_file(job_file)
+        if data.get("payu_run_status") != 0:
+            continue
+        run_info = get_run_perf_info(job_file, data)
+        if run_info["run_number"] is None:
+            continue
+        previous = runs.get(run_info["run_number"])
+        if (previous is None or (run_info["start_time"] or "")
+                > (previous["start_time"] or "")):
+            runs[run_info["run_number"]] = run_info
+    return [runs[run_number] for run_number in sorted(runs)]
+
+
+def get_median(runs: list[dict[str, Any]], key: str) -> Optional[float]:
+    """Return the median of a metric over runs, ignoring missing values"""
+    values = [run[key] for run in runs if run.get(key) is not None]
+    return round(median(values), 4) if values else None
+
+
+def split_segments(
+            runs: list[dict[str, Any]]
+        ) -> list[list[dict[str, Any]]]:
+    """Split consecutive runs into segments with the same configuration
+    and executables"""
+    segments = []
+    for run in runs:
+        if (segments and run["config"] == segments[-1][-1]["config"]
+                and run["exe"] == segments[-1][-1]["exe"]):
+            segments[-1].append(run)
+        else:
+            segments.append([run])
+    return segments
+
+
+def detect_regressions(
+            runs: list[dict[str, Any]],
+            threshold: float = REGRESSION_THRESHOLD,
+        ) -> list[dict[str, Any]]:
+    """
+    Compare the median SYPD of runs after each configuration or executable
+    change with the runs before the change, and return the changes where
+    SYPD dropped by more than the threshold fraction.
+
+    Runs with a SYPD more than the threshold below the median of runs with
+    the same configuration and executables are marked as slow.
+    """
+    regressions = []
+    segments = split_segments(runs)
+    previous_segment = None
+    for segment in segments:
+        segment_sypd = get_median(segment, "sypd")
+        for run in segment:
+            run["slow"] = bool(
+                segment_sypd and run.get("sypd") is not None
+                and run["sypd"] < (1 - threshold) * segment_sypd
+            )
+
+        if previous_segment is not None:
+            previous_sypd = get_median(previous_segment, "sypd")
+            if previous_sypd and segment_sypd is not None:
+                change = (segment_sypd - previous_sypd) / previous_sypd
+                if change < -threshold:
+                    changed = []
+                    if segment[0]["config"] != previous_segment[-1]["config"]:
+                        changed.append("config")
+                    if segment[0]["exe"] != previous_segment[-1]["exe"]:
+                        changed.append("exe")
+                    regressions.append({
+                        "run_number": segment[0]["run_number"],
+                        "changed": changed,
+                        "previous_sypd": previous_sypd,
+                        "sypd": segment_sypd,
+                        "sypd_change_fraction": round(change, 4),
+                    })
+        previous_segment = segment
+    return regressions
+
+
+def build_perf_info(
+            archive_path: Path,
+            threshold: float = REGRESSION_THRESHOLD,
+        ) -> dict[str, Any]:
+    """
+    Generate a dictionary summarising the throughput of all successful runs.
+
+    Expected output format:
+    {
+        "runs": [{"run_number": 0, "sypd": 10.5, ...}, ...],
+        "summary": {"n_runs": 10, "sypd": 10.2, ...},
+        "regressions": [{"run_number": 5, "changed": ["exe"], ...}]
+    }
+    """
+    runs = get_runs_perf_info(archive_path)
+    regressions = detect_regressions(runs, threshold=threshold)
+    simulated_years = [run["simulated_years"] for run in runs
+                       if run.get("simulated_years") is not None]
+    return {
+        "runs": runs,
+        "summary": {
+            "n_runs": len(runs),
+            "simulated_years": round(sum(simulated_years), 4),
+            "sypd": get_median(runs, "sypd"),
+            "core_hours_per_simulated_year": get_median(
+                runs, "core_hours_per_simulated_year"
+            ),
+            "queue_wait_fraction": get_median(runs, "queue_wait_fraction"),
+        },
+        "regressions": regressions,
+    }
+
+
+def display_perf_info(data: dict[str, Any]) -> None:
+    """Display a table of run throughput, the median over runs and
+    any performance regressions"""
+    runs = data.get("runs", [])
+    if not runs:
+        print("No successful run information available.")
+        return
+
+    columns = [
+        ("Run", "run_number"),
+        ("Job ID", "job_id"),
+        ("SYPD", "sypd"),
+        ("Core-hours/SY", "core_hours_per_simulated_year"),
+        ("Queue Wait", "queue_wait_fraction"),
+        ("Config", "config"),
+        ("Exe", "exe"),
+        ("Slow", "slow"),
+    ]
+    rows = [dict(run, slow="yes" if run.get("slow") else "") for run in runs]
+    summary = dict(data.get("summary", {}), run_number="Median", slow="")
+    print(format_table(columns, rows, footer_rows=[summary]))
+
+    for regression in data.get("regressions", []):
+        changed = " and ".join(regression["changed"]) or "unknown"
+        print(f"Warning: SYPD dropped by "
+              f"{-regression['sypd_change_fraction']:.0%} from run "
+              f"{regression['run_number']} after {changed} changes "
+              f"({regression['previous_sypd']} -> {regression['sypd']})")
@@ -0,0 +1,126 @@
+"""
+Profiling of payu itself, enabled with the --profile-payu flag or the
+PAYU_PROFILE environment variable, to diagnose slow payu commands (e.g.
+setup or archive of large experiments) without modifying payu.
+
+This is separate from `payu profile`, which post-processes the profiling
+output of the models.
+
+The command is profiled with cProfile. The profile, and a summary of the
+slowest functions and the peak memory usage of payu, are written to the
+payu_jobs/<run> directory of the experiment archive, or to the current
+directory if the command did not load an experiment.
+"""
+
+import cProfile
+import datetime
+import io
+import os
+from pathlib import Path
+import pstats
+import resource
+import sys
+import time
+from typing import Any, Callable, Optional
+import warnings
+
+PROFILE_ENV = "PAYU_PROFILE"
+PROFILE_SUFFIX = ".prof"
+SUMMARY_SUFFIX = ".prof.txt"
+# Number of functions listed in the profile summary
+SUMMARY_N_FUNCTIONS = 40
+
+# Directory to write the profile to, set when an experiment is loaded
+_output_dir = None
+
+
+def is_profile_enabled(profile: Optional[bool] = None) -> bool:
+    """Return True if profiling is enabled by the --profile-payu flag, or
+    the PAYU_PROFILE environment variable (e.g. in submitted jobs)"""
+    if profile:
+        return True
+    return os.environ.get(PROFILE_ENV, "").lower() in ("1", "true", "yes")
+
+
+def set_output_dir(archive_path: Path, run_number: int) -> None:
+    """Write the profile to the payu_jobs/<run> directory of the archive.
+    Only the first experiment loaded by a command is used"""
+    global _output_dir
+    if _output_dir is None:
+        _output_dir = Path(archive_path) / "payu_jobs" / str(run_number)
+
+
+def get_output_dir() -> Path:
+    """Return the directory to write the profile to"""
+    return _output_dir if _output_dir is not None else Path.cwd()
+
+
+def get_peak_rss() -> dict[str, int]:
+    """Return the peak resident set size in bytes of payu, and of the
+    largest child process (e.g. the model run or collation)"""
+    # ru_maxrss is in kilobytes on Linux, but bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return {
+        "payu": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+        "children": (resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+                     * scale),
+    }
+
+
+def get_profile_path(command: str, output_dir: Path,
+                     start_time: datetime.datetime) -> Path:
+    """Return a unique path of the profile of a payu command"""
+    file_id = f"{start_time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+    return output_dir / f"payu-{command}-{file_id}{PROFILE_SUFFIX}"
+
+
+def format_summary(profiler: cProfile.Profile,
+                   command: str,
+                   duration: float,
+                   peak_rss: dict[str, int]) -> str:
+    """Return a summary of the profile with the slowest functions by
+    cumulative time"""
+    stream = io.StringIO()
+    stream.write(f"payu {command}\n")
+    stream.write(f"Command line: {' '.join(sys.argv)}\n")
+    stream.write(f"Wall time: {duration:.3f} s\n")
+    stream.write(f"Peak RSS (payu): {peak_rss['payu'] / 2**20:.1f} MiB\n")
+    stream.write(
+        f"Peak RSS (children): {peak_rss['children'] / 2**20:.1f} MiB\n\n"
+    )
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE)
+    stats.print_stats(SUMMARY_N_FUNCTIONS)
+    return stream.getvalue()
+
+
+def write_profile(profiler: cProfile.Profile,
+                  command: str,
+                  duration: float,
+                  start_time: datetime.datetime) -> Optional[Path]:
+    """Write the profile and its summary, and return the profile path"""
+    profile_path = get_profile_path(command, get_output_dir(), start_time)
+    summary = format_summary(profiler, command, duration, get_peak_rss())
+    try:
+        profile_path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(profile_path)
+        profile_path.with_suffix(SUMMARY_SUFFIX).write_text(summary)
+    except OSError as e:
+        warnings.warn(f"Failed to write payu profile {profile_path}: {e}")
+        return None
+
+    print(f"payu: Profile of payu {command} written to {profile_path}")
+    return profile_path
+
+
+def run_profiled(func: Callable, command: str, **args) -> Any:
+    """Run a payu command with cProfile, and write the profile even if
+    the command fails"""
+    profiler = cProfile.Profile()
+    start_time = datetime.datetime.now()
+    start = time.perf_counter()
+    try:
+        return profiler.runcall(func, **args)
+    finally:
+        write_profile(profiler, command, time.perf_counter() - start,
+                      start_time)
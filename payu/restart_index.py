@@ -0,0 +1,158 @@
+"""Index of restart directory datetimes in the experiment archive.
+
+Parsing a restart directory for its model datetime can require opening
+NetCDF files, calendar files or namelists, so parsed datetimes are stored
+in the archive and re-used while the restart directory is unmodified.
+
+:copyright: Copyright 2011 Marshall Ward, see AUTHORS for details.
+:license: Apache License, Version 2.0, see LICENSE for details.
+"""
+
+# Standard Library
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+import warnings
+
+# Extensions
+import cftime
+
+# Local
+from payu.fsops import atomic_write_file
+
+RESTART_INDEX_FILENAME = 'restart_index.json'
+RESTART_INDEX_VERSION = 1
+
+
+def datetime_to_entry(restart_dt: cftime.datetime) -> dict[str, Any]:
+    """Return a JSON serializable representation of a cftime datetime"""
+    return {
+        'datetime': [restart_dt.year, restart_dt.month, restart_dt.day,
+                     restart_dt.hour, restart_dt.minute, restart_dt.second,
+                     restart_dt.microsecond],
+        'calendar': restart_dt.calendar,
+    }
+
+
+def entry_to_datetime(entry: dict[str, Any]) -> cftime.datetime:
+    """Return the cftime datetime stored in an index entry"""
+    return cftime.datetime(*entry['datetime'], calendar=entry['calendar'])
+
+
+class RestartIndex():
+    """Cache of restart datetimes, keyed by restart directory name and
+    validated using the modification time of the restart directory.
+
+    Parameters
+    ----------
+    archive_path: Path or str
+        Path to the experiment archive
+    model_type: str
+        Model type used to parse restart datetimes. The index is discarded
+        if it was built by a different model driver
+    """
+
+    def __init__(self, archive_path: Union[Path, str], model_type: str):
+        self.archive_path = Path(archive_path)
+        self.path = self.archive_path / 'payu_jobs' / RESTART_INDEX_FILENAME
+        self.model_type = model_type
+        self.restarts = None
+        self.modified = False
+
+    def load(self) -> None:
+        """Read the index file, if it exists and is valid"""
+        self.restarts = {}
+        self.modified = False
+        if not self.path.is_file():
+            return
+
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            warnings.warn(f"Ignoring unreadable restart index {self.path}: "
+                          f"{e}")
+            return
+
+        if (data.get('version') == RESTART_INDEX_VERSION
+                and data.get('model_type') == self.model_type):
+            self.restarts = data.get('restarts', {})
+
+    def save(self) -> None:
+        """Write the index file if any entries have changed"""
+        if not self.modified:
+            return
+
+        data = {
+            'version': RESTART_INDEX_VERSION,
+            'model_type': self.model_type,
+            'restarts': self.restarts,
+        }
+        try:
+            atomic_write_file(file_path=self.path, data=data)
+        except OSError as e:
+            warnings.warn(f"Failed to write restart index {self.path}: {e}")
+        self.modified = False
+
+    def is_indexed(self, restart_path: Union[Path, str]) -> bool:
+        """Only restart directories directly in the archive are indexed"""
+        restart_path = Path(restart_path)
+        return (restart_path.parent.resolve() == self.archive_path.resolve()
+                and restart_path.name.startswith('restart'))
+
+    def get_datetime(
+                self,
+                restart_path: Union[Path, str],
+                parse_datetime: Callable[[str], cftime.datetime]
+            ) -> cftime.datetime:
+        """Return the datetime for a restart directory, using the indexed
+        value if the directory has not been modified since it was parsed.
+
+        Parameters
+        ----------
+        restart_path: Path or str
+            Path to the restart directory
+        parse_datetime: Callable
+            Function to parse a restart directory for a datetime, e.g. the
+            model driver's get_restart_datetime. Any errors are raised
+            and are not recorded in the index
+        """
+        if not self.is_indexed(restart_path):
+            return parse_datetime(restart_path)
+
+        if self.restarts is None:
+            self.load()
+
+        restart = Path(restart_path).name
+        mtime_ns = os.stat(restart_path).st_mtime_ns
+
+        entry = self.restarts.get(restart)
+        if entry is not None and entry.get('mtime_ns') == mtime_ns:
+            try:
+                return entry_to_datetime(entry)
+            except (KeyError, TypeError, ValueError):
+                pass
+
+        restart_dt = parse_datetime(restart_path)
+        if not isinstance(restart_dt, cftime.datetime):
+            # Only cftime datetimes are stored in the index
+            return restart_dt
+
+        entry = datetime_to_entry(restart_dt)
+        entry['mtime_ns'] = mtime_ns
+        self.restarts[restart] = entry
+        self.modified = True
+        return restart_dt
+
+    def prune(self, existing_restarts: Optional[list[str]] = None) -> None:
+        """Remove entries for restart directories that no longer exist"""
+        if self.restarts is None:
+            return
+        if existing_restarts is None:
+            existing_restarts = [r for r in self.restarts
+                                 if (self.archive_path / r).is_dir()]
+        for restart in list(self.restarts):
+            if restart not in existing_restarts:
+                del self.restarts[restart]
+                self.modified = True
@@ -33,6 +33,13 @@ PBSNODE_TIMEOUT = 60
 LOCK_TIMEOUT = 5
 LOCK_LIFETIME = 8
 
+# Cached qstat output is re-used for this many seconds by default
+QSTAT_CACHE_TTL = 10
+# qstat queries are retried for up to 10 seconds, so wait longer than this
+# for another process to finish querying
+QSTAT_LOCK_TIMEOUT = 20
+QSTAT_LOCK_LIFETIME = 30
+
 ureg = UnitRegistry()
 
 client = hpcpy.client.pbs.PBSClient()
@@ -48,6 +55,84 @@ def get_pbsnodes_cache_path() -> Path:
         cache_dir = os.environ.get('XDG_CACHE_HOME', Path.home() / ".cache")
         return Path(cache_dir) / "pbs" / "pbsnodes.json"
 
+def get_qstat_cache_path() -> Path:
+    """Get the path of qstat.json cache file,
+    If not set, then use default cache path."""
+    env_path = os.environ.get("PAYU_QSTAT_CACHE")
+    if env_path:
+        return Path(env_path)
+    else:
+        cache_dir = os.environ.get('XDG_CACHE_HOME', Path.home() / ".cache")
+        return Path(cache_dir) / "pbs" / "qstat.json"
+
+
+def get_qstat_cache_ttl() -> float:
+    """Get the number of seconds cached qstat output is re-used for.
+    Set PAYU_QSTAT_CACHE_TTL to 0 to disable the cache."""
+    try:
+        return float(os.environ.get("PAYU_QSTAT_CACHE_TTL", QSTAT_CACHE_TTL))
+    except ValueError:
+        warnings.warn("Invalid PAYU_QSTAT_CACHE_TTL, using default of "
+                      f"{QSTAT_CACHE_TTL} seconds")
+        return QSTAT_CACHE_TTL
+
+
+def read_qstat_cache(qstat_json_path: Path,
+                     ttl: float) -> Optional[Dict[str, Any]]:
+    """Return cached qstat output if it was queried less than ttl seconds
+    ago, otherwise None"""
+    try:
+        with qstat_json_path.open() as f:
+            cache = json.load(f)
+        age = datetime.now().timestamp() - cache.get("timestamp", 0)
+    except (OSError, json.JSONDecodeError, TypeError, AttributeError):
+        return None
+    if 0 <= age < ttl:
+        return cache.get("qstat")
+    return None
+
+
+def get_cached_job_info_json() -> Optional[Dict[str, Any]]:
+    """
+    Get full information of all jobs from qstat, re-using output cached by
+    any payu process in the last PAYU_QSTAT_CACHE_TTL seconds. Concurrent
+    payu processes wait on a lock for one process to query the scheduler,
+    so repeated `payu status` calls do not query the PBS server in quick
+    succession.
+    """
+    ttl = get_qstat_cache_ttl()
+    if ttl <= 0:
+        return get_job_info_json()
+
+    qstat_json_path = get_qstat_cache_path()
+    info = read_qstat_cache(qstat_json_path, ttl)
+    if info is not None:
+        return info
+
+    qstat_json_path.parent.mkdir(parents=True, exist_ok=True)
+    lock = SoftFileLock(str(qstat_json_path) + ".lock",
+                        lifetime=QSTAT_LOCK_LIFETIME,
+                        timeout=QSTAT_LOCK_TIMEOUT)
+    try:
+        with lock:
+            # Another process may have queried qstat while waiting
+            info = read_qstat_cache(qstat_json_path, ttl)
+            if info is not None:
+                return info
+
+            info = get_job_info_json()
+            if info is not None:
+                atomic_write_file(qstat_json_path, {
+                    "timestamp": datetime.now().timestamp(),
+                    "qstat": info,
+                })
+            return info
+    except Timeout:
+        warnings.warn(f"Could not acquire lock on qstat cache file "
+                      f"{qstat_json_path}. Querying qstat directly.")
+        return get_job_info_json()
+
+
 def check_pbsnode_file(pbsnodes_json_path):
     """ Check if pbsnodes.json file is recent (< 7 days) and rerun pbsnodes if not. """
     expire_day = 7
@@ -519,7 +604,7 @@ class PBS(Scheduler):
         Optional[Dict[str, Any]]
             Dictionary of information extracted from qstat output
         """
-        info = get_job_info_json()
+        info = get_cached_job_info_json()
         if info is None:
             return None
         metadata = {k: v for k, v in info.items() if k != "Jobs"}  
@@ -3,7 +3,12 @@ Methods used by the `payu status` command to display the status of
 payu runs by inspecting the job files generated for telemetry,
 scheduler stdout/stderr logs, and querying the scheduler
 """
+import copy
+import os
 from pathlib import Path
+import re
+import sys
+import time
 from typing import Any, Optional
 import warnings
 from datetime import datetime
@@ -15,13 +20,21 @@ from payu.schedulers import Scheduler
 from payu.telemetry import (
     read_job_file,
     update_job_file,
-    remove_job_file
+    remove_job_file,
+    read_job_index,
+    append_job_index,
+    get_job_index_entry,
+    JOB_INDEX_FILENAME,
 )
 from payu.sync import SyncToRemoteArchive
 import payu.errors as errors 
 
 logger = logging.getLogger(__name__)
 
+SECONDS_PER_DAY = 86400
+# Model throughput is reported in 365 day model years
+SECONDS_PER_MODEL_YEAR = 365 * SECONDS_PER_DAY
+
 def find_file_match(pattern: str, path: Path) -> Optional[Path]:
     """Find a file matching the pattern in the given path"""
     files = list(path.glob(pattern))
@@ -48,37 +61,155 @@ def get_scheduler_log(
     return file
 
 
+# Scheduler log file names, e.g. <jobname>.o<jobid> for PBS and
+# slurm-<jobid>.out for Slurm
+PBS_LOG_REGEX = re.compile(r"\.([oe])(\d+)$")
+SLURM_LOG_REGEX = re.compile(r"^slurm-(.+)\.(out|err)$")
+
+
+def get_scheduler_log_keys(
+            job_id: str,
+            type: str = "pbs"
+        ) -> Optional[tuple[str, str]]:
+    """Return the keys of the stdout and stderr log files of a scheduler job
+    ID in a scheduler log map"""
+    # TODO: Support non-default stderr and stdout file names
+    if type == "pbs":
+        # For PBS, the log files are named .o<jobid> and .e<jobid>
+        job_id = job_id.split(".")[0]  # Remove any suffix
+        return f".o{job_id}", f".e{job_id}"
+    elif type == "slurm":
+        # For Slurm, the default log files are named slurm-<jobid>.out
+        return f"slurm-{job_id}.out", f"slurm-{job_id}.err"
+    return None
+
+
+def get_scheduler_log_key(filename: str) -> Optional[str]:
+    """Return the key of a scheduler log file name in a scheduler log map,
+    or None if it is not a scheduler log"""
+    match = PBS_LOG_REGEX.search(filename)
+    if match:
+        return f".{match.group(1)}{match.group(2)}"
+    if SLURM_LOG_REGEX.match(filename):
+        return filename
+    return None
+
+
+def scan_scheduler_logs(
+            control_path: Path,
+            archive_path: Path,
+        ) -> dict[str, Path]:
+    """Scan the control path and the archive's pbs_logs path once, and
+    return a map of scheduler log keys to log files. Logs in the control
+    path take precedence over logs in pbs_logs"""
+    log_map: dict[str, Path] = {}
+    for path in [archive_path / "pbs_logs", control_path]:
+        path_logs: dict[str, list[Path]] = {}
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    key = get_scheduler_log_key(entry.name)
+                    if key is not None:
+                        path_logs.setdefault(key, []).append(Path(entry.path))
+        except FileNotFoundError:
+            continue
+
+        for key, files in path_logs.items():
+            if len(files) > 1:
+                warnings.warn(
+                    f"Multiple files found for pattern *{key} in path "
+                    f"{path}: {files}."
+                )
+            log_map[key] = files[0]
+    return log_map
+
+
 def find_scheduler_logs(
             job_id: str,
             control_path: Path,
             archive_path: Path,
             type: str = "pbs",
+            log_map: Optional[dict[str, Path]] = None,
         ) -> tuple[Optional[Path], Optional[Path]]:
-    """Find the stdout and stderr log files for the scheduler job ID"""
+    """Find the stdout and stderr log files for the scheduler job ID.
+    If a scheduler log map is given (see scan_scheduler_logs), the log files
+    are looked up in the map rather than searching the directories"""
     if not job_id:
         # No job ID - payu job could have run locally
         return None, None
 
-    # TODO: Support non-default stderr and stdout file names
-    if type == "pbs":
-        # For PBS, the log files are named .o<jobid> and .e<jobid>
-        job_id = job_id.split(".")[0]  # Remove any suffix
-        stdout_pattern = f"*.o{job_id}"
-        stderr_pattern = f"*.e{job_id}"
-    elif type == "slurm":
-        # For Slurm, the default log files are named slurm-<jobid>.out
-        stdout_pattern = f"slurm-{job_id}.out"
-        stderr_pattern = f"slurm-{job_id}.err"
-    else:
+    keys = get_scheduler_log_keys(job_id, type)
+    if keys is None:
         warnings.warn(f"Unsupported scheduler type: {type}")
         return None, None
+    stdout_key, stderr_key = keys
+
+    if log_map is not None:
+        return log_map.get(stdout_key), log_map.get(stderr_key)
 
     # Find the stdout and stderr log files
-    stdout_path = get_scheduler_log(stdout_pattern, control_path, archive_path)
-    stderr_path = get_scheduler_log(stderr_pattern, control_path, archive_path)
+    stdout_path = get_scheduler_log(f"*{stdout_key}", control_path,
+                                    archive_path)
+    stderr_path = get_scheduler_log(f"*{stderr_key}", control_path,
+                                    archive_path)
     return stdout_path, stderr_path
 
 
+def index_scheduler_logs(
+            archive_path: Path,
+            log_paths: list[Path],
+        ) -> None:
+    """Record the paths of scheduler logs moved to the archive's pbs_logs
+    (e.g. by payu sweep) in the job index, so they do not need to be
+    searched for"""
+    index = read_job_index(archive_path)
+    if not index or not log_paths:
+        return
+
+    moved_logs = {}
+    for log_path in log_paths:
+        key = get_scheduler_log_key(Path(log_path).name)
+        if key is not None:
+            moved_logs[key] = Path(log_path)
+
+    updated_entries = []
+    for entry in index.values():
+        if not entry.get("job_id"):
+            continue
+        keys = get_scheduler_log_keys(entry["job_id"],
+                                      entry.get("scheduler_type"))
+        if keys is None or keys[0] not in moved_logs:
+            continue
+        stdout, stderr = (moved_logs.get(key) for key in keys)
+        updated_entries.append(dict(
+            entry,
+            stdout_file=str(stdout),
+            stderr_file=str(stderr) if stderr else None
+        ))
+
+    if updated_entries:
+        append_job_index(Path(archive_path) / "payu_jobs" / JOB_INDEX_FILENAME,
+                         updated_entries)
+
+
+def get_indexed_scheduler_logs(
+            entry: dict[str, Any]
+        ) -> tuple[Optional[Path], Optional[Path]]:
+    """Return the stdout and stderr log files recorded in a job index
+    entry, if they still exist"""
+    stdout = entry.get("stdout_file")
+    if not stdout or not Path(stdout).exists():
+        return None, None
+    stderr = entry.get("stderr_file")
+    return Path(stdout), Path(stderr) if stderr else None
+
+
+def is_archived_log(log_path: Optional[Path], archive_path: Path) -> bool:
+    """Return True if a scheduler log is in the archive's pbs_logs"""
+    return (log_path is not None
+            and Path(log_path).parent == archive_path / "pbs_logs")
+
+
 def get_job_file_list(
             archive_path: Path,
             run_number: Optional[int] = None,
@@ -111,6 +242,57 @@ def get_job_file_list(
     latest_run = max(run_dirs, key=lambda d: int(d.name))
     return list(latest_run.glob(f"{type}/*.json"))
 
+def get_job_entries(
+            archive_path: Path,
+            run_number: Optional[int] = None,
+            all_runs: Optional[bool] = False,
+            type: str = "run"
+        ) -> list[tuple[Path, dict[str, Any]]]:
+    """
+    Return the job files and their status fields for the specified run
+    number, all runs, or the latest run.
+
+    Job files are always listed from the payu_jobs directory, so job files
+    that are not in the job-file index (e.g. written by older payu versions
+    or copied from another archive) are still found. The index is used to
+    avoid parsing job files that have not been modified since they were
+    indexed, and any new or modified job files are added to the index.
+    """
+    payu_jobs = archive_path / "payu_jobs"
+    index = read_job_index(archive_path)
+
+    entries = []
+    updated_entries = []
+    for file_path in get_job_file_list(archive_path, run_number,
+                                       all_runs, type=type):
+        entry = None
+        indexed_entry = None
+        if index is not None:
+            indexed_entry = index.get("/".join(file_path.parts[-3:]))
+        if indexed_entry is not None:
+            # Re-read job files modified outside of payu's job file updates
+            try:
+                mtime_ns = file_path.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue
+            if mtime_ns == indexed_entry.get("mtime_ns"):
+                entry = indexed_entry
+
+        if entry is None:
+            entry = get_job_index_entry(file_path, read_job_file(file_path))
+            if indexed_entry is not None:
+                entry.update({key: indexed_entry[key]
+                              for key in ("stdout_file", "stderr_file")
+                              if indexed_entry.get(key)})
+            updated_entries.append(entry)
+        entries.append((file_path, entry))
+
+    if index is not None and updated_entries:
+        append_job_index(payu_jobs / JOB_INDEX_FILENAME, updated_entries)
+
+    return entries
+
+
 def display_wait_time(qtime, stime) -> Optional[str]:
     """Calculate the difference between the submit queue time and the start time/current time (if job is in queue)"""
     if qtime is None and stime is None:
@@ -145,6 +327,34 @@ def _sort_run_jobs(run_info_one_type):
     ))
 
 
+def get_run_info(
+            job_type: str,
+            job_file: Path,
+            entry: dict[str, Any],
+            stdout: Optional[Path] = None,
+            stderr: Optional[Path] = None,
+        ) -> dict[str, Any]:
+    """Return the job information displayed by payu status from a job
+    file's index entry"""
+    run_info = {
+        "job_id": entry.get("job_id"),
+        "stage": entry.get("stage"),
+        "exit_status": entry.get("exit_status"),
+        "stdout_file": str(stdout) if stdout else None,
+        "stderr_file": str(stderr) if stderr else None,
+        "job_file": str(job_file),
+        "start_time": entry.get("start_time"),
+    }
+
+    if job_type == "run":
+        run_info.update({
+            "run_id": entry.get("run_id"),
+            "model_exit_status": entry.get("model_exit_status"),
+            "model_finish_time": entry.get("model_finish_time")
+        })
+    return run_info
+
+
 def build_job_info(
             archive_path: Path,
             control_path: Path,
@@ -178,47 +388,52 @@ def build_job_info(
     """
     status_data: dict[str, Any] = {}
     runs: dict[int, dict[str, list]] = {}
+    index_exists = (archive_path / "payu_jobs" / JOB_INDEX_FILENAME).exists()
+    learned_log_entries = []
+    # Scheduler logs are found using a single scan of the log directories,
+    # which is only done if a job's logs aren't in the job index
+    log_map = None
     for job_type in ["run", "collate"]:
-        job_files = get_job_file_list(archive_path, run_number, all_runs, type=job_type)
+        entries = get_job_entries(archive_path, run_number, all_runs,
+                                  type=job_type)
         # If no job files found for this type, skip to the next type
-        if not job_files:
+        if not entries:
             continue
 
-        for job_file in job_files:
-            data = read_job_file(job_file)
-
-            if "experiment_uuid" in data.get("experiment_metadata", {}):
-                uuid = data["experiment_metadata"]["experiment_uuid"]
-                status_data["experiment_uuid"] = uuid
-
-            stdout, stderr = find_scheduler_logs(
-                job_id=data.get("scheduler_job_id"),
-                control_path=control_path,
-                archive_path=archive_path,
-                type=data.get("scheduler_type")
-            )
-
-            run_info = {
-                "job_id": data.get("scheduler_job_id"),
-                "stage": data.get("stage"),
-                "exit_status": data.get(f"payu_{job_type}_status"),
-                "stdout_file": str(stdout) if stdout else None,
-                "stderr_file": str(stderr) if stderr else None,
-                "job_file": str(job_file),
-                "start_time": data.get("timings", {}).get("payu_start_time"),
-            }
+        for job_file, entry in entries:
+            if entry.get("experiment_uuid") is not None:
+                status_data["experiment_uuid"] = entry["experiment_uuid"]
 
-            if job_type == "run":
-                run_info.update({
-                    "run_id": data.get("payu_run_id"),
-                    "model_exit_status": data.get("payu_model_run_status"),
-                    "model_finish_time": data.get("model_finish_time")
-                })
+            stdout, stderr = get_indexed_scheduler_logs(entry)
+            if stdout is None and stderr is None and entry.get("job_id"):
+                if log_map is None:
+                    log_map = scan_scheduler_logs(control_path, archive_path)
+                stdout, stderr = find_scheduler_logs(
+                    job_id=entry.get("job_id"),
+                    control_path=control_path,
+                    archive_path=archive_path,
+                    type=entry.get("scheduler_type"),
+                    log_map=log_map
+                )
+                if index_exists and is_archived_log(stdout, archive_path):
+                    # Logs in the archive are not moved again, so record
+                    # them in the index
+                    learned_log_entries.append(dict(
+                        entry,
+                        stdout_file=str(stdout),
+                        stderr_file=str(stderr) if stderr else None
+                    ))
 
-            run_num = int(data["payu_current_run"])
+            run_info = get_run_info(job_type, job_file, entry,
+                                    stdout=stdout, stderr=stderr)
+            run_num = int(entry["run_number"])
             runs.setdefault(run_num, {})
             runs[run_num].setdefault(job_type, []).append(run_info)
 
+    if learned_log_entries:
+        append_job_index(archive_path / "payu_jobs" / JOB_INDEX_FILENAME,
+                         learned_log_entries)
+
     # If no job file found for any type, return {}
     if not runs:
         return {}
@@ -237,26 +452,55 @@ def build_job_info(
                 run_jobs[job_type] = [run_jobs[job_type][-1]]
 
     # Get the current model time for run jobs
-    latest_run_num = max(status_data["runs"].keys())
-    latest_run_info = status_data["runs"][latest_run_num]["run"][-1]
-    if latest_run_info.get("stage") == "model-run":
-        try:
-            cur_expt_time = expt.get_model_cur_expt_time()
-            if cur_expt_time is not None:
-                latest_run_info["cur_expt_time"] = cur_expt_time.isoformat()
-            else:
-                logger.debug("Cannot parse current experiment time: expected cftime.datetime but got None.")
-        except (FileNotFoundError, IndexError, OSError, json.JSONDecodeError, ValueError, NotImplementedError) as e:
-            logger.debug(f"Cannot parse current experiment time: {e}")
-        except Exception as e:
-            logger.warning(f"Unexpected error while parsing current experiment time: {e}")
+    latest_run_info = get_latest_run_info(status_data)
+    if expt is not None and latest_run_info.get("stage") == "model-run":
+        cur_expt_time = get_cur_expt_time(expt)
+        if cur_expt_time is not None:
+            latest_run_info["cur_expt_time"] = cur_expt_time.isoformat()
 
     return status_data
 
 
+def get_latest_run_info(status_data: dict[str, Any]) -> dict[str, Any]:
+    """Return the latest run job information, or {} if there is none"""
+    runs = status_data.get("runs", {})
+    if not runs:
+        return {}
+    latest_run_jobs = runs[max(runs.keys())].get("run", [])
+    return latest_run_jobs[-1] if latest_run_jobs else {}
+
+
+def get_cur_expt_time(expt):
+    """Return the current model time of a running experiment, or None
+    if it cannot be parsed from the model's output"""
+    try:
+        cur_expt_time = expt.get_model_cur_expt_time()
+        if cur_expt_time is None:
+            logger.debug("Cannot parse current experiment time: expected cftime.datetime but got None.")
+        return cur_expt_time
+    except (FileNotFoundError, IndexError, OSError, json.JSONDecodeError, ValueError, NotImplementedError) as e:
+        logger.debug(f"Cannot parse current experiment time: {e}")
+    except Exception as e:
+        logger.warning(f"Unexpected error while parsing current experiment time: {e}")
+    return None
+
+
+def is_job_file_current(
+            file_path: Path,
+            update_data: dict[str, Any],
+        ) -> bool:
+    """Return True if the job file already contains the update data"""
+    try:
+        data = read_job_file(file_path)
+    except (OSError, json.JSONDecodeError):
+        return False
+    return all(data.get(key) == value for key, value in update_data.items())
+
+
 def update_all_job_files(
             status_data: dict[str, Any],
-            scheduler: Scheduler
+            scheduler: Scheduler,
+            all_jobs: Optional[dict[str, Any]] = None,
         ) -> None:
     """
     Update job files in the queried job information.
@@ -266,13 +510,16 @@ def update_all_job_files(
     As this job queries the scheduler for running jobs, it is recommended to
     not run this method too frequently. NCI may consider repeated queries
     to the scheduler in quick succession as an attack. This is also why
-    this method only queries the scheduler once for all jobs
+    this method only queries the scheduler once for all jobs. Job information
+    already queried from the scheduler can be passed in using all_jobs, e.g.
+    to update the job files of multiple experiments with one query.
 
     TODO: Parse the stdout files to get the exit status - this will
     require specific scheduler methods.
     """
     # Get all jobs status and exit codes from the scheduler
-    all_jobs = scheduler.get_all_job_info()
+    if all_jobs is None:
+        all_jobs = scheduler.get_all_job_info()
     if all_jobs is None:
         warnings.warn("Failed to get job information from the scheduler")
         return
@@ -324,10 +571,14 @@ def update_all_job_files(
                 # Update the job file with the exit status if it has exited
                 update_data[f"payu_{job_type}_status"] = exit_status
 
-            update_job_file(
-                file_path=job_file,
-                data=update_data
-            )
+            # Only write the job file if the scheduler information has
+            # changed, as watch mode rebuilds job information for modified
+            # job files
+            if not is_job_file_current(job_file, update_data):
+                update_job_file(
+                    file_path=job_file,
+                    data=update_data
+                )
                 
         else:
             # Job not found in scheduler
@@ -340,7 +591,172 @@ def update_all_job_files(
                     file_path=job_file,
                     data={f"payu_{job_type}_status": 1}
                 )
-            
+
+def build_lab_job_info(
+            lab_archive_path: Path,
+            all_jobs: Optional[dict[str, Any]] = None,
+        ) -> dict[str, Any]:
+    """
+    Generate a dictionary of the latest run and collate jobs of every
+    experiment in a laboratory's archive, read from each experiment's
+    job-file index. If job information queried from the scheduler is
+    given, the scheduler state of each job is added.
+
+    Expected output format:
+    {
+        "experiments": {
+            "expt_name": {
+                "archive_path": "path/to/archive/expt_name",
+                "experiment_uuid": "uuid-string",
+                "runs": {
+                    "3(run_number)": {
+                        "run": [{"job_id": "12345", ...}],
+                        "collate": [{"job_id": "12346", ...}]
+                    }
+                }
+            }
+        }
+    }
+    """
+    experiments: dict[str, Any] = {}
+    if not lab_archive_path.is_dir():
+        return {"experiments": experiments}
+
+    for archive_path in sorted(lab_archive_path.iterdir()):
+        if not (archive_path / "payu_jobs").is_dir():
+            continue
+
+        expt_data: dict[str, Any] = {"archive_path": str(archive_path)}
+        runs: dict[int, dict[str, list]] = {}
+        for job_type in ["run", "collate"]:
+            for job_file, entry in get_job_entries(archive_path,
+                                                   type=job_type):
+                if entry.get("experiment_uuid") is not None:
+                    expt_data["experiment_uuid"] = entry["experiment_uuid"]
+                run_info = get_run_info(job_type, job_file, entry)
+                if all_jobs is not None:
+                    job_id = entry.get("job_id")
+                    job_info = all_jobs.get(job_id, {})
+                    run_info["job_state"] = (
+                        job_info.get("Jobs", {}).get(job_id, {})
+                        .get("job_state")
+                    )
+                run_num = int(entry["run_number"])
+                runs.setdefault(run_num, {})
+                runs[run_num].setdefault(job_type, []).append(run_info)
+
+        if not runs:
+            continue
+
+        # Only the latest job of each type is displayed
+        for run_jobs in runs.values():
+            for job_type, jobs in run_jobs.items():
+                _sort_run_jobs(jobs)
+                run_jobs[job_type] = [jobs[-1]]
+
+        expt_data["runs"] = dict(sorted(runs.items()))
+        experiments[archive_path.name] = expt_data
+
+    return {"experiments": experiments}
+
+
+def get_lab_job_ids(lab_data: dict[str, Any]) -> dict[str, str]:
+    """Return a map of scheduler job IDs to experiment names"""
+    return {
+        job_info["job_id"]: expt_name
+        for expt_name, expt_data in lab_data.get("experiments", {}).items()
+        for jobs in expt_data.get("runs", {}).values()
+        for job_list in jobs.values()
+        for job_info in job_list
+        if job_info.get("job_id")
+    }
+
+
+def update_lab_job_files(
+            lab_data: dict[str, Any],
+            scheduler: Scheduler
+        ) -> Optional[dict[str, Any]]:
+    """
+    Update the job files of every experiment in the laboratory status data
+    using a single query of the scheduler. Returns the queried job
+    information of the laboratory's jobs
+    """
+    all_jobs = scheduler.get_all_job_info()
+    if all_jobs is None:
+        warnings.warn("Failed to get job information from the scheduler")
+        return None
+
+    for expt_data in lab_data.get("experiments", {}).values():
+        update_all_job_files(expt_data, scheduler, all_jobs=all_jobs)
+
+    job_ids = get_lab_job_ids(lab_data)
+    return {job_id: job_info for job_id, job_info in all_jobs.items()
+            if job_id in job_ids}
+
+
+def display_lab_job_info(data: dict[str, Any]) -> None:
+    """Display a compact table of the latest jobs of each experiment"""
+    experiments = data.get("experiments", {})
+    if not experiments:
+        print("No experiment job information available.")
+        return
+
+    columns = [
+        ("Experiment", "experiment"),
+        ("Run", "run_number"),
+        ("Type", "job_type"),
+        ("Job ID", "job_id"),
+        ("Stage", "stage"),
+        ("State", "job_state"),
+        ("Exit", "exit_status"),
+        ("Model Finish Time", "model_finish_time"),
+    ]
+    rows = []
+    for expt_name, expt_data in experiments.items():
+        for run_number, jobs in expt_data.get("runs", {}).items():
+            for job_type, job_list in jobs.items():
+                for job_info in job_list:
+                    rows.append(dict(job_info, experiment=expt_name,
+                                     run_number=run_number,
+                                     job_type=job_type))
+
+    print(format_table(columns, rows))
+
+
+def format_table(
+            columns: list[tuple[str, str]],
+            rows: list[dict[str, Any]],
+            footer_rows: Optional[list[dict[str, Any]]] = None,
+        ) -> str:
+    """
+    Return a table with a (label, key) column for each of the columns and
+    a line for each row dictionary. Missing values are shown as "-". Any
+    footer rows (e.g. totals) are shown after a separator line.
+    """
+    def format_values(row):
+        return ["-" if row.get(key) is None else str(row[key])
+                for _, key in columns]
+
+    rows = [format_values(row) for row in rows]
+    footer_rows = [format_values(row) for row in footer_rows or []]
+    widths = [
+        max([len(label)] + [len(row[i]) for row in rows + footer_rows])
+        for i, (label, _) in enumerate(columns)
+    ]
+
+    def format_line(values):
+        return "  ".join(f"{value:<{width}}"
+                         for value, width in zip(values, widths)).rstrip()
+
+    header = "  ".join(f"{label:<{width}}"
+                       for (label, _), width in zip(columns, widths))
+    separator = "-" * len(header)
+    lines = [header, separator] + [format_line(row) for row in rows]
+    if footer_rows:
+        lines += [separator] + [format_line(row) for row in footer_rows]
+    return "\n".join(lines)
+
+
 def print_line(label: str, key: Any, data: dict[str, Any], is_status: bool = False, description: str = "") -> None:
     """Print a line with label and value from the data, if it is defined. 
     If is_status is True, print the status string (Success/Failed) as well."""
@@ -395,6 +811,7 @@ def display_job_info(data: dict[str, Any]) -> None:
 
                 if job_type == "run":
                     print_line("Current Expt Time", "cur_expt_time", job_info)
+                    print_line("Model Years/Day", "model_years_per_day", job_info)
                     print_line("Model Finish Time", "model_finish_time", job_info)
                     print_line("Model Exit Code", "model_exit_status", job_info, is_status=True)
                 
@@ -405,6 +822,167 @@ def display_job_info(data: dict[str, Any]) -> None:
     print("=" * line_width)
 
 
+def get_job_files_mtimes(
+            archive_path: Path,
+            run_number: Optional[int] = None,
+            all_runs: Optional[bool] = False,
+        ) -> dict[str, int]:
+    """Return the modification times of the run and collate job files
+    displayed by payu status"""
+    mtimes = {}
+    for job_type in ["run", "collate"]:
+        for job_file in get_job_file_list(archive_path, run_number,
+                                          all_runs, type=job_type):
+            try:
+                mtimes[str(job_file)] = job_file.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue
+    return mtimes
+
+
+def refresh_job_info(
+            data: Optional[dict[str, Any]],
+            mtimes: Optional[dict[str, int]],
+            archive_path: Path,
+            control_path: Path,
+            run_number: Optional[int] = None,
+            all_runs: Optional[bool] = False,
+        ) -> tuple[dict[str, Any], dict[str, int]]:
+    """Rebuild the job information only if any job files have been added,
+    removed or modified since the mtimes were recorded"""
+    cur_mtimes = get_job_files_mtimes(archive_path, run_number, all_runs)
+    if data is None or cur_mtimes != mtimes:
+        data = build_job_info(
+            archive_path=archive_path,
+            control_path=control_path,
+            run_number=run_number,
+            all_runs=all_runs,
+        )
+    return data, cur_mtimes
+
+
+def update_model_throughput(
+            throughput: dict[str, Any],
+            run_info: dict[str, Any],
+            cur_expt_time,
+            now: datetime,
+        ) -> Optional[float]:
+    """
+    Update the model throughput of a running job, in model years per day,
+    from the change in current model time since it was last seen to change.
+
+    throughput stores the job ID, model time and time it was last sampled,
+    and the latest model years per day. It is reset when the job changes.
+    """
+    job_id = run_info.get("job_id") or run_info.get("run_id")
+    if throughput.get("job_id") != job_id:
+        throughput.clear()
+        throughput["job_id"] = job_id
+
+    prev_expt_time = throughput.get("cur_expt_time")
+    if prev_expt_time is not None and cur_expt_time != prev_expt_time:
+        elapsed_days = ((now - throughput["time"]).total_seconds()
+                        / SECONDS_PER_DAY)
+        model_years = ((cur_expt_time - prev_expt_time).total_seconds()
+                       / SECONDS_PER_MODEL_YEAR)
+        if elapsed_days > 0:
+            throughput["model_years_per_day"] = round(
+                model_years / elapsed_days, 2
+            )
+
+    if prev_expt_time is None or cur_expt_time != prev_expt_time:
+        throughput["cur_expt_time"] = cur_expt_time
+        throughput["time"] = now
+
+    return throughput.get("model_years_per_day")
+
+
+def get_changed_runs(
+            data: dict[str, Any],
+            prev_data: Optional[dict[str, Any]],
+        ) -> dict[int, Any]:
+    """Return the runs whose job information differs from prev_data"""
+    prev_runs = (prev_data or {}).get("runs", {})
+    return {
+        run_num: jobs for run_num, jobs in data.get("runs", {}).items()
+        if prev_runs.get(run_num) != jobs
+    }
+
+
+def watch_job_info(
+            archive_path: Path,
+            control_path: Path,
+            interval: float,
+            run_number: Optional[int] = None,
+            all_runs: Optional[bool] = False,
+            expt=None,
+            scheduler: Optional[Scheduler] = None,
+            json_output: bool = False,
+            count: Optional[int] = None,
+        ) -> None:
+    """
+    Display the job information every interval seconds, only re-displaying
+    runs that have changed.
+
+    Job information is only rebuilt when the modification times of the job
+    files change. If a scheduler is passed, job files are updated from the
+    scheduler each refresh, which uses the scheduler's cached job
+    information where available (e.g. qstat.json for PBS). While a run is
+    in the model-run stage, the current model time is probed each refresh
+    and used to calculate the model years per day.
+    """
+    data = None
+    prev_data = None
+    mtimes = None
+    throughput = {}
+    iteration = 0
+    try:
+        while count is None or iteration < count:
+            if iteration > 0:
+                time.sleep(interval)
+            iteration += 1
+
+            # Copy so the previous job information is kept for comparison
+            data, mtimes = refresh_job_info(copy.deepcopy(data), mtimes,
+                                            archive_path, control_path,
+                                            run_number, all_runs)
+            if scheduler is not None and data:
+                update_all_job_files(data, scheduler)
+                data, mtimes = refresh_job_info(data, mtimes, archive_path,
+                                                control_path, run_number,
+                                                all_runs)
+
+            latest_run_info = get_latest_run_info(data)
+            if expt is not None and latest_run_info.get("stage") == "model-run":
+                now = datetime.now()
+                cur_expt_time = get_cur_expt_time(expt)
+                if cur_expt_time is not None:
+                    latest_run_info["cur_expt_time"] = cur_expt_time.isoformat()
+                    model_years_per_day = update_model_throughput(
+                        throughput, latest_run_info, cur_expt_time, now
+                    )
+                    if model_years_per_day is not None:
+                        latest_run_info["model_years_per_day"] = (
+                            model_years_per_day
+                        )
+
+            changed_runs = get_changed_runs(data, prev_data)
+            prev_data = data
+            if iteration > 1 and not changed_runs:
+                continue
+
+            timestamp = datetime.now().isoformat(timespec="seconds")
+            if json_output:
+                print(json.dumps({"timestamp": timestamp,
+                                  "runs": changed_runs}), flush=True)
+            else:
+                print(f"Updated: {timestamp}")
+                display_job_info({"runs": changed_runs})
+                sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+
+
 def collect_expt_paths(expt):
     """Find the experiment paths (control, lab, work, archive, sync) and return them in a dictionary"""
     expt_paths = {}
@@ -150,6 +150,19 @@ sync_ignore_last = {
     }
 }
 
+# Flag for verifying synced files against manifest hashes
+sync_verify = {
+    'flags': {'--verify'},
+    'parameters': {
+        'action':   'store_true',
+        'dest':     'sync_verify',
+        'default':  False,
+        'help':     'After syncing, verify synced files against the md5 \
+                     hashes stored in archived manifests and collate job \
+                     files.',
+    }
+}
+
 # Clone Repository
 repository = {
     'flags': [],
@@ -355,6 +368,44 @@ all_runs = {
     }
 }
 
+# Display the latest jobs of all experiments in the laboratory
+all_experiments = {
+    'flags': ['--all-experiments'],
+    'parameters': {
+        'dest': 'all_experiments',
+        'action': 'store_true',
+        'default': False,
+        'help': 'Display the latest jobs of all experiments in the laboratory'
+    }
+}
+
+# Continuously refresh payu status
+watch_status = {
+    'flags': ['--watch'],
+    'parameters': {
+        'dest': 'watch_interval',
+        'nargs': '?',
+        'const': 60,
+        'default': None,
+        'type': float,
+        'metavar': 'INTERVAL',
+        'help': 'Refresh the status every INTERVAL seconds (default 60), '
+                'only displaying runs that have changed'
+    }
+}
+
+# Rebuild the job-file index
+rebuild_job_index = {
+    'flags': ['--rebuild-index'],
+    'parameters': {
+        'dest': 'rebuild_index',
+        'action': 'store_true',
+        'default': False,
+        'help': 'Rebuild the index of job files in the archive, e.g. for '
+                'archives with job files written by older payu versions'
+    }
+}
+
 # Display specific run number
 run_number = {
     'flags': ['-n'],
@@ -389,6 +440,18 @@ log_level = {
     }
 }
 
+# Profile payu option
+profile_payu = {
+    'flags': ['--profile-payu'],
+    'parameters': {
+        'dest': 'profile_payu',
+        'action': 'store_true',
+        'default': False,
+        'help': 'Profile the payu command and write the profile to the '
+                'payu_jobs directory of the archive'
+    }
+}
+
 dry_run = {
     'flags': ['--dry-run'],
     'parameters': {
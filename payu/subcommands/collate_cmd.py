@@ -136,5 +136,7 @@ def runscript(**run_args):
             file_path=job_file_path,
             archive_path=Path(expt.archive_path),
             type="collate",
-            stage="exited"
+            stage="exited",
+            tracer=expt.tracer,
+            io_stats=expt.io_stats,
         )
@@ -0,0 +1,37 @@
+# coding: utf-8
+from contextlib import redirect_stdout
+import os
+from pathlib import Path
+import warnings
+import json
+
+from payu.metadata import MetadataWarning
+from payu.laboratory import Laboratory
+from payu.experiment import Experiment
+import payu.subcommands.args as args
+from payu.perf import build_perf_info, display_perf_info
+
+title = 'perf'
+parameters = {'description': 'Summarise the throughput of payu runs'}
+
+arguments = [args.laboratory, args.config, args.json_output]
+
+
+def runcmd(lab_path, config_path, json_output):
+
+    # Suppress output to os.devnull
+    with redirect_stdout(open(os.devnull, 'w')):
+        lab = Laboratory(config_path=config_path, lab_path=lab_path)
+        warnings.filterwarnings("error", category=MetadataWarning)
+
+        expt = Experiment(lab, config_path=config_path)
+
+    data = build_perf_info(Path(expt.archive_path))
+
+    if json_output:
+        print(json.dumps(data, indent=4))
+    else:
+        display_perf_info(data)
+
+
+runscript = runcmd
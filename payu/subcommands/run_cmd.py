@@ -13,7 +13,7 @@ from payu.laboratory import Laboratory
 import payu.subcommands.args as args
 from payu import fsops
 from payu.manifest import Manifest
-from payu.telemetry import record_run
+from payu.telemetry import record_run, flush_telemetry_spool
 from payu.schedulers.pbs import PBS
 import payu.errors as errors
 
@@ -185,6 +185,11 @@ def runcmd(model_type, config_path, init_run, n_runs, lab_path,
 
     cli.submit_job('payu-run', pbs_config, pbs_vars, expt, current_run, type='run', dry_run=dry_run)
 
+    if not dry_run:
+        # Retry any telemetry queued by earlier runs on compute nodes
+        # without network access
+        flush_telemetry_spool(Path(expt.archive_path), expt.config)
+
 
 def runscript(**run_args):
     run_args = argparse.Namespace(**run_args)
@@ -220,6 +225,8 @@ def runscript(**run_args):
                 config=expt.config,
                 file_path=expt.job_file,
                 archive_path=Path(expt.archive_path),
+                tracer=expt.tracer,
+                io_stats=expt.io_stats,
             )
 
         # Finished runs
@@ -18,6 +18,15 @@ from payu.status import (
     update_all_job_files,
     collect_expt_paths,
     display_expt_paths,
+    build_lab_job_info,
+    update_lab_job_files,
+    display_lab_job_info,
+    watch_job_info,
+)
+from payu.telemetry import (
+    rebuild_job_index,
+    flush_telemetry_spool,
+    SPOOL_INTERACTIVE_TIME_LIMIT,
 )
 from payu.schedulers import index as scheduler_index, DEFAULT_SCHEDULER_CONFIG
 
@@ -26,11 +35,17 @@ parameters = {'description': 'Display payu run information'}
 
 arguments = [
     args.laboratory, args.config, args.json_output, args.update_jobs,
-    args.all_runs, args.run_number, args.show_expt_paths
+    args.all_runs, args.run_number, args.show_expt_paths,
+    args.rebuild_job_index, args.all_experiments, args.watch_status
 ]
 
 def runcmd(lab_path, config_path, json_output,
-           update_jobs, all_runs, run_number, show_expt_paths=False):
+           update_jobs, all_runs, run_number, show_expt_paths=False,
+           rebuild_index=False, all_experiments=False, watch_interval=None):
+
+    if all_experiments:
+        lab_status(lab_path, config_path, json_output, update_jobs)
+        return
 
     # Suppress output to os.devnull
     with redirect_stdout(open(os.devnull, 'w')):
@@ -53,6 +68,28 @@ def runcmd(lab_path, config_path, json_output,
 
     run_number = int(run_number) if run_number is not None else None
 
+    if rebuild_index:
+        rebuild_job_index(archive_path)
+
+    # Retry any telemetry queued by runs on compute nodes without
+    # network access. This is only done once, before any watch refreshes,
+    # and the time spent is limited as status is interactive
+    flush_telemetry_spool(archive_path, expt.config,
+                          time_limit=SPOOL_INTERACTIVE_TIME_LIMIT)
+
+    if watch_interval is not None:
+        watch_job_info(
+            archive_path=archive_path,
+            control_path=control_path,
+            interval=watch_interval,
+            run_number=run_number,
+            all_runs=all_runs,
+            expt=expt,
+            scheduler=expt.scheduler if update_jobs else None,
+            json_output=json_output
+        )
+        return
+
     data = build_job_info(
         control_path=control_path,
         archive_path=archive_path,
@@ -80,4 +117,28 @@ def runcmd(lab_path, config_path, json_output,
     else:
         display_job_info(data)
 
+
+def lab_status(lab_path, config_path, json_output, update_jobs):
+    """Display the latest jobs of all experiments in the laboratory, with
+    at most one query of the scheduler"""
+    with redirect_stdout(open(os.devnull, 'w')):
+        lab = Laboratory(config_path=config_path, lab_path=lab_path)
+    config = read_config(config_path)
+    lab_archive_path = Path(lab.archive_path)
+
+    data = build_lab_job_info(lab_archive_path)
+    if update_jobs:
+        scheduler_name = config.get('scheduler', DEFAULT_SCHEDULER_CONFIG)
+        scheduler = scheduler_index[scheduler_name]()
+        # Query the scheduler once to update the job files of all
+        # experiments
+        all_jobs = update_lab_job_files(data, scheduler)
+        data = build_lab_job_info(lab_archive_path, all_jobs=all_jobs)
+
+    if json_output:
+        print(json.dumps(data, indent=4))
+    else:
+        display_lab_job_info(data)
+
+
 runscript = runcmd
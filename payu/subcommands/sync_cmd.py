@@ -15,11 +15,12 @@ title = 'sync'
 parameters = {'description': 'Sync model output to a remote directory'}
 
 arguments = [args.model, args.config, args.initial, args.laboratory, args.dir_path,
-             args.sync_restarts, args.sync_ignore_last, args.dry_run]
+             args.sync_restarts, args.sync_ignore_last, args.sync_verify,
+             args.dry_run]
 
 
 def runcmd(model_type, config_path, init_run, lab_path, dir_path, sync_restarts,
-           sync_ignore_last, dry_run=False):
+           sync_ignore_last, sync_verify=False, dry_run=False):
 
     pbs_config = fsops.read_config(config_path)
 
@@ -27,7 +28,8 @@ def runcmd(model_type, config_path, init_run, lab_path, dir_path, sync_restarts,
                                 lab_path=lab_path,
                                 dir_path=dir_path,
                                 sync_restarts=sync_restarts,
-                                sync_ignore_last=sync_ignore_last)
+                                sync_ignore_last=sync_ignore_last,
+                                sync_verify=sync_verify)
 
     sync_config = pbs_config.get('sync', {})
 
@@ -70,7 +72,8 @@ def runscript(**run_args):
                                 lab_path=run_args.lab_path,
                                 dir_path=run_args.dir_path,
                                 sync_restarts=run_args.sync_restarts,
-                                sync_ignore_last=run_args.sync_ignore_last)
+                                sync_ignore_last=run_args.sync_ignore_last,
+                                sync_verify=run_args.sync_verify)
 
     for var in pbs_vars:
         os.environ[var] = str(pbs_vars[var])
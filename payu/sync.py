@@ -5,20 +5,34 @@
 """
 
 # Standard
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import fcntl
+import fnmatch
+import hashlib
+import json
 import warnings
 import glob
 import os
+import re
 import shutil
 import subprocess
+import tempfile
+import threading
 from ruamel.yaml import YAML
 from pathlib import Path
 import time
 
+from yamanifest.hashing import hash
 
 # Local
-from payu.fsops import list_sorted_archive_dirs
+from payu.fsops import list_sorted_archive_dirs, atomic_write_file
+from payu.manifest import PayuManifest
 from payu.metadata import METADATA_FILENAME, UUID_FIELD
+from payu.models.fms import COLLATE_JOURNAL_DIRNAME
 import payu.errors as errors 
+from payu import telemetry
 
 DEST_NOT_CONFIGURED_MSG ="""
 There's is no configured `base_path` or `path` to sync output to.
@@ -32,6 +46,373 @@ In config.yaml, set either the `base_path` or `path`:
         path: PATH/TO/REMOTE/ARCHIVE/EXPT-NAME
 """
 
+# Line in rsync --stats output with the total size of transferred files
+TRANSFERRED_BYTES_REGEX = re.compile(
+    r'^Total transferred file size: ([\d,.]+) bytes', re.MULTILINE
+)
+
+
+def parse_transferred_bytes(rsync_output):
+    """Return the total size of transferred files from rsync --stats
+    output, or None if it is not found"""
+    match = TRANSFERRED_BYTES_REGEX.search(rsync_output)
+    if match is None:
+        return None
+    try:
+        return int(match.group(1).replace(',', '').replace('.', ''))
+    except ValueError:
+        return None
+
+
+# Number of lines kept from the end of rsync output, to parse the --stats
+# summary, as the full output is streamed to the job log
+RSYNC_OUTPUT_TAIL_LINES = 50
+
+
+def stream_command(cmd, prefix=''):
+    """Run a shell command and print its combined stdout and stderr line by
+    line as it is produced, with an optional prefix on each line. Returns
+    the completed process, with the last lines of output as stdout"""
+    tail = deque(maxlen=RSYNC_OUTPUT_TAIL_LINES)
+    with subprocess.Popen(cmd, shell=True, text=True, bufsize=1,
+                          stdout=subprocess.PIPE,
+                          stderr=subprocess.STDOUT) as process:
+        for line in process.stdout:
+            print(f'{prefix}{line}', end='', flush=True)
+            tail.append(line)
+    return subprocess.CompletedProcess(cmd, process.returncode,
+                                       stdout=''.join(tail))
+
+
+SYNC_INDEX_FILENAME = 'sync_index.json'
+SYNC_INDEX_VERSION = 1
+SYNC_JOURNAL_FILENAME = 'sync_journal.jsonl'
+
+# Bookkeeping files of the local archive in the payu_jobs directory, which
+# are not synced to the destination
+PAYU_JOBS_EXCLUDES = [
+    f'/payu_jobs/{SYNC_INDEX_FILENAME}',
+    f'/payu_jobs/{SYNC_JOURNAL_FILENAME}',
+    f'/payu_jobs/{COLLATE_JOURNAL_DIRNAME}/',
+]
+
+
+def get_dir_fingerprint(path):
+    """Return a fingerprint of the contents of a directory: the number of
+    files, their total size, and a hash of the relative path, size and
+    modification time of each file"""
+    entries = []
+    nbytes = 0
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for fname in sorted(files):
+            file_path = os.path.join(root, fname)
+            try:
+                st = os.lstat(file_path)
+            except FileNotFoundError:
+                continue
+            nbytes += st.st_size
+            entries.append(f'{os.path.relpath(file_path, path)}:'
+                           f'{st.st_size}:{st.st_mtime_ns}')
+
+    return {
+        'nfiles': len(entries),
+        'nbytes': nbytes,
+        'hash': hashlib.md5('\n'.join(entries).encode()).hexdigest(),
+    }
+
+
+class SyncIndex():
+    """Index of archive directories which have been successfully synced,
+    stored in the archive's payu_jobs directory. Directories are only
+    synced again if their content fingerprint has changed, or they were
+    synced to a different destination or with different rsync options.
+
+    Parameters
+    ----------
+    archive_path: str
+        Path to the experiment archive
+    """
+
+    def __init__(self, archive_path):
+        self.archive_path = archive_path
+        self.path = Path(archive_path) / 'payu_jobs' / SYNC_INDEX_FILENAME
+        self.paths = {}
+        self.load()
+
+    def load(self):
+        """Read the index file, if it exists and is valid"""
+        self.paths = {}
+        if not self.path.is_file():
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            warnings.warn(f"Ignoring unreadable sync index {self.path}: {e}")
+            return
+        if data.get('version') == SYNC_INDEX_VERSION:
+            self.paths = data.get('paths', {})
+
+    def save(self):
+        """Write the index, removing entries of directories that no longer
+        exist locally"""
+        self.paths = {
+            path: entry for path, entry in self.paths.items()
+            if os.path.isdir(os.path.join(self.archive_path, path))
+        }
+        data = {'version': SYNC_INDEX_VERSION, 'paths': self.paths}
+        try:
+            atomic_write_file(file_path=self.path, data=data)
+        except OSError as e:
+            warnings.warn(f"Failed to write sync index {self.path}: {e}")
+
+    def get_key(self, path):
+        return os.path.relpath(path, self.archive_path)
+
+    def is_synced(self, path, fingerprint, signature):
+        """Return True if a directory was synced with the same contents,
+        destination and rsync options"""
+        entry = self.paths.get(self.get_key(path))
+        return (entry is not None
+                and entry.get('fingerprint') == fingerprint
+                and entry.get('signature') == signature)
+
+    def record(self, path, fingerprint, signature):
+        """Record a directory as successfully synced"""
+        self.paths[self.get_key(path)] = {
+            'fingerprint': fingerprint,
+            'signature': signature,
+        }
+
+
+class SyncJournal():
+    """Write-ahead journal of a sync, stored in the archive's payu_jobs
+    directory. An event is appended for each source path when its transfer
+    starts, is transferred or fails, and is removed locally. The journal is
+    removed once all paths have been synced successfully, and is not synced
+    itself.
+
+    Parameters
+    ----------
+    archive_path: str
+        Path to the experiment archive
+    """
+
+    def __init__(self, archive_path):
+        self.path = Path(archive_path) / 'payu_jobs' / SYNC_JOURNAL_FILENAME
+        self.lock = threading.Lock()
+
+    def load(self):
+        """Return the last recorded event of each path in the journal. The
+        journal is compacted to these events, so it doesn't grow when a path
+        fails on every sync"""
+        paths = {}
+        if not self.path.is_file():
+            return paths
+        nlines = 0
+        with open(self.path, 'r') as f:
+            for line in f:
+                nlines += 1
+                try:
+                    record = json.loads(line)
+                    paths[record['path']] = record
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    # Ignore a partially written record
+                    continue
+        if nlines > len(paths):
+            self.compact(paths.values())
+        return paths
+
+    def compact(self, records):
+        """Replace the journal with the given records"""
+        with self.lock:
+            with tempfile.NamedTemporaryFile(
+                mode='w', dir=self.path.parent, delete=False
+            ) as f:
+                for record in records:
+                    f.write(json.dumps(record) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(f.name, self.path)
+
+    def append(self, event, path, **info):
+        """Append an event to the journal, flushed to disk before
+        continuing"""
+        record = {
+            'time': datetime.datetime.now().isoformat(),
+            'event': event,
+            'path': path,
+        }
+        record.update(info)
+        with self.lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+    def remove(self):
+        if self.path.exists():
+            self.path.unlink()
+
+
+# Linux ioctl to clone a file's data blocks (a reflink)
+FICLONE = 0x40049409
+
+
+def is_excluded(rel_path, patterns):
+    """Return True if a path, relative to the parent of a synced source path,
+    matches a rsync-style exclude pattern. Patterns without a slash match the
+    file name at any depth"""
+    name = os.path.basename(rel_path)
+    for pattern in patterns:
+        pattern = pattern.rstrip('/')
+        if '/' in pattern:
+            if fnmatch.fnmatch(rel_path, pattern.lstrip('/')):
+                return True
+        elif fnmatch.fnmatch(name, pattern):
+            return True
+    return False
+
+
+def copy_file_data(src, dst):
+    """Copy a file's data, using copy_file_range so the copy is done by the
+    kernel (or server side on network filesystems) where supported"""
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        try:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(),
+                                            remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+            return
+        except (AttributeError, OSError):
+            # copy_file_range is unavailable or not supported between
+            # these filesystems
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+        shutil.copyfileobj(fsrc, fdst)
+
+
+def transfer_file(src, dst, hardlinks=True):
+    """Transfer a file to the destination, replacing any existing file.
+    Files are hardlinked or reflinked if source and destination are on the
+    same device, otherwise the data is copied. Returns the method used"""
+    tmp_path = f'{dst}.payu-sync-tmp'
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+
+    same_device = (os.stat(src).st_dev
+                   == os.stat(os.path.dirname(dst)).st_dev)
+    method = None
+    if same_device and hardlinks:
+        try:
+            os.link(src, tmp_path)
+            method = 'linked'
+        except OSError:
+            pass
+
+    if method is None and same_device:
+        try:
+            with open(src, 'rb') as fsrc, open(tmp_path, 'wb') as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            method = 'reflinked'
+        except OSError:
+            pass
+
+    if method is None:
+        copy_file_data(src, tmp_path)
+        method = 'copied'
+
+    if method != 'linked':
+        # Preserve permissions and modification times, as with rsync -pt
+        shutil.copystat(src, tmp_path)
+    os.replace(tmp_path, dst)
+    return method
+
+
+def is_up_to_date(src, dst):
+    """Quick check used by rsync: a destination file with the same size and
+    modification time is not transferred again"""
+    try:
+        src_stat = os.stat(src)
+        dst_stat = os.lstat(dst)
+    except FileNotFoundError:
+        return False
+    return (src_stat.st_size == dst_stat.st_size
+            and src_stat.st_mtime_ns == dst_stat.st_mtime_ns)
+
+
+def verify_file(src, dst, verify='size'):
+    """Return True if the destination file matches the source file's size,
+    and its md5 hash if verify is 'md5'"""
+    if os.path.getsize(src) != os.path.getsize(dst):
+        return False
+    if verify == 'md5' and not os.path.samefile(src, dst):
+        return hash(src, hashfn='md5') == hash(dst, hashfn='md5')
+    return True
+
+
+def get_manifest_md5s(destination_path, archive_path):
+    """Return md5 hashes stored in the manifests of synced output
+    directories, keyed by the path, relative to the archive, of each file
+    which is stored in the archive (e.g. restart files)"""
+    archive_path = os.path.realpath(archive_path)
+    md5s = {}
+    manifest_paths = sorted(glob.glob(
+        os.path.join(destination_path, 'output*', 'manifests', '*.yaml')))
+    for manifest_path in manifest_paths:
+        manifest = PayuManifest(manifest_path)
+        try:
+            manifest.load()
+        except Exception as e:
+            print(f'Error loading manifest {manifest_path}: {e}')
+            continue
+        for filepath in manifest:
+            md5 = manifest.get(filepath, 'md5')
+            fullpath = manifest.fullpath(filepath)
+            if not md5 or fullpath is None:
+                continue
+            rel_path = os.path.relpath(os.path.realpath(fullpath),
+                                       archive_path)
+            if not rel_path.startswith(os.pardir):
+                md5s[rel_path] = {
+                    'md5': md5,
+                    'manifest': os.path.relpath(manifest_path,
+                                                destination_path),
+                }
+    return md5s
+
+
+def get_collate_mappings(destination_path):
+    """Return the collate mappings of synced collate job files, from the
+    md5 hash of each collated restart file to the md5 hashes of its tiles,
+    keyed by restart directory"""
+    mappings = {}
+    job_files = glob.glob(os.path.join(destination_path, 'payu_jobs', '*',
+                                       'collate', '*.json'))
+    for job_file in sorted(job_files):
+        try:
+            data = telemetry.read_job_file(Path(job_file))
+        except (OSError, json.JSONDecodeError) as e:
+            print(f'Error reading job file {job_file}: {e}')
+            continue
+        for restart_dir, mapping in data.get('collate_mapping', {}).items():
+            mappings.setdefault(restart_dir, {}).update(mapping)
+    return mappings
+
+
+def hash_md5(path):
+    """Return the md5 hash of a file, or None if it does not exist"""
+    if not os.path.isfile(path):
+        return None
+    return hash(path, hashfn='md5')
+
+
 class SourcePath():
     """Helper class for building rsync commands - stores attributes
     of source paths to sync.
@@ -39,10 +420,13 @@ class SourcePath():
     locally if still running an experiment - i.e last output or last
     permanently archived and subsequent restarts
     """
-    def __init__(self, path, protected=False, is_log_file=False):
+    def __init__(self, path, protected=False, is_log_file=False,
+                 excludes=None):
         self.protected = protected
         self.path = path
         self.is_log_file = is_log_file
+        # Exclude patterns specific to this path
+        self.excludes = excludes or []
 
 def filter_previous_runs(all_dir, prefix):
     """Given a list of directories of all runs (e.g., ['output001', 'output002']), 
@@ -76,12 +460,48 @@ class SyncToRemoteArchive():
         # Ignore the latest output/restart if flagged
         self.ignore_last = os.environ.get('PAYU_SYNC_IGNORE_LAST', False)
 
+        # Verify synced files against manifest and collate hashes if flagged
+        self.verify_sync = os.environ.get('PAYU_SYNC_VERIFY', False)
+        self.verification = None
+
         # Use configured url to flag syncing to remote machine
         self.remote_url = self.config.get('url', None)
         self.remote_syncing = self.remote_url is not None
 
         self.source_paths = []
 
+        # Number of rsync commands run concurrently
+        self.workers = max(int(self.config.get('workers', 1)), 1)
+
+        # Transfer time and bytes of each synced source path
+        self.sync_paths = {}
+
+        # Sync to a local destination using rsync, or by linking or copying
+        # files directly
+        self.engine = self.config.get('engine', 'rsync')
+        self.hardlinks = self.config.get('hardlinks', True)
+        self.verify = self.config.get('local_verify', 'size')
+
+        # Sync output and restart directories using a single rsync command
+        # for unprotected paths and another for protected paths
+        self.batch = self.config.get('batch', False)
+        self.sync_batches = {}
+
+        # Optionally skip archive directories that are unchanged since the
+        # last sync
+        self.index = None
+        if self.config.get('index', False):
+            self.index = SyncIndex(self.expt.archive_path)
+        self.skipped_paths = []
+
+        # Write-ahead journal of transfers and local removals, so an
+        # interrupted sync can be resumed
+        self.journal = SyncJournal(self.expt.archive_path)
+        self.previous_journal = {}
+        self.resumed_paths = []
+        self.fingerprints = {}
+        self.signatures = {}
+
     def add_outputs_to_sync(self):
         """Add paths of outputs in archive to sync. The last output is
         protected"""
@@ -223,6 +643,7 @@ class SyncToRemoteArchive():
             exclude = [exclude]
 
         excludes = ' '.join(['--exclude ' + pattern for pattern in exclude])
+        self.exclude_patterns = list(exclude)
 
         # Default to not exclude uncollated files
         exclude_uncollated = self.config.get('exclude_uncollated', False)
@@ -230,6 +651,7 @@ class SyncToRemoteArchive():
         if (exclude_uncollated and exclude_flag not in excludes
                 and exclude_flag not in self.config.get('rsync_flags', [])):
             excludes += f" {exclude_flag}" if excludes != "" else exclude_flag
+            self.exclude_patterns.append('*.nc.*')
 
         self.excludes = excludes
 
@@ -241,30 +663,458 @@ class SyncToRemoteArchive():
             cmd += f' {self.remove_files}'
         if not source_path.is_log_file:
             cmd += f' {self.excludes}'
+        for pattern in source_path.excludes:
+            cmd += f' --exclude {pattern}'
 
         cmd += f' {source_path.path} {self.destination_path}'
         return cmd
 
-    def run_cmd(self, source_path):
-        """Given an source path, build and run rsync command"""
-        cmd = self.build_cmd(source_path)
+    def run_rsync(self, cmd, label):
+        """Run a rsync command, streaming its output to the job log.
+        Returns the transfer time, bytes and rsync return code of the
+        command"""
         print(f"Running command: {cmd}")
-        try:
-            subprocess.check_call(cmd, shell=True)
-        except subprocess.CalledProcessError as e:
+
+        # Prefix the output of concurrent rsync commands, as their lines
+        # are interleaved
+        prefix = f'[{label}] ' if self.workers > 1 else ''
+        start_time = time.perf_counter()
+        result = stream_command(cmd, prefix=prefix)
+        sync_info = {
+            'duration_seconds': time.perf_counter() - start_time,
+            'transferred_bytes': parse_transferred_bytes(result.stdout),
+            'returncode': result.returncode,
+        }
+
+        if result.returncode != 0:
             warnings.warn(
                 'Error rsyncing archive to remote directory.\n '
                 f'Failed running command: {cmd}.\n'
-                f'Error: {e}'
+                f'Error: Command returned non-zero exit status '
+                f'{result.returncode}'
             )
+        return sync_info
+
+    def record_transfer(self, source_path, sync_info):
+        """Record the result of syncing a source path in the journal, and
+        remove the path locally if the transfer succeeded"""
+        path = source_path.path
+        if sync_info['returncode'] != 0:
+            self.journal.append('failed', path, **sync_info)
             return
 
+        transfer_info = dict(sync_info)
+        if path in self.signatures:
+            # Record the directory's contents after the transfer, as files
+            # may have been removed using --remove-source-files
+            transfer_info.update({
+                'fingerprint': self.fingerprints.get(path),
+                'transferred_fingerprint': get_dir_fingerprint(path),
+                'signature': self.signatures[path],
+            })
+        self.journal.append('transferred', path, **transfer_info)
+
+        self.remove_local_dir(source_path)
+
+    def list_local_files(self, source_path):
+        """Return (source, destination) pairs of files and symbolic links
+        to sync with the local engine, and destination directories to
+        create"""
+        excludes = [] if source_path.is_log_file else self.exclude_patterns
+        excludes = excludes + source_path.excludes
+        files, dirs = [], []
+        for src in sorted(glob.glob(source_path.path)):
+            parent = os.path.dirname(src)
+            dest = os.path.join(self.destination_path, os.path.basename(src))
+            if not os.path.isdir(src) or os.path.islink(src):
+                files.append((src, dest))
+                continue
+
+            dirs.append(dest)
+            for root, subdirs, fnames in os.walk(src):
+                for name in sorted(subdirs):
+                    path = os.path.join(root, name)
+                    if (is_excluded(os.path.relpath(path, parent), excludes)
+                            or os.path.islink(path)):
+                        # os.walk doesn't follow symbolic links to
+                        # directories, so they are synced as links
+                        subdirs.remove(name)
+                        if os.path.islink(path):
+                            fnames.append(name)
+                        continue
+                    dirs.append(os.path.join(dest,
+                                             os.path.relpath(path, src)))
+                for name in sorted(fnames):
+                    path = os.path.join(root, name)
+                    if is_excluded(os.path.relpath(path, parent), excludes):
+                        continue
+                    files.append((path, os.path.join(
+                        dest, os.path.relpath(path, src))))
+        return files, dirs
+
+    def sync_local_file(self, src, dst, remove_source):
+        """Sync a file to a local destination. Returns the transfer method
+        and number of bytes transferred"""
+        if os.path.islink(src):
+            # Only copy links which stay within the synced tree, as with
+            # rsync --safe-links
+            target = os.readlink(src)
+            dest_root = os.path.normpath(self.destination_path)
+            resolved = os.path.normpath(
+                os.path.join(os.path.dirname(dst), target))
+            if (os.path.isabs(target)
+                    or not resolved.startswith(dest_root + os.sep)):
+                return 'skipped', 0
+            if os.path.lexists(dst):
+                if os.path.islink(dst) and os.readlink(dst) == target:
+                    return 'unchanged', 0
+                os.remove(dst)
+            os.symlink(target, dst)
+            return 'symlinked', 0
+
+        if is_up_to_date(src, dst):
+            method, nbytes = 'unchanged', 0
+        else:
+            method = transfer_file(src, dst, hardlinks=self.hardlinks)
+            nbytes = os.path.getsize(dst)
+            if not verify_file(src, dst, verify=self.verify):
+                raise OSError(f"Verification of {dst} against {src} failed")
+
+        if remove_source:
+            os.remove(src)
+        return method, nbytes
+
+    def run_local(self, source_path):
+        """Sync a source path to a local destination by hardlinking,
+        reflinking or copying each file. Returns the transfer time, bytes,
+        files synced by each method and a return code for the source path"""
+        start_time = time.perf_counter()
+        files, dirs = self.list_local_files(source_path)
+        for dest_dir in dirs:
+            os.makedirs(dest_dir, exist_ok=True)
+
+        remove_source = (not source_path.protected
+                         and self.remove_files != '')
+        methods = {}
+        nbytes = 0
+        errors_found = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(self.sync_local_file, src, dst,
+                                remove_source): src
+                for src, dst in files
+            }
+            for future, src in futures.items():
+                try:
+                    method, size = future.result()
+                except OSError as e:
+                    errors_found.append(f'{src}: {e}')
+                    continue
+                methods[method] = methods.get(method, 0) + 1
+                nbytes += size
+
+        if errors_found:
+            warnings.warn(
+                'Error syncing archive to local directory.\n '
+                f'Failed syncing {source_path.path}:\n '
+                + '\n '.join(errors_found)
+            )
+
+        print(f"Synced {source_path.path} to {self.destination_path}: "
+              + ", ".join(f"{n} {method}" for method, n
+                          in sorted(methods.items())))
+        return {
+            'duration_seconds': time.perf_counter() - start_time,
+            'transferred_bytes': nbytes,
+            'returncode': 1 if errors_found else 0,
+            'files': methods,
+        }
+
+    def run_cmd(self, source_path):
+        """Given an source path, build and run rsync command, or sync it with
+        the local engine. Returns the transfer time, bytes and return code
+        for the source path"""
+        if self.engine == 'local':
+            self.journal.append('start', source_path.path, engine='local')
+            sync_info = self.run_local(source_path)
+            self.record_transfer(source_path, sync_info)
+            return sync_info
+
+        cmd = self.build_cmd(source_path)
+        self.journal.append('start', source_path.path, cmd=cmd)
+        sync_info = self.run_rsync(cmd,
+                                   os.path.basename(source_path.path))
+        self.record_transfer(source_path, sync_info)
+        return sync_info
+
+    def is_batched(self, source_path):
+        """Only output and restart directories are batched, as their paths
+        can be listed relative to the archive"""
+        return (self.batch and self.engine == 'rsync'
+                and self.is_indexed(source_path)
+                and os.path.dirname(source_path.path)
+                == str(self.expt.archive_path))
+
+    def build_batch_cmd(self, source_paths, files_from):
+        """Return a rsync command that syncs all given source paths, which
+        have the same protection, using a --files-from list"""
+        cmd = self.base_rsync_cmd
+        if not source_paths[0].protected:
+            cmd += f' {self.remove_files}'
+        cmd += f' {self.excludes}'
+
+        # Directories are not recursed into with --files-from unless -r is
+        # explicitly set, e.g. if rsync_flags uses -a
+        archive_path = os.path.join(self.expt.archive_path, '')
+        cmd += (f' -r --files-from={files_from}'
+                f' {archive_path} {self.destination_path}')
+        return cmd
+
+    def run_batch(self, name, source_paths):
+        """Sync a batch of source paths with a single rsync command. Returns
+        the transfer time, bytes and rsync return code for the batch"""
+        with tempfile.NamedTemporaryFile('w', prefix=f'payu-sync-{name}-',
+                                         suffix='.txt',
+                                         delete=False) as f:
+            for source_path in source_paths:
+                f.write(os.path.relpath(source_path.path,
+                                        self.expt.archive_path) + '\n')
+            files_from = f.name
+
+        cmd = self.build_batch_cmd(source_paths, files_from)
+        for source_path in source_paths:
+            self.journal.append('start', source_path.path, cmd=cmd)
+        try:
+            sync_info = self.run_rsync(cmd, f'{name} batch')
+        finally:
+            os.remove(files_from)
+
+        for source_path in source_paths:
+            self.record_transfer(source_path, sync_info)
+        return sync_info
+
+    def remove_local_dir(self, source_path):
+        """Remove a synced directory from the local archive if configured,
+        unless the path is protected"""
         if not source_path.protected and self.remove_local_dirs:
             # Only delete real directories; ignore symbolic links
             path = source_path.path
             if os.path.isdir(path) and not os.path.islink(path):
                 print(f"Removing {path} from local archive")
                 shutil.rmtree(path)
+                self.journal.append('removed', path)
+
+    def is_indexed(self, source_path):
+        """Only output, restart and extra directories are added to the sync
+        index and can be resumed from the sync journal. Logs and job files
+        are always synced"""
+        return (not source_path.is_log_file
+                and os.path.isdir(source_path.path))
+
+    def get_signature(self, source_path):
+        """Return the sync options of a source path. Changes to the
+        destination, rsync options or local removal options require the
+        path to be synced again"""
+        signature = self.build_cmd(source_path)
+        if not source_path.protected and self.remove_local_dirs:
+            signature += ' (remove_local_dirs)'
+        return signature
+
+    def is_resumed(self, source_path, fingerprint, signature):
+        """Return True if the journal of an interrupted sync shows the
+        directory was transferred, and it is unchanged since. Any local
+        removal which didn't complete is finished"""
+        path = source_path.path
+        entry = self.previous_journal.get(path, {})
+        if (entry.get('event') not in ('transferred', 'removed')
+                or entry.get('transferred_fingerprint') != fingerprint
+                or entry.get('signature') != signature):
+            return False
+
+        print(f"Skipping {path}: transferred by interrupted sync")
+        self.remove_local_dir(source_path)
+        if self.index is not None and entry.get('fingerprint') is not None:
+            self.index.record(path, entry['fingerprint'], signature)
+        return True
+
+    def run_cmds(self):
+        """Run rsync commands for all source paths, using a pool of
+        workers. Commands are started in the order of the source paths, and
+        each path is only removed locally after its own transfer succeeds.
+        Directories in the sync index that are unchanged, or that were
+        transferred by an interrupted sync, are skipped. If batching is
+        enabled, output and restart directories are synced with one rsync
+        command per protection class"""
+        # Continue from the journal of an interrupted sync
+        self.previous_journal = self.journal.load()
+        if self.previous_journal:
+            print(f"Resuming interrupted sync using {self.journal.path}")
+
+        source_paths = []
+        for source_path in self.source_paths:
+            if self.is_indexed(source_path):
+                path = source_path.path
+                fingerprint = get_dir_fingerprint(path)
+                signature = self.get_signature(source_path)
+                if (self.index is not None
+                        and self.index.is_synced(path, fingerprint,
+                                                 signature)):
+                    print(f"Skipping {path}: unchanged since last sync")
+                    self.skipped_paths.append(path)
+                    continue
+                if self.is_resumed(source_path, fingerprint, signature):
+                    self.resumed_paths.append(path)
+                    continue
+                self.fingerprints[path] = fingerprint
+                self.signatures[path] = signature
+            source_paths.append(source_path)
+
+        # Group output and restart directories into a rsync command for
+        # each protection class
+        batches = {}
+        unbatched_paths = []
+        for source_path in source_paths:
+            if self.is_batched(source_path):
+                name = 'protected' if source_path.protected else 'unprotected'
+                batches.setdefault(name, []).append(source_path)
+            else:
+                unbatched_paths.append(source_path)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            batch_futures = {name: executor.submit(self.run_batch, name, paths)
+                             for name, paths in batches.items()}
+            futures = [executor.submit(self.run_cmd, source_path)
+                       for source_path in unbatched_paths]
+            batch_results = {name: future.result()
+                             for name, future in batch_futures.items()}
+            results = [future.result() for future in futures]
+
+        for name, sync_info in batch_results.items():
+            self.sync_batches[name] = dict(
+                sync_info, paths=[source_path.path
+                                  for source_path in batches[name]]
+            )
+            for source_path in batches[name]:
+                # Transfer time and bytes are only known for the whole batch
+                self.sync_paths[source_path.path] = {
+                    'batch': name,
+                    'duration_seconds': None,
+                    'transferred_bytes': None,
+                    'returncode': sync_info['returncode'],
+                }
+        for source_path, sync_info in zip(unbatched_paths, results):
+            self.sync_paths[source_path.path] = sync_info
+
+        if self.index is not None:
+            for path, sync_info in self.sync_paths.items():
+                if (path in self.fingerprints
+                        and sync_info['returncode'] == 0):
+                    self.index.record(path, self.fingerprints[path],
+                                      self.signatures[path])
+            self.index.save()
+
+        # The journal is only kept if the sync needs to be resumed
+        if all(info['returncode'] == 0 for info in self.sync_paths.values()):
+            self.journal.remove()
+
+    def verify_destination(self):
+        """Hash synced files in the destination in parallel and compare them
+        against md5 hashes in the synced output manifests and collate job
+        files. Returns a summary with any mismatched or missing files"""
+        if self.remote_syncing:
+            warnings.warn("Verifying synced files is not implemented "
+                          "for syncing to a remote machine")
+            return None
+
+        print(f"Verifying synced files in {self.destination_path}")
+        dest_path = self.destination_path
+        expected = get_manifest_md5s(dest_path, self.expt.archive_path)
+        mappings = get_collate_mappings(dest_path)
+
+        # Restart tiles listed in a manifest are removed once collated
+        collated_tiles = {
+            restart_dir: {tile_md5 for tile_md5s in mapping.values()
+                          for tile_md5 in tile_md5s}
+            for restart_dir, mapping in mappings.items()
+        }
+
+        # Only check files in archive directories that have been synced,
+        # which have not been replaced by a collated file
+        expected = {
+            rel_path: entry for rel_path, entry in expected.items()
+            if os.path.isdir(os.path.join(
+                dest_path, Path(rel_path).parts[0]))
+            and entry['md5'] not in collated_tiles.get(
+                Path(rel_path).parts[0], ())
+        }
+
+        # Collated restart files are not named in collate mappings, so hash
+        # any netCDF files in the restart directory not in a manifest
+        collated = {
+            restart_dir: set(mapping) for restart_dir, mapping
+            in mappings.items()
+            if os.path.isdir(os.path.join(dest_path, restart_dir))
+        }
+        collated_paths = []
+        for restart_dir in collated:
+            for path in glob.glob(os.path.join(dest_path, restart_dir,
+                                               '**', '*.nc'), recursive=True):
+                rel_path = os.path.relpath(path, dest_path)
+                if rel_path not in expected:
+                    collated_paths.append(rel_path)
+
+        rel_paths = sorted(expected) + sorted(collated_paths)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            md5s = dict(zip(rel_paths, executor.map(
+                hash_md5, [os.path.join(dest_path, rel_path)
+                           for rel_path in rel_paths])))
+
+        archive_path = os.path.realpath(self.expt.archive_path)
+        mismatches = []
+        for rel_path, entry in sorted(expected.items()):
+            if md5s[rel_path] is None:
+                # Files removed from the local archive are not synced
+                if not os.path.exists(os.path.join(archive_path, rel_path)):
+                    continue
+                status = 'missing'
+            elif md5s[rel_path] != entry['md5']:
+                status = 'mismatch'
+            else:
+                continue
+            mismatches.append({
+                'path': rel_path,
+                'status': status,
+                'expected_md5': entry['md5'],
+                'md5': md5s[rel_path],
+                'source': entry['manifest'],
+            })
+
+        for restart_dir, collated_md5s in sorted(collated.items()):
+            found = {md5s[rel_path] for rel_path in rel_paths
+                     if Path(rel_path).parts[0] == restart_dir}
+            for md5 in sorted(collated_md5s - found):
+                mismatches.append({
+                    'path': restart_dir,
+                    'status': 'collated_file_not_found',
+                    'expected_md5': md5,
+                    'md5': None,
+                    'source': 'collate_mapping',
+                })
+
+        if mismatches:
+            warnings.warn(
+                f"Verification of synced files found {len(mismatches)} "
+                "mismatched or missing files:\n "
+                + '\n '.join(f"{m['path']}: {m['status']}"
+                              for m in mismatches)
+            )
+        else:
+            print(f"Verified {len(rel_paths)} synced files")
+
+        return {
+            'checked_files': len(rel_paths),
+            'mismatches': mismatches,
+        }
 
     def git_runlog(self):
         """Add git runlog to remote archive"""
@@ -322,7 +1172,8 @@ class SyncToRemoteArchive():
         if os.path.isdir(job_file_path):
             self.source_paths.append(SourcePath(path=job_file_path,
                                                 protected=True,
-                                                is_log_file=True))
+                                                is_log_file=True,
+                                                excludes=PAYU_JOBS_EXCLUDES))
 
         # Add metadata path to protected paths, if it exists
         metadata_path = os.path.join(self.expt.archive_path, METADATA_FILENAME)
@@ -333,6 +1184,15 @@ class SyncToRemoteArchive():
         # Add any additional paths to protected paths
         self.add_extra_source_paths()
 
+        if self.engine not in ('rsync', 'local'):
+            raise errors.PayuConfigError(
+                f"Unknown sync engine: {self.engine}. "
+                "Supported engines are 'rsync' and 'local'.")
+        if self.engine == 'local' and self.remote_syncing:
+            raise errors.PayuConfigError(
+                "The local sync engine can not be used when syncing to a "
+                "remote machine (sync: url is set).")
+
         # Set rsync command components
         self.set_destination_path()
         self.set_excludes_flags()
@@ -340,7 +1200,8 @@ class SyncToRemoteArchive():
         # Set base rsync command
         default_flags = '-vrltoD --safe-links'
         rsync_flags = self.config.get('rsync_flags', default_flags)
-        self.base_rsync_cmd = f'rsync {rsync_flags}'
+        # Transfer statistics are used to record bytes synced for each path
+        self.base_rsync_cmd = f'rsync {rsync_flags} --stats'
 
         # Set remove local files/dirs options
         remove_files = self.config.get('remove_local_files', False)
@@ -348,8 +1209,10 @@ class SyncToRemoteArchive():
         self.remove_local_dirs = self.config.get('remove_local_dirs', False)
 
         # Build and run all rsync commands
-        for source_path in self.source_paths:
-            self.run_cmd(source_path)
+        self.run_cmds()
+
+        if self.verify_sync:
+            self.verification = self.verify_destination()
 
         # Add git runlog to remote archive
         self.git_runlog()
@@ -7,10 +7,13 @@ import datetime
 import json
 import jsonschema
 import os
+import re
+import tempfile
 from importlib.resources import files
 from pathlib import Path
 import requests
 import threading
+import time
 from typing import Any, Optional
 import warnings
 from filelock import SoftFileLock, Timeout
@@ -20,6 +23,7 @@ import cftime
 from payu.metadata import Metadata
 from payu.schedulers.scheduler import Scheduler
 from payu.fsops import atomic_write_file
+from payu.trace import Tracer, get_trace_file_path
 
 # Environment variables from payu environment
 TELEMETRY_CONFIG = "PAYU_TELEMETRY_CONFIG_PATH"
@@ -44,6 +48,58 @@ LOCK_LIFETIME = 20
 
 TELEMETRY_VERSION = "1.0.0"
 
+# Spool of telemetry posts that failed, e.g. on compute nodes without
+# network access, which are retried by later payu commands
+TELEMETRY_SPOOL_DIRNAME = "telemetry_spool"
+SPOOL_ENTRY_SUFFIX = ".json"
+SPOOL_FAILED_SUFFIX = ".failed"
+SPOOL_LOCK_FILENAME = ".lock"
+SPOOL_BATCH_SIZE = 20
+SPOOL_MAX_ATTEMPTS = 10
+SPOOL_BACKOFF_SECONDS = 60
+SPOOL_MAX_BACKOFF_SECONDS = 6 * 3600
+SPOOL_LOCK_LIFETIME = SPOOL_BATCH_SIZE * REQUEST_TIMEOUT + 60
+# Maximum seconds spent sending spooled posts from interactive commands,
+# e.g. payu status
+SPOOL_INTERACTIVE_TIME_LIMIT = 5
+# HTTP status codes, other than server errors, where a retry may succeed
+RETRY_STATUS_CODES = {408, 429}
+
+# Append-only index of job file status fields in the payu_jobs directory
+JOB_INDEX_FILENAME = "job_index.jsonl"
+# The index is compacted to one entry per job file when it has more than
+# this many lines per job file, and at least the minimum number of lines
+JOB_INDEX_COMPACT_RATIO = 4
+JOB_INDEX_COMPACT_MIN_LINES = 100
+
+SECONDS_PER_DAY = 86400
+# Length of a model year in days for calendars with fixed length years.
+# Other calendars use the mean Gregorian year length
+DAYS_PER_MODEL_YEAR = {
+    "360_day": 360,
+    "noleap": 365,
+    "365_day": 365,
+    "all_leap": 366,
+    "366_day": 366,
+}
+DEFAULT_DAYS_PER_MODEL_YEAR = 365.2425
+SCHEDULER_TIME_FORMAT = "%a %b %d %H:%M:%S %Y"
+
+# Run job file timings exported as stage durations, e.g.
+# payu_setup_duration_seconds or archive_userscript_duration_seconds
+STAGE_DURATION_REGEX = re.compile(r"^(?:payu_)?(\w+?)_duration_seconds$")
+# Run metrics exported as gauges: (metric name, run_metrics key, help)
+RUN_METRIC_GAUGES = [
+    ("payu_sypd", "sypd",
+     "Simulated model years per day of model run time"),
+    ("payu_core_hours_per_simulated_year", "core_hours_per_simulated_year",
+     "CPU hours of the model run per simulated model year"),
+    ("payu_queue_wait_seconds", "queue_wait_seconds",
+     "Time the job waited in the scheduler queue"),
+    ("payu_queue_wait_fraction", "queue_wait_fraction",
+     "Fraction of the job's time spent waiting in the scheduler queue"),
+]
+
 
 def get_metadata(metadata: Metadata) -> Optional[dict[str, Any]]:
     """Returns a dictionary of the experiment metadata to record"""
@@ -125,6 +181,231 @@ def transform_model_datetimes(
     return transformed
 
 
+def get_simulated_years(data: dict[str, Any]) -> Optional[float]:
+    """Return the number of model years simulated in a run from the model
+    start and finish times in the run job file, or None if not available"""
+    start_time = data.get("model_start_time")
+    finish_time = data.get("model_finish_time")
+    calendar = data.get("model_calendar")
+    if not (start_time and finish_time and calendar):
+        return None
+    try:
+        start, finish = (
+            cftime.datetime.strptime(value[:19], "%Y-%m-%dT%H:%M:%S",
+                                     calendar=calendar)
+            for value in (start_time, finish_time)
+        )
+    except ValueError:
+        return None
+    days_per_year = DAYS_PER_MODEL_YEAR.get(calendar,
+                                            DEFAULT_DAYS_PER_MODEL_YEAR)
+    return (finish - start).total_seconds() / SECONDS_PER_DAY / days_per_year
+
+
+def get_scheduler_job(data: dict[str, Any]) -> dict[str, Any]:
+    """Return the scheduler information of the job in a job file"""
+    jobs = (data.get("scheduler_job_info") or {}).get("Jobs", {})
+    job_id = data.get("scheduler_job_id")
+    if job_id in jobs:
+        return jobs[job_id]
+    # Fall back to the only job if the job ID differs, e.g. short IDs
+    return next(iter(jobs.values())) if len(jobs) == 1 else {}
+
+
+def get_run_ncpus(data: dict[str, Any]) -> Optional[int]:
+    """Return the number of CPUs requested for a run from the scheduler
+    job information, or the payu configuration"""
+    ncpus = get_scheduler_job(data).get("Resource_List", {}).get("ncpus")
+    if ncpus is None:
+        ncpus = (data.get("payu_config") or {}).get("ncpus")
+    try:
+        return int(ncpus) if ncpus else None
+    except (TypeError, ValueError):
+        return None
+
+
+def get_queue_wait_seconds(data: dict[str, Any]) -> Optional[float]:
+    """Return the time a job waited in the scheduler queue"""
+    job = get_scheduler_job(data)
+    qtime, stime = job.get("qtime"), job.get("stime")
+    if not (qtime and stime):
+        return None
+    try:
+        wait_time = (
+            datetime.datetime.strptime(stime, SCHEDULER_TIME_FORMAT)
+            - datetime.datetime.strptime(qtime, SCHEDULER_TIME_FORMAT)
+        )
+    except ValueError:
+        return None
+    return wait_time.total_seconds()
+
+
+def get_run_metrics(data: dict[str, Any]) -> dict[str, Any]:
+    """
+    Returns throughput metrics of a run from its job file data:
+
+    - sypd: simulated model years per day of model run time
+    - core_hours_per_simulated_year: CPU hours of the model run per
+      simulated model year, using the number of CPUs requested
+    - queue_wait_fraction: fraction of the job's time (queue wait and total
+      payu run duration) spent waiting in the scheduler queue
+
+    Metrics are only included if the information is available.
+    """
+    metrics = {}
+    timings = data.get("timings", {})
+    simulated_years = get_simulated_years(data)
+    model_run_seconds = timings.get("payu_model_run_duration_seconds")
+    if simulated_years and model_run_seconds:
+        metrics["simulated_years"] = round(simulated_years, 6)
+        metrics["sypd"] = round(
+            simulated_years / (model_run_seconds / SECONDS_PER_DAY), 4
+        )
+        ncpus = get_run_ncpus(data)
+        if ncpus:
+            metrics["ncpus"] = ncpus
+            metrics["core_hours_per_simulated_year"] = round(
+                ncpus * model_run_seconds / 3600 / simulated_years, 4
+            )
+
+    queue_wait_seconds = get_queue_wait_seconds(data)
+    total_seconds = timings.get("payu_total_duration_seconds")
+    if queue_wait_seconds is not None and total_seconds:
+        metrics["queue_wait_seconds"] = queue_wait_seconds
+        metrics["queue_wait_fraction"] = round(
+            queue_wait_seconds / (queue_wait_seconds + total_seconds), 4
+        )
+    return metrics
+
+
+def get_openmetrics_textfile_path(
+            config: dict[str, Any],
+            archive_path: Path,
+        ) -> Optional[Path]:
+    """Return the path of the OpenMetrics textfile configured with
+    telemetry: openmetrics_textfile in config.yaml, or None if not
+    configured. If the path is a directory, the file is named after the
+    experiment, e.g. for a node_exporter textfile collector directory"""
+    path = config.get("telemetry", {}).get("openmetrics_textfile")
+    if not path:
+        return None
+    path = Path(os.path.expandvars(os.path.expanduser(str(path))))
+    if path.is_dir():
+        path = path / f"{archive_path.name}.prom"
+    return path
+
+
+def format_openmetrics_label_value(value: Any) -> str:
+    """Escape a label value for the OpenMetrics text format"""
+    return (str(value).replace("\\", "\\\\")
+            .replace("\n", "\\n").replace('"', '\\"'))
+
+
+def format_openmetrics(
+            run_info: dict[str, Any],
+            experiment: str,
+        ) -> str:
+    """
+    Return gauges of the latest run in the OpenMetrics text format, with
+    an experiment label: stage durations, throughput metrics, archive
+    volumes, manifest hashing throughput and run status.
+    """
+    metrics = {}
+
+    def add(name, help, value, unit=None, **labels):
+        if value is None:
+            return
+        labels = dict(experiment=experiment, **labels)
+        label_str = ",".join(
+            f'{key}="{format_openmetrics_label_value(label)}"'
+            for key, label in labels.items()
+        )
+        metric = metrics.setdefault(name, {"help": help, "unit": unit,
+                                           "samples": []})
+        metric["samples"].append(f"{name}{{{label_str}}} {float(value)}")
+
+    timings = run_info.get("timings", {})
+    for key, value in timings.items():
+        match = STAGE_DURATION_REGEX.match(key)
+        if match and isinstance(value, (int, float)):
+            add("payu_stage_duration_seconds",
+                "Duration of a stage of the payu run", value,
+                unit="seconds", stage=match.group(1))
+
+    run_metrics = run_info.get("run_metrics", {})
+    for name, key, help in RUN_METRIC_GAUGES:
+        add(name, help, run_metrics.get(key),
+            unit="seconds" if name.endswith("_seconds") else None)
+
+    for volume in ["output", "restart"]:
+        volume_gb = run_info.get(f"{volume}_volume_gb")
+        if volume_gb is not None:
+            add("payu_archive_volume_bytes",
+                "Size of the archived output and restart directories",
+                float(volume_gb) * 2**30, unit="bytes", volume=volume)
+
+    manifests = run_info.get("manifests", {})
+    n_files = sum(len(data) for data in manifests.values()
+                  if isinstance(data, dict))
+    for manifest, data in manifests.items():
+        if isinstance(data, dict):
+            add("payu_manifest_files", "Number of files in the manifest",
+                len(data), manifest=manifest)
+    check_seconds = timings.get("payu_check_manifests_duration_seconds")
+    if n_files and check_seconds:
+        add("payu_manifest_hash_files_per_second",
+            "Manifest files checked and hashed per second",
+            n_files / check_seconds)
+
+    add("payu_run_number", "Run number of the latest payu run",
+        run_info.get("payu_current_run"))
+    add("payu_run_status", "Exit status of the latest payu run",
+        run_info.get("payu_run_status"))
+    add("payu_model_run_status",
+        "Exit status of the model run of the latest payu run",
+        run_info.get("payu_model_run_status"))
+    finish_time = timings.get("payu_finish_time")
+    if finish_time:
+        add("payu_run_finish_timestamp_seconds",
+            "Time the latest payu run finished",
+            datetime.datetime.fromisoformat(finish_time).timestamp(),
+            unit="seconds")
+
+    lines = []
+    for name, metric in metrics.items():
+        lines.append(f"# TYPE {name} gauge")
+        if metric["unit"]:
+            lines.append(f"# UNIT {name} {metric['unit']}")
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.extend(metric["samples"])
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def write_openmetrics_textfile(
+            run_info: dict[str, Any],
+            config: dict[str, Any],
+            archive_path: Path,
+        ) -> None:
+    """If configured, write the metrics of the latest run to an OpenMetrics
+    textfile. The file is replaced atomically so scrapers never read a
+    partially written file"""
+    path = get_openmetrics_textfile_path(config, archive_path)
+    if path is None:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            mode='w', dir=path.parent, prefix=f".{path.name}.", delete=False
+        ) as temp_file:
+            temp_file.write(format_openmetrics(run_info, archive_path.name))
+            temp_name = temp_file.name
+        os.chmod(temp_name, 0o644)
+        os.replace(temp_name, path)
+    except OSError as e:
+        warnings.warn(f"Failed to write OpenMetrics textfile {path}: {e}")
+
+
 def get_external_telemetry_config(
             archive_path: Path,
             job_file_path: Path
@@ -194,6 +475,58 @@ def write_error_log(
     )
 
 
+def send_telemetry_payload(
+            url: str,
+            token: str,
+            payload: dict[str, Any],
+            proxy_url: Optional[str] = None,
+            request_timeout: int = REQUEST_TIMEOUT,
+        ) -> tuple[Optional[str], bool]:
+    """Post a telemetry payload to the telemetry service
+
+    Returns
+    -------
+    tuple[Optional[str], bool]
+        Error message, or None if the request succeeded, and whether the
+        request could succeed if it was retried later
+    """
+    headers = {
+        "Content-type": "application/json",
+        "Authorization": "Token " + token,
+    }
+
+    try:
+        if proxy_url is None:
+            response = requests.post(
+                url,
+                data=json.dumps(payload),
+                headers=headers,
+                timeout=request_timeout,
+            )
+        else:
+            response = requests.post(
+                url,
+                data=json.dumps(payload),
+                headers=headers,
+                timeout=request_timeout,
+                proxies={"https": proxy_url, "http": proxy_url},
+            )
+    except Exception as e:
+        # No network access, or the service could not be reached
+        return "Error posting telemetry request: " + str(e), True
+
+    if response.status_code >= 400:
+        error_message = (
+            "Error posting telemetry request: "
+            f"Status {response.status_code} - {response.text}"
+        )
+        retry = (response.status_code >= 500
+                 or response.status_code in RETRY_STATUS_CODES)
+        return error_message, retry
+
+    return None, False
+
+
 def post_telemetry_data(url: str,
                         token: str,
                         data: dict[str, Any],
@@ -202,7 +535,8 @@ def post_telemetry_data(url: str,
                         job_file_path: Path,
                         proxy_url: Optional[str] = None,
                         request_timeout: int = REQUEST_TIMEOUT,
-                        ) -> None:
+                        spool_path: Optional[Path] = None,
+                        ) -> bool:
     """Posts telemetry data
 
     Parameters
@@ -225,43 +559,251 @@ def post_telemetry_data(url: str,
         Proxy URL for the telemetry record request
     request_timeout: int, default REQUEST_TIMEOUT
         Timeout while waiting for request
+    spool_path: Optional[Path]
+        Spool directory for telemetry posts to retry. If the request fails
+        and could succeed later, the data is queued in the spool. If the
+        request succeeds, any queued posts are sent
+
+    Returns
+    -------
+    bool
+        True if the telemetry data was posted
     """
-    headers = {
-        "Content-type": "application/json",
-        "Authorization": "Token " + token,
-    }
-
-    data = {
+    payload = {
         "service": service_name,
         "version": TELEMETRY_VERSION,
         "telemetry": data
     }
 
-    try:
-        if proxy_url is None:
-            response = requests.post(
-                url,
-                data=json.dumps(data),
-                headers=headers,
-                timeout=request_timeout,
-            )
-        else:
-            response = requests.post(
-                url,
-                data=json.dumps(data),
-                headers=headers,
-                timeout=request_timeout,
-                proxies={"https": proxy_url, "http": proxy_url},
-            )
-        if response.status_code >= 400:
-            error_message = (
-                "Error posting telemetry request: "
-                f"Status {response.status_code} - {response.json()}"
+    error_message, retry = send_telemetry_payload(
+        url=url,
+        token=token,
+        payload=payload,
+        proxy_url=proxy_url,
+        request_timeout=request_timeout,
+    )
+    if error_message is None:
+        if spool_path is not None:
+            # The telemetry service is reachable, so send any earlier posts
+            send_spooled_telemetry(
+                spool_path=spool_path,
+                url=url,
+                token=token,
+                archive_path=archive_path,
+                proxy_url=proxy_url,
+                request_timeout=request_timeout,
             )
-            write_error_log(archive_path, job_file_path, error_message)
-    except Exception as e:
-        error_message = "Error posting telemetry request: " + str(e)
-        write_error_log(archive_path, job_file_path, error_message)
+        return True
+
+    if retry and spool_path is not None:
+        spool_telemetry_payload(
+            spool_path=spool_path,
+            payload=payload,
+            job_file_path=job_file_path,
+            error_message=error_message,
+        )
+        error_message += f" - Queued for retry in {spool_path}"
+    write_error_log(archive_path, job_file_path, error_message)
+    return False
+
+
+def get_telemetry_spool_path(archive_path: Path) -> Path:
+    """Return the directory of telemetry posts queued for retry"""
+    return archive_path / TELEMETRY_SPOOL_DIRNAME
+
+
+def get_spool_backoff_seconds(attempts: int) -> int:
+    """Return the delay before retrying a spooled post, which doubles
+    with each failed attempt"""
+    return min(SPOOL_BACKOFF_SECONDS * 2 ** (attempts - 1),
+               SPOOL_MAX_BACKOFF_SECONDS)
+
+
+def spool_telemetry_payload(
+            spool_path: Path,
+            payload: dict[str, Any],
+            job_file_path: Path,
+            error_message: str,
+            now: Optional[datetime.datetime] = None,
+        ) -> Path:
+    """Queue a failed telemetry post in the spool directory, to be sent by
+    a later payu command. Authentication is not stored in the spool, it is
+    read from the telemetry configuration when the post is retried"""
+    now = now or datetime.datetime.now()
+    job_file_path = Path(job_file_path)
+    entry = {
+        "payload": payload,
+        "job_file": str(job_file_path),
+        "attempts": 1,
+        "last_error": error_message,
+        "last_attempt_time": now.isoformat(),
+        "next_attempt_time": (
+            now + datetime.timedelta(seconds=get_spool_backoff_seconds(1))
+        ).isoformat(),
+    }
+    # Prefix with the time so the oldest posts are sent first
+    entry_path = (
+        spool_path / f"{now.strftime('%Y%m%dT%H%M%S%f')}-{job_file_path.stem}"
+        f"{SPOOL_ENTRY_SUFFIX}"
+    )
+    atomic_write_file(file_path=entry_path, data=entry)
+    return entry_path
+
+
+def send_spooled_telemetry(
+            spool_path: Path,
+            url: str,
+            token: str,
+            archive_path: Path,
+            proxy_url: Optional[str] = None,
+            request_timeout: int = REQUEST_TIMEOUT,
+            batch_size: int = SPOOL_BATCH_SIZE,
+            now: Optional[datetime.datetime] = None,
+            time_limit: Optional[float] = None,
+        ) -> dict[str, int]:
+    """
+    Send a batch of the oldest telemetry posts in the spool that are due to
+    be retried. Sent posts are removed from the spool. If the service is
+    still unavailable, the post's next attempt is backed off and the rest
+    of the batch is left for later. Posts that are rejected by the
+    service or reach the maximum number of attempts are renamed with a
+    .failed suffix and no longer retried. If a time limit is given, posts
+    are only sent (and wait for a response) until it has passed, and the
+    rest are left for later.
+
+    Only one payu process sends the spool at a time, other processes
+    return without sending.
+
+    Returns
+    -------
+    dict[str, int]
+        Number of posts that were sent, failed, and still pending
+    """
+    counts = {"sent": 0, "failed": 0, "pending": 0}
+    if not spool_path.is_dir():
+        return counts
+    entry_paths = sorted(spool_path.glob(f"*{SPOOL_ENTRY_SUFFIX}"))
+    if not entry_paths:
+        return counts
+
+    now = now or datetime.datetime.now()
+    start_time = time.monotonic()
+    lock = SoftFileLock(spool_path / SPOOL_LOCK_FILENAME, timeout=0,
+                        lifetime=SPOOL_LOCK_LIFETIME)
+    try:
+        with lock:
+            attempted = 0
+            unavailable = False
+            for entry_path in entry_paths:
+                timeout = request_timeout
+                if time_limit is not None:
+                    timeout = min(timeout, time_limit
+                                  - (time.monotonic() - start_time))
+                if attempted >= batch_size or unavailable or timeout <= 0:
+                    counts["pending"] += 1
+                    continue
+                try:
+                    with open(entry_path, 'r') as f:
+                        entry = json.load(f)
+                    next_attempt_time = datetime.datetime.fromisoformat(
+                        entry["next_attempt_time"]
+                    )
+                except FileNotFoundError:
+                    # Sent by another process before the lock was acquired
+                    continue
+                except (OSError, ValueError, KeyError) as e:
+                    write_error_log(
+                        archive_path, entry_path,
+                        f"Error reading spooled telemetry: {e}"
+                    )
+                    entry_path.rename(
+                        entry_path.with_suffix(SPOOL_FAILED_SUFFIX)
+                    )
+                    counts["failed"] += 1
+                    continue
+
+                if next_attempt_time > now:
+                    counts["pending"] += 1
+                    continue
+
+                attempted += 1
+                error_message, retry = send_telemetry_payload(
+                    url=url,
+                    token=token,
+                    payload=entry["payload"],
+                    proxy_url=proxy_url,
+                    request_timeout=timeout,
+                )
+                if error_message is None:
+                    entry_path.unlink()
+                    counts["sent"] += 1
+                    continue
+
+                entry["attempts"] += 1
+                entry["last_error"] = error_message
+                entry["last_attempt_time"] = now.isoformat()
+                if not retry or entry["attempts"] >= SPOOL_MAX_ATTEMPTS:
+                    entry_path.rename(
+                        entry_path.with_suffix(SPOOL_FAILED_SUFFIX)
+                    )
+                    write_error_log(
+                        archive_path, entry["job_file"],
+                        f"Giving up on spooled telemetry after "
+                        f"{entry['attempts']} attempts: {error_message}"
+                    )
+                    counts["failed"] += 1
+                    continue
+
+                backoff = get_spool_backoff_seconds(entry["attempts"])
+                entry["next_attempt_time"] = (
+                    now + datetime.timedelta(seconds=backoff)
+                ).isoformat()
+                atomic_write_file(file_path=entry_path, data=entry)
+                counts["pending"] += 1
+                # The service is still unavailable, so leave the rest of
+                # the batch until the next attempt
+                unavailable = True
+    except Timeout:
+        pass
+
+    return counts
+
+
+def flush_telemetry_spool(
+            archive_path: Path,
+            config: dict[str, Any],
+            now: Optional[datetime.datetime] = None,
+            time_limit: Optional[float] = None,
+        ) -> Optional[dict[str, int]]:
+    """If telemetry is configured, retry telemetry posts queued in the
+    spool directory of the experiment archive, e.g. posts from compute
+    nodes without network access. Posts are only sent until time_limit
+    seconds have passed, if given"""
+    spool_path = get_telemetry_spool_path(archive_path)
+    if not (
+        config.get("telemetry", {}).get("enable", True)
+        and os.environ.get(TELEMETRY_CONFIG) not in (None, "")
+        and spool_path.is_dir()
+        and any(spool_path.glob(f"*{SPOOL_ENTRY_SUFFIX}"))
+    ):
+        return None
+
+    external_config = get_external_telemetry_config(
+        archive_path=archive_path,
+        job_file_path=spool_path
+    )
+    if external_config is None:
+        return None
+
+    return send_spooled_telemetry(
+        spool_path=spool_path,
+        url=external_config[CONFIG_FIELDS["URL"]],
+        token=external_config[CONFIG_FIELDS["TOKEN"]],
+        archive_path=archive_path,
+        proxy_url=external_config.get(OPTIONAL_CONFIG_FIELDS["PROXY_URL"]),
+        now=now,
+        time_limit=time_limit,
+    )
 
 
 def record_telemetry(run_info: dict[str, Any],
@@ -307,6 +849,7 @@ def record_telemetry(run_info: dict[str, Any],
             "archive_path": archive_path,
             "job_file_path": job_file_path,
             "proxy_url": external_config.get(OPTIONAL_CONFIG_FIELDS["PROXY_URL"]),
+            "spool_path": get_telemetry_spool_path(archive_path),
         },
     )
     thread.start()
@@ -360,6 +903,145 @@ def read_job_file(file_path: Path) -> dict[str, Any]:
         return json.load(f)
 
 
+def get_job_index_path(file_path: Path) -> Optional[Path]:
+    """Return the path to the job-file index for a job file in
+    <archive_path>/payu_jobs/<run_number>/<type>/<job_id>.json,
+    or None if the job file is not in a payu_jobs directory"""
+    file_path = Path(file_path)
+    if len(file_path.parents) < 3:
+        return None
+    payu_jobs = file_path.parents[2]
+    if payu_jobs.name != "payu_jobs":
+        return None
+    return payu_jobs / JOB_INDEX_FILENAME
+
+
+def get_job_index_entry(file_path: Path, data: dict[str, Any]) -> dict[str, Any]:
+    """Return the status fields of a job file's data to store in the
+    job-file index"""
+    file_path = Path(file_path)
+    job_type = file_path.parent.name
+    try:
+        mtime_ns = file_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        mtime_ns = None
+    return {
+        "job_file": "/".join(file_path.parts[-3:]),
+        "mtime_ns": mtime_ns,
+        "run_number": data.get("payu_current_run"),
+        "type": job_type,
+        "job_id": data.get("scheduler_job_id"),
+        "scheduler_type": data.get("scheduler_type"),
+        "stage": data.get("stage"),
+        "exit_status": data.get(f"payu_{job_type}_status"),
+        "run_id": data.get("payu_run_id"),
+        "model_exit_status": data.get("payu_model_run_status"),
+        "model_finish_time": data.get("model_finish_time"),
+        "start_time": data.get("timings", {}).get("payu_start_time"),
+        "experiment_uuid": data.get(
+            "experiment_metadata", {}).get("experiment_uuid"),
+    }
+
+
+def append_job_index(index_path: Path, entries: list[dict[str, Any]]) -> None:
+    """Append entries to the job-file index. Each entry is written as a
+    single line, so concurrent appends do not interleave"""
+    lines = "".join(json.dumps(entry) + "\n" for entry in entries)
+    fd = os.open(index_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, lines.encode())
+    finally:
+        os.close(fd)
+
+
+def rebuild_job_index(archive_path: Path) -> dict[str, dict[str, Any]]:
+    """Rebuild the job-file index from all job files in the archive's
+    payu_jobs directory, and return the index entries"""
+    payu_jobs = Path(archive_path) / "payu_jobs"
+    if not payu_jobs.exists():
+        return {}
+
+    index = {}
+    for job_file in sorted(payu_jobs.glob("*/*/*.json")):
+        try:
+            data = read_job_file(job_file)
+        except (OSError, json.JSONDecodeError) as e:
+            warnings.warn(f"Skipping unreadable job file {job_file}: {e}")
+            continue
+        entry = get_job_index_entry(job_file, data)
+        index[entry["job_file"]] = entry
+
+    write_job_index(payu_jobs / JOB_INDEX_FILENAME, index)
+    return index
+
+
+def write_job_index(index_path: Path,
+                    index: dict[str, dict[str, Any]]) -> None:
+    """Replace the job-file index with one entry per job file"""
+    tmp_path = index_path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        for entry in index.values():
+            f.write(json.dumps(entry) + "\n")
+    os.replace(tmp_path, index_path)
+
+
+def read_job_index(archive_path: Path) -> Optional[dict[str, dict[str, Any]]]:
+    """Return the latest index entry of each job file, keyed by the job
+    file path relative to payu_jobs. Returns None if there is no index.
+    The index is compacted if appended entries far outnumber job files"""
+    index_path = Path(archive_path) / "payu_jobs" / JOB_INDEX_FILENAME
+    if not index_path.exists():
+        return None
+
+    index = {}
+    nlines = 0
+    with open(index_path, "r") as f:
+        for line in f:
+            nlines += 1
+            try:
+                entry = json.loads(line)
+                job_file = entry["job_file"]
+            except (json.JSONDecodeError, KeyError, TypeError):
+                # Ignore a partially written entry
+                continue
+            if entry.get("removed"):
+                index.pop(job_file, None)
+            else:
+                index[job_file] = entry
+
+    if nlines > max(JOB_INDEX_COMPACT_MIN_LINES,
+                    JOB_INDEX_COMPACT_RATIO * len(index)):
+        # An entry appended by another process while compacting is lost,
+        # but the index is only a cache and the job file is read instead
+        try:
+            write_job_index(index_path, index)
+        except OSError as e:
+            warnings.warn(f"Failed to compact job index {index_path}: {e}")
+    return index
+
+
+def update_job_index(file_path: Path, data: Optional[dict[str, Any]] = None) -> None:
+    """Record an updated or removed (if data is None) job file in the
+    job-file index. The index is built from all existing job files if
+    it does not exist yet"""
+    index_path = get_job_index_path(file_path)
+    if index_path is None:
+        return
+    try:
+        if not index_path.exists():
+            if data is not None:
+                rebuild_job_index(index_path.parent.parent)
+            return
+        if data is None:
+            entry = {"job_file": "/".join(Path(file_path).parts[-3:]),
+                     "removed": True}
+        else:
+            entry = get_job_index_entry(file_path, data)
+        append_job_index(index_path, [entry])
+    except OSError as e:
+        warnings.warn(f"Failed to update job index {index_path}: {e}")
+
+
 def write_queued_job_file(
             archive_path: Path,
             job_id: str,
@@ -409,6 +1091,7 @@ def remove_job_file(file_path: Path) -> None:
         return
 
     file_path.unlink()
+    update_job_index(file_path)
     # File format is <run_number>/run/<job_id>.json
     # So should remove <run_number>/run/ if empty
     if not any(file_path.parent.iterdir()):
@@ -471,17 +1154,21 @@ def setup_run_job_file(
 def update_job_file(
             file_path: Path,
             data: dict[str, Any],
+            timings: Optional[dict[str, Any]] = None,
         ) -> dict[str, Any]:
     """
-    Update the job file with the provided data
+    Update the job file with the provided data, and the timings if defined,
     and return the updated data
     """
+    if timings:
+        data = {**data, **get_timings_isoformat(timings)}
     lock = SoftFileLock(str(file_path) + ".lock", lifetime=LOCK_LIFETIME, timeout=LOCK_TIMEOUT)
     try:
         with lock:
             run_info = read_job_file(file_path)
             run_info.update(data)
             atomic_write_file(file_path=file_path, data=run_info)
+            update_job_index(file_path, run_info)
     except Timeout:
         run_info = read_job_file(file_path)
         run_info.update(data)
@@ -556,6 +1243,8 @@ def record_run(
             archive_path: Path,
             type: Optional[str] = "run",
             stage: Optional[str] = None,
+            tracer: Optional[Tracer] = None,
+            io_stats: Optional[dict[str, Any]] = None,
         ) -> None:
     """Record the run information for the current run and post telemetry
     if enabled
@@ -575,6 +1264,12 @@ def record_run(
         Path to the run job file to update
     archive_path: Path
         Path to the archive directory for the experiment
+    tracer: Optional[Tracer], default None
+        Traced stages of the run, written to a trace file next to the
+        job file
+    io_stats: Optional[dict[str, Any]], default None
+        I/O totals of each stage of the run, e.g. bytes read and written,
+        files opened, stat calls and directory listings
     """
     # Additional information to the run info
     run_info = {f"payu_{type}_status": status}
@@ -588,9 +1283,31 @@ def record_run(
 
     # Add timings to the run info and add end time and total run duration
     run_info.update(get_finished_timings(timings))
+    if io_stats:
+        run_info["io_stats"] = io_stats
+
+    if type == "run" and file_path is not None:
+        # Calculate throughput metrics using the information recorded
+        # earlier in the run
+        job_data = read_job_file(file_path)
+        job_data.update(run_info)
+        metrics = get_run_metrics(job_data)
+        if metrics:
+            run_info["run_metrics"] = metrics
+
+    if tracer is not None and file_path is not None:
+        trace_path = get_trace_file_path(file_path)
+        try:
+            tracer.write(trace_path)
+            run_info["trace_file"] = str(trace_path)
+        except OSError as e:
+            warnings.warn(f"Failed to write trace file {trace_path}: {e}")
 
     # Update the run job file
     run_info = update_job_file(file_path=file_path, data=run_info)
 
+    if type == "run":
+        write_openmetrics_textfile(run_info, config, archive_path)
+
     record_telemetry(run_info=run_info, config=config,
                      job_file_path=file_path, archive_path=archive_path, type=type)
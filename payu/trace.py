@@ -0,0 +1,96 @@
+"""
+Tracing of nested stages of payu commands (e.g. setup, run, archive and
+collate, and the steps within them), written in the Chrome trace event
+format so traces can be viewed in Perfetto (https://ui.perfetto.dev) or
+chrome://tracing.
+
+Spans only record two clock reads and a dictionary each, so tracing is
+always enabled.
+"""
+
+from contextlib import contextmanager
+from functools import wraps
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any, Optional
+
+from payu.fsops import atomic_write_file
+
+TRACE_FILE_SUFFIX = ".trace"
+
+
+class Tracer(object):
+    """Record the start and duration of nested spans of payu stages"""
+
+    def __init__(self, process_name: str = "payu"):
+        self.process_name = process_name
+        self.events = []
+        self.pid = os.getpid()
+        # Trace timestamps are microseconds since the epoch, measured with a
+        # monotonic clock relative to when the tracer was created
+        self.start_ns = time.perf_counter_ns()
+        self.start_epoch_us = time.time_ns() / 1000
+
+    @contextmanager
+    def span(self, name: str, category: str = "payu", **args):
+        """Trace the duration of the enclosed block. Any keyword arguments
+        are stored in the span's args"""
+        start_ns = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end_ns = time.perf_counter_ns()
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": self.start_epoch_us + (start_ns - self.start_ns) / 1000,
+                "dur": (end_ns - start_ns) / 1000,
+                "pid": self.pid,
+                "tid": threading.get_native_id(),
+            }
+            if args:
+                event["args"] = args
+            self.events.append(event)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the trace in the Chrome trace event JSON format"""
+        metadata = {
+            "name": "process_name",
+            "ph": "M",
+            "pid": self.pid,
+            "args": {"name": self.process_name},
+        }
+        # Sort by start time, so enclosing spans come before nested spans
+        events = sorted(self.events, key=lambda e: (e["ts"], -e["dur"]))
+        return {
+            "traceEvents": [metadata] + events,
+            "displayTimeUnit": "ms",
+        }
+
+    def write(self, file_path: Path) -> None:
+        """Write the trace to a file"""
+        atomic_write_file(file_path=file_path, data=self.to_dict())
+
+
+def traced(name: Optional[str] = None):
+    """Decorator to trace a method of a class with a tracer attribute,
+    e.g. an Experiment. The span name defaults to the method name"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            tracer = getattr(self, "tracer", None)
+            if tracer is None:
+                return func(self, *args, **kwargs)
+            with tracer.span(name or func.__name__):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_trace_file_path(job_file_path: Path) -> Path:
+    """Return the path of the trace file stored next to a job file.
+    The trace does not use a .json suffix so it is not read as a job file"""
+    return Path(job_file_path).with_suffix(TRACE_FILE_SUFFIX)
@@ -0,0 +1,65 @@
+"""Throughput benchmark of the python collate engine against mppnccombine.
+
+Synthetic FMS tiles are collated with payu.nccombine and, if it can be
+found, the mppnccombine executable. Run from the repository root, e.g.
+
+    python -m test.benchmark_nccombine --nx 1440 --ny 1080 --nz 10 --nt 4
+"""
+
+import argparse
+import os
+import shutil
+import subprocess as sp
+import tempfile
+import time
+
+from payu.nccombine import combine
+
+from test.common import make_fms_tiles
+
+
+def report(name, tile_bytes, elapsed_time):
+    print(f"{name:>16}: {elapsed_time:8.2f} s "
+          f"{tile_bytes / elapsed_time / 1024**2:10.1f} MiB/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--nx', type=int, default=360)
+    parser.add_argument('--ny', type=int, default=300)
+    parser.add_argument('--nz', type=int, default=10)
+    parser.add_argument('--nt', type=int, default=4)
+    parser.add_argument('--layout', type=int, nargs=2, default=(6, 5))
+    parser.add_argument('--complevel', type=int, default=5)
+    parser.add_argument('--mppnccombine', default='mppnccombine',
+                        help='mppnccombine executable to compare against')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tile_paths, _ = make_fms_tiles(tmp_dir, 'bench.nc', nx=args.nx,
+                                       ny=args.ny, nz=args.nz, nt=args.nt,
+                                       layout=args.layout)
+        tile_bytes = sum(os.path.getsize(p) for p in tile_paths)
+        print(f"Collating {len(tile_paths)} tiles, "
+              f"{tile_bytes / 1024**2:.1f} MiB")
+
+        start_time = time.perf_counter()
+        combine(tile_paths, os.path.join(tmp_dir, 'python.nc'),
+                complevel=args.complevel)
+        report('python', tile_bytes, time.perf_counter() - start_time)
+
+        mppnc_path = shutil.which(args.mppnccombine)
+        if mppnc_path is None:
+            print(f"{args.mppnccombine} not found, skipping comparison")
+            return
+
+        cmd = [mppnc_path, '-n4', '-m', '-d', str(args.complevel),
+               os.path.join(tmp_dir, 'mppnc.nc')]
+        cmd.extend(str(p) for p in tile_paths)
+        start_time = time.perf_counter()
+        sp.run(cmd, check=True, stdout=sp.DEVNULL)
+        report('mppnccombine', tile_bytes, time.perf_counter() - start_time)
+
+
+if __name__ == '__main__':
+    main()
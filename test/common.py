@@ -227,3 +227,60 @@ def make_all_files():
     make_inputs()
     make_exe()
     make_restarts()
+
+
+def make_fms_tiles(path, nc_fname, nx=8, ny=6, nz=3, nt=2, layout=(2, 3),
+                   masked_tiles=()):
+    """
+    Make a set of FMS domain-decomposed netCDF tiles (nc_fname.0000, ...)
+    and return the tile paths and the global data array of the decomposed
+    variable ``temp``. Tile indices listed in masked_tiles are not written,
+    as for land-masked tiles
+    """
+    import netCDF4
+    import numpy as np
+
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    xlayout, ylayout = layout
+    data = np.arange(nt * nz * ny * nx, dtype='f4').reshape(nt, nz, ny, nx)
+    xbounds = np.linspace(0, nx, xlayout + 1).astype(int)
+    ybounds = np.linspace(0, ny, ylayout + 1).astype(int)
+
+    tile_paths = []
+    for j in range(ylayout):
+        for i in range(xlayout):
+            tile_index = j * xlayout + i
+            if tile_index in masked_tiles:
+                continue
+            x0, x1 = xbounds[i], xbounds[i + 1]
+            y0, y1 = ybounds[j], ybounds[j + 1]
+            tile_path = path / f'{nc_fname}.{tile_index:04d}'
+            with netCDF4.Dataset(tile_path, 'w') as ds:
+                ds.filename = tile_path.name
+                ds.NumFilesInSet = xlayout * ylayout
+                ds.createDimension('xt', x1 - x0)
+                ds.createDimension('yt', y1 - y0)
+                ds.createDimension('zt', nz)
+                ds.createDimension('time', None)
+                xt = ds.createVariable('xt', 'f8', ('xt',))
+                xt.domain_decomposition = np.array([1, nx, x0 + 1, x1],
+                                                   dtype='i4')
+                xt[:] = np.arange(x0, x1)
+                yt = ds.createVariable('yt', 'f8', ('yt',))
+                yt.domain_decomposition = np.array([1, ny, y0 + 1, y1],
+                                                   dtype='i4')
+                yt[:] = np.arange(y0, y1)
+                zt = ds.createVariable('zt', 'f8', ('zt',))
+                zt[:] = np.arange(nz)
+                time = ds.createVariable('time', 'f8', ('time',))
+                time.units = 'days since 0001-01-01 00:00:00'
+                time[:] = np.arange(nt)
+                temp = ds.createVariable('temp', 'f4',
+                                         ('time', 'zt', 'yt', 'xt'),
+                                         fill_value=-1e20)
+                temp.long_name = 'Temperature'
+                temp[:] = data[:, :, y0:y1, x0:x1]
+            tile_paths.append(tile_path)
+
+    return tile_paths, data
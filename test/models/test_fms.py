@@ -1,12 +1,21 @@
+import hashlib
 import os
+from pathlib import Path
 import shutil
+import threading
 from unittest.mock import patch, MagicMock
 
 import pytest
 
 from payu.models.fms import get_uncollated_files, get_avail_collate_flags, restart_mapping_log, get_restart_uncollated_hashes
+from payu.models.fms import schedule_tile_sets, get_collate_ncpus
+from payu.models.fms import CollateJournal, CollateWatcher, hash_files
+from payu.models.fms import fms_collate, get_collate_engine
+from payu.models.fms import get_manifest_hashes
+from payu.manifest import PayuManifest
+import payu.errors as errors
 
-from test.common import tmpdir
+from test.common import tmpdir, make_fms_tiles
 
 verbose = False
 
@@ -251,4 +260,330 @@ def test_restart_mapping_log(mock_hash):
     }
     
     # Confirm only restart collation are recorded in the mapping (but not output collation)
-    assert mapping_collate_dict == expected_mapping
\ No newline at end of file
+    assert mapping_collate_dict == expected_mapping
+
+def test_schedule_tile_sets():
+    """Test tile sets are ordered by total tile size, largest first"""
+    tile_sizes = {
+        "small.nc": [10, 10],
+        "large.nc": [1000, 1000],
+        "medium.nc": [100, 100, 100],
+    }
+    file_dict = {}
+    for nc_fname, sizes in tile_sizes.items():
+        file_dict[nc_fname] = []
+        for n, size in enumerate(sizes):
+            tile = f"{nc_fname}.{n:04d}"
+            (tmpdir / tile).write_bytes(b"0" * size)
+            file_dict[nc_fname].append(tile)
+
+    tile_sets = schedule_tile_sets({str(tmpdir): file_dict})
+
+    assert [(nc_fname, tile_bytes) for _, nc_fname, _, tile_bytes
+            in tile_sets] == [("large.nc", 2000),
+                              ("medium.nc", 300),
+                              ("small.nc", 20)]
+    assert tile_sets[0][2] == ["large.nc.0000", "large.nc.0001"]
+
+
+@pytest.mark.parametrize("nc_fname, expected_ncpus", [
+    ("ocean_daily_3d_temp.nc", 24),
+    ("ocean_daily_2d.nc", 8),
+    ("ocean_month.nc", 4),
+])
+def test_get_collate_ncpus(nc_fname, expected_ncpus):
+    file_ncpus = {
+        "ocean_daily_3d*": 24,
+        "ocean_daily*": 8,
+    }
+    assert get_collate_ncpus(nc_fname, 4, file_ncpus) == expected_ncpus
+
+
+def test_collate_journal():
+    """Test completed collations and tile hashes are re-used from the
+    collate journal"""
+    tiles = make_tiles(0, 2, prefix='ocean.res')
+    (tmpdir / "ocean.res.nc").write_bytes(b"collated")
+    archive_dir = tmpdir / "archive"
+    # tmpdir is outside the archive, so the journal is named by path hash
+    path_hash = hashlib.md5(str(tmpdir.resolve()).encode()).hexdigest()
+    journal_path = (archive_dir / "payu_jobs" / "collate_journals"
+                    / f"{path_hash}.json")
+
+    journal = CollateJournal(tmpdir, archive_dir)
+    assert journal.file_path == journal_path
+    assert journal.get_tile_hash(tiles[0]) is None
+    tile_hashes = ["md5_ocean.res.nc.000000", "md5_ocean.res.nc.000001"]
+    for tile, tile_hash in zip(tiles, tile_hashes):
+        journal.set_tile_hash(tile, tile_hash)
+    assert not journal.is_complete("ocean.res.nc", tiles)
+
+    journal.record_complete("ocean.res.nc", tiles, tile_hashes)
+
+    # Reload journal, as if collation is resubmitted
+    assert journal_path.is_file()
+    journal = CollateJournal(tmpdir, archive_dir)
+    assert journal.is_complete("ocean.res.nc", tiles)
+    assert journal.get_tile_hash(tiles[0]) == "md5_ocean.res.nc.000000"
+
+    # Tiles removed after collation are still included in the mapping
+    for tile in tiles:
+        (tmpdir / tile).unlink()
+    assert journal.completed_tile_hashes() == {
+        os.path.join(tmpdir, "ocean.res.nc"): tile_hashes
+    }
+
+    # Modified collated files are treated as incomplete
+    (tmpdir / "ocean.res.nc").write_bytes(b"partially collated")
+    assert not journal.is_complete("ocean.res.nc", tiles)
+
+    journal.remove()
+    assert not journal_path.exists()
+
+
+def test_collate_journal_restart_dir_unmodified():
+    """Test the collate journal is not written in the restart directory,
+    which would invalidate its restart index entry"""
+    archive_dir = tmpdir / "archive"
+    restart_dir = archive_dir / "restart000" / "ocean"
+    restart_dir.mkdir(parents=True)
+    (restart_dir / "ocean.res.nc.0000").write_bytes(b"tile")
+    (restart_dir / "ocean.res.nc").write_bytes(b"collated")
+    mtime_ns = restart_dir.stat().st_mtime_ns
+
+    journal = CollateJournal(restart_dir, archive_dir)
+    journal.record_complete("ocean.res.nc", ["ocean.res.nc.0000"])
+
+    assert journal.file_path == (archive_dir / "payu_jobs"
+                                 / "collate_journals"
+                                 / "restart000.ocean.json")
+    assert journal.file_path.is_file()
+    assert sorted(os.listdir(restart_dir)) == ["ocean.res.nc",
+                                               "ocean.res.nc.0000"]
+    assert restart_dir.stat().st_mtime_ns == mtime_ns
+
+
+@patch("payu.models.fms.hash")
+def test_restart_uncollated_hashes_reuses_known_hashes(mock_hash):
+    """Test tile hashes from the journal and restart manifest are not
+    recalculated"""
+    mock_hash.side_effect = lambda file_path, hashfn: f"md5_{os.path.basename(file_path)}"
+
+    archive_dir = tmpdir / "archive"
+    restart_dir = archive_dir / "restart002" / "ocean"
+    restart_dir.mkdir(parents=True)
+    tiles = [f"ocean.res.nc.000{n}" for n in range(3)]
+    for tile in tiles:
+        (restart_dir / tile).touch()
+
+    journal = CollateJournal(restart_dir, archive_dir)
+    journal.set_tile_hash(tiles[0], "journal_hash")
+    manifest_hashes = {
+        os.path.realpath(restart_dir / tiles[1]): "manifest_hash"
+    }
+
+    mock_model = MagicMock()
+    mock_model.expt.archive_path = str(archive_dir)
+    mnc_tiles = {str(restart_dir): {"ocean.res.nc": tiles}}
+
+    uncollate_hashes_dict = get_restart_uncollated_hashes(
+        mnc_tiles, mock_model, journals={str(restart_dir): journal},
+        manifest_hashes=manifest_hashes
+    )
+
+    assert uncollate_hashes_dict == {
+        "restart002": {
+            str(restart_dir / "ocean.res.nc"): [
+                "journal_hash", "manifest_hash", "md5_ocean.res.nc.0002"
+            ]
+        }
+    }
+    # Only the remaining tile is hashed
+    mock_hash.assert_called_once()
+
+
+def test_get_manifest_hashes_modified_files():
+    """Test full hashes in the restart manifest are only re-used for files
+    that are unchanged since the manifest was written"""
+    output_dir = tmpdir / "output000"
+    restart_dir = output_dir / "restart" / "ocean"
+    restart_dir.mkdir(parents=True)
+    tiles = [restart_dir / f"ocean.res.nc.000{n}" for n in range(3)]
+    for tile in tiles:
+        tile.write_bytes(b"tile")
+    (output_dir / "manifests").mkdir()
+
+    manifest = PayuManifest(str(output_dir / "manifests" / "restart.yaml"),
+                            ignore=[])
+    for tile in tiles:
+        manifest.add_filepath(tile.name, str(tile), ["binhash", "md5"])
+    manifest.add(filepaths=[tile.name for tile in tiles],
+                 hashfn=["binhash", "md5"], force=True,
+                 fullpaths=[str(tile) for tile in tiles])
+    manifest.dump()
+
+    # Modify a tile after the manifest is written, preserving its size
+    tiles[1].write_bytes(b"TILE")
+    os.utime(tiles[1], ns=(tiles[1].stat().st_atime_ns,
+                           tiles[1].stat().st_mtime_ns + 10**9))
+
+    mock_model = MagicMock()
+    mock_model.expt.output_path = str(output_dir)
+    mock_model.expt.control_path = str(tmpdir / "ctrl")
+
+    manifest_hashes = get_manifest_hashes(mock_model,
+                                          [str(tile) for tile in tiles[:2]])
+    assert manifest_hashes == {
+        os.path.realpath(tiles[0]): manifest.get(tiles[0].name, "md5")
+    }
+
+
+def test_hash_files_parallel():
+    """Test hashes calculated on a process pool match serial hashes"""
+    paths = []
+    for n in range(4):
+        path = tmpdir / f"file_{n}.nc"
+        path.write_bytes(os.urandom(1000))
+        paths.append(str(path))
+
+    assert hash_files(paths, nprocesses=4) == hash_files(paths, nprocesses=1)
+
+
+def make_watcher_tiles(work_dir, nc_fnames):
+    """Make tile sets last modified long ago in a work directory"""
+    work_dir.mkdir()
+    old_time = 1e9
+    for nc_fname in nc_fnames:
+        for n in range(2):
+            tile = work_dir / f"{nc_fname}.{n:04d}"
+            tile.write_bytes(b"0" * 10)
+            os.utime(tile, (old_time, old_time))
+
+
+def make_watcher(work_dir):
+    mock_model = MagicMock()
+    mock_model.work_path = str(work_dir)
+    mock_model.expt.config = {"collate": {}}
+    return CollateWatcher(mock_model, interval=1, idle=60)
+
+
+def mock_cmdthread(cmd, cwd):
+    nc_fname = cmd.split()[4]
+    (Path(cwd) / nc_fname).write_bytes(b"0" * 20)
+    return None, b"", 0.1
+
+
+@patch("payu.models.fms.get_collate_flags", return_value="-n4 -m -r -z")
+@patch("payu.models.fms.get_mppnc_path", return_value="mppnccombine")
+def test_collate_watcher(mock_mppnc_path, mock_collate_flags):
+    """Test idle tile sets are collated while the model is running, and
+    only replace the tiles once the model has finished"""
+    work_dir = tmpdir / "work"
+    make_watcher_tiles(work_dir, ["closed.nc", "open.nc", "reopened.nc"])
+    watcher = make_watcher(work_dir)
+    assert watcher.collate_flags == "-n4 -m -z"
+
+    with patch("payu.models.fms.cmdthread", side_effect=mock_cmdthread) as mock_cmd:
+        # Tile sets are only collated if unchanged since the previous poll
+        watcher.poll()
+        mock_cmd.assert_not_called()
+
+        # Tiles still being written are not collated
+        (work_dir / "open.nc.0001").write_bytes(b"0" * 20)
+
+        watcher.poll()
+        assert mock_cmd.call_count == 2
+
+    # Tiles are not removed while the model is running
+    assert sorted(os.listdir(work_dir)) == [
+        "closed.nc.0000", "closed.nc.0001", "closed.nc.payu-stream",
+        "open.nc.0000", "open.nc.0001",
+        "reopened.nc.0000", "reopened.nc.0001", "reopened.nc.payu-stream",
+    ]
+    assert watcher.collate_files == {}
+
+    # An idle tile set is written to again before the model finishes
+    (work_dir / "reopened.nc.0000").write_bytes(b"0" * 10)
+
+    watcher.finalize()
+
+    assert sorted(os.listdir(work_dir)) == [
+        "closed.nc", "open.nc.0000", "open.nc.0001",
+        "reopened.nc.0000", "reopened.nc.0001",
+    ]
+    assert watcher.collate_files == {
+        str(work_dir / "closed.nc"): {
+            "ntiles": 2,
+            "tile_bytes": 20,
+            "collated_bytes": 20,
+            "duration_seconds": 0.1,
+        }
+    }
+
+
+@patch("payu.models.fms.get_collate_flags", return_value="-n4 -m")
+@patch("payu.models.fms.get_mppnc_path", return_value="mppnccombine")
+def test_collate_watcher_stop_timeout(mock_mppnc_path, mock_collate_flags):
+    """Test a collation still running after the model has finished is left
+    for the collate job"""
+    work_dir = tmpdir / "work"
+    make_watcher_tiles(work_dir, ["ocean.nc"])
+    watcher = make_watcher(work_dir)
+    tiles = ["ocean.nc.0000", "ocean.nc.0001"]
+    signature = watcher.get_tile_signature(tiles)
+
+    release = threading.Event()
+
+    def mock_slow_cmdthread(cmd, cwd):
+        release.wait()
+        return mock_cmdthread(cmd, cwd)
+
+    with patch("payu.models.fms.cmdthread", side_effect=mock_slow_cmdthread):
+        watcher._thread = threading.Thread(
+            target=watcher.collate, args=("ocean.nc", tiles, signature)
+        )
+        watcher._thread.start()
+        with pytest.warns(UserWarning, match="did not finish"):
+            watcher.stop(timeout=0.1)
+        release.set()
+        watcher._thread.join()
+
+    watcher.finalize()
+    assert watcher.collate_files == {}
+    assert "ocean.nc" not in os.listdir(work_dir)
+    assert all((work_dir / tile).exists() for tile in tiles)
+
+
+def test_get_collate_engine():
+    assert get_collate_engine({}) == "mppnccombine"
+    assert get_collate_engine({"engine": "python"}) == "python"
+    with pytest.raises(errors.PayuConfigError):
+        get_collate_engine({"engine": "nccombine"})
+
+
+def test_fms_collate_python_engine():
+    """Test collation with the native python engine, which doesn't require
+    an mppnccombine executable"""
+    output_dir = tmpdir / "archive" / "output000" / "ocean"
+    make_fms_tiles(output_dir, "ocean.nc")
+    make_fms_tiles(output_dir, "ice.nc", layout=(4, 1))
+    # Unconfirmed file from streaming collation
+    (output_dir / "ocean.nc.payu-stream").write_bytes(b"partial")
+
+    mock_model = MagicMock()
+    mock_model.expt.config = {
+        "collate": {"engine": "python", "ncpus": 2}
+    }
+    mock_model.output_path = str(output_dir)
+    mock_model.prior_restart_path = None
+    mock_model.expt.output_path = str(output_dir)
+    mock_model.expt.control_path = str(tmpdir)
+    mock_model.expt.collate_files = {}
+
+    fms_collate(mock_model)
+
+    assert sorted(os.listdir(output_dir)) == ["ice.nc", "ocean.nc"]
+    collate_files = mock_model.expt.collate_files
+    assert collate_files[str(output_dir / "ocean.nc")]["ntiles"] == 6
+    assert collate_files[str(output_dir / "ice.nc")]["ntiles"] == 4
+    assert collate_files[str(output_dir / "ice.nc")]["collated_bytes"] > 0
@@ -1,12 +1,17 @@
 import copy
+import os
+from unittest.mock import MagicMock
 
 import f90nml
+import netCDF4
+import numpy as np
 import pytest
 from ruamel.yaml import YAML
 yaml = YAML()
 yaml.default_flow_style = False
 
 import payu.errors as errors
+from payu.models.mitgcm import Mitgcm, get_tile_fnames
 
 from test.common import cd, get_manifests
 from test.common import ctrldir, labdir, workdir
@@ -401,3 +406,79 @@ def test_setup_change_deltat(config, data, case):
     assert data_local['parm03']['deltaT'] == case['expected']['deltaT']
     assert data_local['parm03']['starttime'] == case['expected']['starttime']
     assert data_local['parm03']['endtime'] == case['expected']['endtime']
+
+
+def make_mnc_tiles(output_dir, field, nx=4, ny=6, npx=2, npy=3, nt=2):
+    """Make MITgcm mnc tiles of a field, returning the global field data"""
+    snx, sny = nx // npx, ny // npy
+    data = np.arange(nt * ny * nx, dtype='f4').reshape(nt, ny, nx)
+    for n in range(npx * npy):
+        xt, yt = n % npx, n // npx
+        tile_path = output_dir / f'{field}.t{n + 1:03d}.nc'
+        with netCDF4.Dataset(tile_path, 'w') as tile:
+            tile.setncatts({'Nx': nx, 'Ny': ny, 'sNx': snx, 'sNy': sny,
+                            'nPx': npx, 'nPy': npy, 'nSx': 1, 'nSy': 1,
+                            'tile_number': n + 1})
+            tile.createDimension('T', None)
+            tile.createDimension('Y', sny)
+            tile.createDimension('X', snx)
+            tile.createVariable('T', 'f8', ('T',))[:] = np.arange(nt)
+            eta = tile.createVariable('Eta', 'f4', ('T', 'Y', 'X'))
+            eta[:] = data[:, yt * sny:(yt + 1) * sny, xt * snx:(xt + 1) * snx]
+    return data
+
+
+def test_get_tile_fnames(tmp_path):
+    for f in ['state.0000000000.t001.nc', 'state.0000000000.t002.nc',
+              'phiHyd.0000000000.t001.nc', 'phiHyd.0000000000.t002.nc',
+              'pickup.0000000010.t001.nc', 'grid.t002.nc', 'data.nc',
+              'STDOUT.0000']:
+        (tmp_path / f).touch()
+
+    assert get_tile_fnames(tmp_path) == {
+        'phiHyd.0000000000.nc': [
+            str(tmp_path / 'phiHyd.0000000000.t001.nc'),
+            str(tmp_path / 'phiHyd.0000000000.t002.nc'),
+        ],
+        'state.0000000000.nc': [
+            str(tmp_path / 'state.0000000000.t001.nc'),
+            str(tmp_path / 'state.0000000000.t002.nc'),
+        ],
+    }
+
+
+def test_collate(tmp_path):
+    data = {field: make_mnc_tiles(tmp_path, field)
+            for field in ['state.0000000000', 'surf.0000000000']}
+
+    model = MagicMock()
+    model.output_path = str(tmp_path)
+    model.expt.config = {'collate': {'ncpus': 2}}
+    Mitgcm.collate(model)
+
+    assert sorted(os.listdir(tmp_path)) == ['state.0000000000.nc',
+                                            'surf.0000000000.nc']
+    for field, field_data in data.items():
+        with netCDF4.Dataset(tmp_path / f'{field}.nc') as ds:
+            np.testing.assert_array_equal(ds.variables['Eta'][:], field_data)
+
+
+def test_collate_failure_keeps_tiles(tmp_path):
+    make_mnc_tiles(tmp_path, 'state.0000000000')
+    make_mnc_tiles(tmp_path, 'surf.0000000000')
+    # A corrupt tile fails collation of its field
+    (tmp_path / 'surf.0000000000.t002.nc').write_bytes(b'corrupt')
+
+    model = MagicMock()
+    model.output_path = str(tmp_path)
+    model.expt.config = {'collate': {'threads': 2}}
+    with pytest.raises(errors.PayuRuntimeError,
+                       match='surf.0000000000.nc'):
+        Mitgcm.collate(model)
+
+    # Tiles are only removed for verified collated files
+    fnames = os.listdir(tmp_path)
+    assert 'state.0000000000.nc' in fnames
+    assert not any(f.startswith('state.0000000000.t') for f in fnames)
+    assert len([f for f in fnames
+                if f.startswith('surf.0000000000.t')]) == 6
@@ -107,7 +107,9 @@ def test_staged_cable():
 
     # Now prepare for a stage- should see changes in the configuration log
     # and the patched namelist in the workdir
-    model.setup()
+    # The configuration log is written to the current directory
+    with cd(ctrldir):
+        model.setup()
     expected_current_stage = expected_queued_stages.pop(0)
     assert model.configuration_log['current_stage'] == expected_current_stage
     assert model.configuration_log['queued_stages'] == expected_queued_stages
@@ -132,7 +134,8 @@ def test_staged_cable():
     assert stage_nml == expected_namelist
 
     # Archive the stage and make sure the configuration log is correct
-    model.archive()
+    with cd(ctrldir):
+        model.archive()
     expected_comp_stages = [expected_current_stage]
     expected_current_stage = ''
     assert model.configuration_log['completed_stages'] == expected_comp_stages
@@ -30,6 +30,7 @@ def parse_args(parser, cmd):
     run_cmd = args.pop("run_cmd")
     stacktrace = args.pop("stacktrace")
     log_level = args.pop("log_level")
+    profile_payu = args.pop("profile_payu")
     return run_cmd, args
 
 def test_parse(parser):
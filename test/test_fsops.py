@@ -7,6 +7,8 @@ from pathlib import Path
 
 # import payu packages
 from payu.fsops import atomic_write_file, movetree, list_sorted_archive_dirs, get_size
+from payu.fsops import find_first_line, find_last_line
+import payu.fsops as fsops
 
 # import some common variables for testing
 from .common import tmpdir, testdir, labdir, archive_dir, make_all_files
@@ -197,4 +199,66 @@ def test_get_size(setup_test_dir, write_dir_with_size, file_sizes):
 
     # Assert the calculation gets an expected total size
     expected_size = sum(file_sizes) * 2 / 1024 **3 # Convert bytes to GB
-    assert get_size(test_dir) == expected_size
\ No newline at end of file
+    assert get_size(test_dir) == expected_size
+
+
+def test_find_last_line(tmp_path, monkeypatch):
+    """Test last matching line is found, and cached searches only read
+    lines appended to the file"""
+    # Use small chunks to check lines spanning chunks
+    monkeypatch.setattr(fsops, "LINE_SEARCH_CHUNK_SIZE", 7)
+    log_path = tmp_path / "model.log"
+    log_path.write_text("header\nstep 1\nother\nstep 2\nother\n")
+
+    assert find_last_line(log_path, r"^step") == "step 2"
+    assert find_last_line(log_path, r"^missing") is None
+
+    # Partially written lines are only used if they match
+    with open(log_path, "a") as f:
+        f.write("other\nstep 3\nste")
+    assert find_last_line(log_path, r"^step") == "step 3"
+    assert find_last_line(log_path, r"^ste") == "ste"
+
+    with open(log_path, "a") as f:
+        f.write("p 4\nother\n")
+    cache = fsops._line_search_cache[
+        (os.path.abspath(log_path), r"^step", "last")
+    ]
+    offset = cache["offset"]
+    read_lines = []
+    original_read_lines = fsops._read_lines_reversed
+
+    def read_lines_reversed(f, start, end):
+        read_lines.append((start, end))
+        return original_read_lines(f, start, end)
+
+    monkeypatch.setattr(fsops, "_read_lines_reversed", read_lines_reversed)
+    assert find_last_line(log_path, r"^step") == "step 4"
+    assert read_lines == [(offset, log_path.stat().st_size)]
+
+    # No matches in the appended lines uses the cached line
+    with open(log_path, "a") as f:
+        f.write("other\n")
+    assert find_last_line(log_path, r"^step") == "step 4"
+
+    # Rewritten files are searched again
+    log_path.write_text("header\nstep 10\nother line\nother line\n")
+    assert find_last_line(log_path, r"^step") == "step 10"
+
+
+def test_find_first_line(tmp_path):
+    """Test first matching line is found and cached"""
+    log_path = tmp_path / "model.log"
+    log_path.write_text("STEPS = 2\nother\n")
+
+    assert find_first_line(log_path, "SECS") is None
+    assert find_first_line(log_path, "STEPS") == "STEPS = 2"
+
+    with open(log_path, "a") as f:
+        f.write("SECS = 3600\nSTEPS = 4\n")
+    assert find_first_line(log_path, "SECS") == "SECS = 3600"
+    assert find_first_line(log_path, "STEPS") == "STEPS = 2"
+
+    # Rewritten files are searched again
+    log_path.write_text("STEPS = 48\nSECS = 86400\n")
+    assert find_first_line(log_path, "STEPS") == "STEPS = 48"
@@ -0,0 +1,100 @@
+import os
+import threading
+
+import pytest
+
+from payu import iostats
+from payu.fsops import get_size
+
+
+def test_account(tmp_path):
+    """Test the I/O of a stage is added to the stage's totals"""
+    for i in range(3):
+        (tmp_path / f"file{i}").write_bytes(b"x" * 100_000)
+
+    io_stats = {}
+    with iostats.account(io_stats, "archive"):
+        os.listdir(tmp_path)
+        get_size(tmp_path)
+        with open(tmp_path / "file0", 'rb') as f:
+            f.read()
+
+    stats = io_stats["archive"]
+    assert stats["files_opened"] == 1
+    # os.walk in get_size lists the directory again
+    assert stats["dir_listings"] == 2
+    # Each file is checked for a symbolic link, and its size
+    assert stats["stat_calls"] == 6
+
+    if os.path.exists(iostats.PROC_IO_PATH):
+        assert stats["bytes_read"] >= 100_000
+        assert stats["read_calls"] >= 1
+        assert "bytes_written" in stats
+        assert "write_calls" in stats
+    assert "child_bytes_read" in stats
+    assert "child_bytes_written" in stats
+
+    # Stages accounted more than once are summed
+    with iostats.account(io_stats, "archive"):
+        with open(tmp_path / "file1", 'rb') as f:
+            f.read()
+    assert io_stats["archive"]["files_opened"] == 2
+    assert io_stats["archive"]["dir_listings"] == 2
+
+
+def test_account_exception(tmp_path):
+    """Test the I/O of a stage is accounted if the stage fails"""
+    io_stats = {}
+    with pytest.raises(FileNotFoundError):
+        with iostats.account(io_stats, "setup"):
+            os.listdir(tmp_path / "missing")
+    assert io_stats["setup"]["dir_listings"] == 1
+
+
+def test_read_proc_io_missing(monkeypatch, tmp_path):
+    """Test no byte counts are recorded where /proc/self/io is missing"""
+    monkeypatch.setattr(iostats, "PROC_IO_PATH", str(tmp_path / "io"))
+    io_stats = {}
+    with iostats.account(io_stats, "sync"):
+        iostats.count_stat(3)
+    assert io_stats["sync"] == {
+        "child_bytes_read": 0,
+        "child_bytes_written": 0,
+        "files_opened": 0,
+        "stat_calls": 3,
+        "dir_listings": 0,
+    }
+
+
+def test_counted_stat(tmp_path):
+    """Test stat calls made through the helper are counted"""
+    io_stats = {}
+    with iostats.account(io_stats, "manifest"):
+        assert iostats.counted_stat(os.path.exists, tmp_path)
+        assert not iostats.counted_stat(os.path.islink, tmp_path)
+    assert io_stats["manifest"]["stat_calls"] == 2
+
+
+def test_pause_is_per_thread(tmp_path):
+    """Test reading the counters in one thread does not stop the I/O of
+    other threads being counted"""
+    paused = threading.Event()
+    release = threading.Event()
+
+    def pause():
+        iostats._local.paused = True
+        paused.set()
+        release.wait()
+        iostats._local.paused = False
+
+    thread = threading.Thread(target=pause)
+    thread.start()
+    paused.wait()
+    try:
+        io_stats = {}
+        with iostats.account(io_stats, "collate"):
+            os.listdir(tmp_path)
+    finally:
+        release.set()
+        thread.join()
+    assert io_stats["collate"]["dir_listings"] == 1
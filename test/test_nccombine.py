@@ -0,0 +1,79 @@
+import netCDF4
+import numpy as np
+
+from payu.nccombine import combine, get_decomposition, nccombine_thread
+
+from test.common import make_fms_tiles
+
+
+def test_combine(tmp_path):
+    tile_paths, data = make_fms_tiles(tmp_path, 'ocean.nc')
+    output_path = tmp_path / 'ocean.nc'
+
+    combine(tile_paths, output_path)
+
+    with netCDF4.Dataset(output_path) as ds:
+        assert ds.dimensions['xt'].size == 8
+        assert ds.dimensions['yt'].size == 6
+        assert ds.dimensions['time'].isunlimited()
+        np.testing.assert_array_equal(ds.variables['temp'][:], data)
+        np.testing.assert_array_equal(ds.variables['xt'][:], np.arange(8))
+        np.testing.assert_array_equal(ds.variables['time'][:], [0, 1])
+
+        # Decomposition attributes are removed from the collated file
+        assert get_decomposition(ds) == {}
+        assert 'NumFilesInSet' not in ds.ncattrs()
+        assert ds.filename == 'ocean.nc'
+        assert ds.variables['temp'].long_name == 'Temperature'
+        assert ds.variables['temp'].filters()['zlib']
+        # Chunks are aligned with the tile layout
+        assert ds.variables['temp'].chunking() == [1, 3, 2, 4]
+
+
+def test_combine_masked_tiles(tmp_path):
+    tile_paths, data = make_fms_tiles(tmp_path, 'ocean.nc',
+                                      masked_tiles=(1,))
+    output_path = tmp_path / 'ocean.nc'
+
+    combine(tile_paths, output_path, complevel=0)
+
+    with netCDF4.Dataset(output_path) as ds:
+        ds.set_auto_mask(False)
+        temp = ds.variables['temp'][:]
+        assert not ds.variables['temp'].filters()['zlib']
+
+    # Regions of missing tiles are filled with the fill value
+    np.testing.assert_array_equal(temp[..., 0:2, 4:8],
+                                  np.float32(-1e20))
+    np.testing.assert_array_equal(temp[..., 0:2, 0:4],
+                                  data[..., 0:2, 0:4])
+    np.testing.assert_array_equal(temp[..., 2:6, :], data[..., 2:6, :])
+
+
+def test_combine_small_blocks(tmp_path):
+    tile_paths, data = make_fms_tiles(tmp_path, 'ocean.nc')
+    output_path = tmp_path / 'ocean.nc'
+
+    # Copy a record at a time
+    combine(tile_paths, output_path, block_size=1)
+
+    with netCDF4.Dataset(output_path) as ds:
+        np.testing.assert_array_equal(ds.variables['temp'][:], data)
+
+
+def test_nccombine_thread(tmp_path):
+    tile_paths, data = make_fms_tiles(tmp_path, 'ocean.nc')
+    tiles = [p.name for p in tile_paths]
+
+    rc, output, elapsed_time = nccombine_thread('ocean.nc', tiles, tmp_path)
+
+    assert rc is None
+    assert elapsed_time >= 0
+    assert (tmp_path / 'ocean.nc').exists()
+    assert not any(p.exists() for p in tile_paths)
+
+    # Errors are returned, as for a failed mppnccombine command
+    rc, output, _ = nccombine_thread('missing.nc', ['missing.nc.0000'],
+                                     tmp_path)
+    assert rc == 1
+    assert b'missing.nc.0000' in output
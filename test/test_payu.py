@@ -2,6 +2,7 @@ from io import StringIO
 import os
 import payu.branch
 import pytest
+import shutil
 import stat
 import sys
 from unittest.mock import patch, MagicMock
@@ -35,23 +36,25 @@ def test_read_config():
     # Raise a non-ENOENT error (e.g. EACCES)
     config_tmp = 'config_tmp.yaml'
     config_file = open(config_tmp, 'w')
-    os.chmod(config_tmp, 0)
+    try:
+        os.chmod(config_tmp, 0)
 
-    with pytest.raises(IOError):
-        payu.fsops.read_config(config_tmp)
+        with pytest.raises(IOError):
+            payu.fsops.read_config(config_tmp)
 
-    os.chmod(config_tmp, stat.S_IWUSR | stat.S_IREAD)
-    config_file.close()
+        os.chmod(config_tmp, stat.S_IWUSR | stat.S_IREAD)
+        config_file.close()
 
-    config = payu.fsops.read_config(config_tmp)
+        config = payu.fsops.read_config(config_tmp)
 
-    assert(config.pop('collate') == {})
-    assert(config.pop('control_path') == os.getcwd())
-    assert(config.pop('modules') == {})
-    assert(config.pop('archive') == {})
-    assert(config == {})
-
-    os.remove(config_tmp)
+        assert(config.pop('collate') == {})
+        assert(config.pop('control_path') == os.getcwd())
+        assert(config.pop('modules') == {})
+        assert(config.pop('archive') == {})
+        assert(config == {})
+    finally:
+        config_file.close()
+        os.remove(config_tmp)
 
 
 def test_read_config_modules_legacy_option():
@@ -84,33 +87,36 @@ def test_make_symlink():
 
     # Simple symlink test
     tmp = open(tmp_path, 'w')
-    payu.fsops.make_symlink(tmp_path, tmp_sym)
-
-    # Override an existing symlink
     tmp_alt = open(tmp_alt_path, 'w')
-    payu.fsops.make_symlink(tmp_alt_path, tmp_sym)
-
-    # Try to create symlink when filename already exists
-    # TODO: validate stdout
-    sys.stdout = StringIO()
-    payu.fsops.make_symlink(tmp_path, tmp_alt_path)
-    sys.stdout = sys.__stdout__
-
-    # Raise a non-EEXIST signal (EACCESS)
-    tmp_dir_sym = os.path.join(tmp_dir, tmp_sym)
-    os.mkdir(tmp_dir)
-    os.chmod(tmp_dir, 0)
-    with pytest.raises(OSError):
-        payu.fsops.make_symlink(tmp_path, tmp_dir_sym)
-
-    # Cleanup
-    tmp.close()
-    tmp_alt.close()
-
-    os.rmdir(tmp_dir)
-    os.remove(tmp_sym)
-    os.remove(tmp_path)
-    os.remove(tmp_alt_path)
+    try:
+        payu.fsops.make_symlink(tmp_path, tmp_sym)
+
+        # Override an existing symlink
+        payu.fsops.make_symlink(tmp_alt_path, tmp_sym)
+
+        # Try to create symlink when filename already exists
+        # TODO: validate stdout
+        sys.stdout = StringIO()
+        payu.fsops.make_symlink(tmp_path, tmp_alt_path)
+        sys.stdout = sys.__stdout__
+
+        # Raise a non-EEXIST signal (EACCESS)
+        tmp_dir_sym = os.path.join(tmp_dir, tmp_sym)
+        os.mkdir(tmp_dir)
+        os.chmod(tmp_dir, 0)
+        with pytest.raises(OSError):
+            payu.fsops.make_symlink(tmp_path, tmp_dir_sym)
+    finally:
+        # Cleanup
+        tmp.close()
+        tmp_alt.close()
+
+        if os.path.isdir(tmp_dir):
+            os.chmod(tmp_dir, stat.S_IRWXU)
+            shutil.rmtree(tmp_dir)
+        for path in [tmp_sym, tmp_path, tmp_alt_path]:
+            if os.path.lexists(path):
+                os.remove(path)
 
 
 def test_splitpath():
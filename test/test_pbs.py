@@ -454,7 +454,7 @@ def test_tenacity():
     # This should fail and do nothing
     pbs.get_job_info_json()
 
-def test_get_all_job_info(monkeypatch):
+def test_get_all_job_info(monkeypatch, tmp_path):
     """Test that get_all_job_info correctly parses the results."""
     fake_qstat = {
         "timestamp": "2026-03-03T10:00:00",
@@ -494,9 +494,55 @@ def test_get_all_job_info(monkeypatch):
     }
 
     monkeypatch.setattr(pbs, "get_job_info_json", lambda: fake_qstat)
+    monkeypatch.setenv("PAYU_QSTAT_CACHE", str(tmp_path / "qstat.json"))
     result = PBS().get_all_job_info()
     assert result == expected
 
+
+def test_get_cached_job_info_json(monkeypatch, tmp_path):
+    """Test qstat output is shared through the cache file until it expires"""
+    qstat_json_path = tmp_path / "pbs" / "qstat.json"
+    monkeypatch.setenv("PAYU_QSTAT_CACHE", str(qstat_json_path))
+    monkeypatch.setenv("PAYU_QSTAT_CACHE_TTL", "10")
+
+    calls = []
+
+    def fake_get_job_info_json():
+        calls.append(1)
+        return {"Jobs": {"12345": {"job_state": "R"}}, "query": len(calls)}
+
+    monkeypatch.setattr(pbs, "get_job_info_json", fake_get_job_info_json)
+
+    info = pbs.get_cached_job_info_json()
+    assert info["query"] == 1
+    assert qstat_json_path.exists()
+    assert not Path(str(qstat_json_path) + ".lock").exists()
+
+    # Repeated queries within the TTL re-use the cached output
+    info = pbs.get_cached_job_info_json()
+    assert info["query"] == 1
+    assert len(calls) == 1
+
+    # Expired cache is refreshed
+    cache = json.loads(qstat_json_path.read_text())
+    cache["timestamp"] -= 11
+    qstat_json_path.write_text(json.dumps(cache))
+    info = pbs.get_cached_job_info_json()
+    assert info["query"] == 2
+
+    # Failed queries are not cached
+    qstat_json_path.unlink()
+    monkeypatch.setattr(pbs, "get_job_info_json", lambda: None)
+    assert pbs.get_cached_job_info_json() is None
+    assert not qstat_json_path.exists()
+
+    # Setting the TTL to 0 disables the cache
+    monkeypatch.setenv("PAYU_QSTAT_CACHE_TTL", "0")
+    monkeypatch.setattr(pbs, "get_job_info_json", fake_get_job_info_json)
+    info = pbs.get_cached_job_info_json()
+    assert info["query"] == 3
+    assert not qstat_json_path.exists()
+
 @patch('os.getgroups')
 @patch('grp.getgrgid')
 def test_get_user_groups(mock_getgrgid, mock_getgroups):
@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from payu.perf import build_perf_info, detect_regressions, display_perf_info
+
+
+def write_run_job_file(archive_path, run_number, sypd, exe_hash="abc",
+                       status=0, job_id=None):
+    """Write a run job file with one model year simulated at a given SYPD"""
+    job_id = job_id or f"{run_number}.gadi-pbs"
+    job_file = (archive_path / "payu_jobs" / str(run_number) / "run"
+                / f"{job_id}.json")
+    job_file.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "scheduler_job_id": job_id,
+        "payu_current_run": run_number,
+        "payu_run_status": status,
+        "payu_config": {"model": "test", "ncpus": 10},
+        "manifests": {
+            "exe": {
+                "work/model.exe": {
+                    "fullpath": "/path/to/model.exe",
+                    "hashes": {"binhash": exe_hash},
+                }
+            }
+        },
+        "model_start_time": f"{1900 + run_number}-01-01T00:00:00",
+        "model_finish_time": f"{1901 + run_number}-01-01T00:00:00",
+        "model_calendar": "noleap",
+        "timings": {
+            "payu_start_time": f"2025-01-0{run_number + 1}T00:00:00",
+            "payu_model_run_duration_seconds": 86400 / sypd,
+        },
+    }
+    with open(job_file, "w") as f:
+        json.dump(data, f)
+    return job_file
+
+
+def test_build_perf_info(tmp_path):
+    """Test throughput of successful runs is summarised and a drop in SYPD
+    after an executable change is flagged"""
+    archive_path = tmp_path / "archive"
+    for run_number, sypd in enumerate([10, 10, 8]):
+        write_run_job_file(archive_path, run_number, sypd)
+    for run_number, sypd in [(3, 5), (4, 5)]:
+        write_run_job_file(archive_path, run_number, sypd, exe_hash="def")
+    # Failed runs are ignored
+    write_run_job_file(archive_path, 4, 1, status=1, job_id="5.gadi-pbs")
+
+    data = build_perf_info(archive_path)
+
+    runs = data["runs"]
+    assert [run["run_number"] for run in runs] == [0, 1, 2, 3, 4]
+    assert [run["sypd"] for run in runs] == [10, 10, 8, 5, 5]
+    assert runs[0]["core_hours_per_simulated_year"] == 24.0
+    assert [run["slow"] for run in runs] == [False, False, True, False, False]
+    assert runs[0]["exe"] != runs[3]["exe"]
+    assert runs[0]["config"] == runs[3]["config"]
+
+    assert data["summary"]["n_runs"] == 5
+    assert data["summary"]["simulated_years"] == 5
+    assert data["summary"]["sypd"] == 8
+
+    assert data["regressions"] == [{
+        "run_number": 3,
+        "changed": ["exe"],
+        "previous_sypd": 10,
+        "sypd": 5,
+        "sypd_change_fraction": -0.5,
+    }]
+
+
+@pytest.mark.parametrize("sypds, n_regressions", [
+    ([10, 10, 9.5], 0),
+    ([10, 10, 12], 0),
+    ([10, 10, 8], 1),
+])
+def test_detect_regressions(sypds, n_regressions):
+    """Test only drops in SYPD larger than the threshold are flagged"""
+    runs = [
+        {"run_number": i, "sypd": sypd, "config": "a", "exe": str(i > 1)}
+        for i, sypd in enumerate(sypds)
+    ]
+    assert len(detect_regressions(runs, threshold=0.1)) == n_regressions
+
+
+def test_display_perf_info(tmp_path, capsys):
+    """Test the table of run throughput is displayed"""
+    archive_path = tmp_path / "archive"
+    write_run_job_file(archive_path, 0, 10)
+    write_run_job_file(archive_path, 1, 5, exe_hash="def")
+
+    display_perf_info(build_perf_info(archive_path))
+
+    output = capsys.readouterr().out
+    assert "SYPD" in output
+    assert "Median" in output
+    assert "Warning: SYPD dropped by 50% from run 1 after exe changes" in output
+
+    display_perf_info(build_perf_info(tmp_path / "empty"))
+    assert "No successful run information" in capsys.readouterr().out
@@ -0,0 +1,81 @@
+import pstats
+import sys
+
+import pytest
+
+import payu.cli
+from payu import profiling
+
+
+@pytest.fixture(autouse=True)
+def reset_output_dir(monkeypatch):
+    """Reset the profile output directory set by loaded experiments"""
+    monkeypatch.setattr(profiling, "_output_dir", None)
+
+
+def example_cmd(n, fail=False):
+    """Example payu command to profile"""
+    total = sum(range(n))
+    if fail:
+        raise ValueError("Command failed")
+    return total
+
+
+def test_execute_command_profile(tmp_path, monkeypatch, capsys):
+    """Test the command is profiled to the run's payu_jobs directory"""
+    monkeypatch.delenv(profiling.PROFILE_ENV, raising=False)
+    archive_path = tmp_path / "archive"
+    profiling.set_output_dir(archive_path, 3)
+    # Only the first loaded experiment is used
+    profiling.set_output_dir(archive_path, 4)
+
+    payu.cli._execute_command(example_cmd, profile=True, n=10)
+
+    profile_path, = (archive_path / "payu_jobs" / "3").glob("*.prof")
+    assert profile_path.name.startswith("payu-test_profiling-")
+    assert f"written to {profile_path}" in capsys.readouterr().out
+    stats = pstats.Stats(str(profile_path))
+    assert any(func[2] == "example_cmd" for func in stats.stats)
+
+    summary = profile_path.with_suffix(".prof.txt").read_text()
+    assert summary.startswith("payu test_profiling\n")
+    assert "Peak RSS (payu):" in summary
+    assert "Peak RSS (children):" in summary
+    assert "example_cmd" in summary
+
+
+def test_execute_command_profile_env(tmp_path, monkeypatch):
+    """Test profiling is enabled by the environment, e.g. in submitted
+    jobs, and failed commands are profiled"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv(profiling.PROFILE_ENV, "1")
+    assert payu.cli.set_env_vars()[profiling.PROFILE_ENV] == "1"
+
+    with pytest.raises(SystemExit):
+        payu.cli._execute_command(example_cmd, n=10, fail=True)
+
+    # Without an experiment, the profile is written to current directory
+    assert len(list(tmp_path.glob("payu-test_profiling-*.prof"))) == 1
+    assert len(list(tmp_path.glob("payu-test_profiling-*.prof.txt"))) == 1
+
+
+def test_execute_command_no_profile(tmp_path, monkeypatch):
+    """Test commands are not profiled by default"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv(profiling.PROFILE_ENV, raising=False)
+    payu.cli._execute_command(example_cmd, n=10)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_parse_profile_payu(monkeypatch):
+    """Test the --profile-payu flag is passed to the command execution"""
+    # Restore the environment variable set by the flag after the test
+    monkeypatch.setenv(profiling.PROFILE_ENV, "")
+    monkeypatch.setattr(sys, "argv", ["payu", "list", "--profile-payu"])
+    calls = []
+    monkeypatch.setattr(payu.cli, "_execute_command",
+                        lambda func, **kwargs: calls.append(kwargs))
+    payu.cli.parse()
+    assert calls[0]["profile"] is True
+    assert "profile_payu" not in calls[0]
+    assert payu.cli.os.environ[profiling.PROFILE_ENV] == "1"
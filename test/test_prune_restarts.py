@@ -1,5 +1,7 @@
 import copy
+import os
 import shutil
+from unittest.mock import patch
 
 import pytest
 import cftime
@@ -36,8 +38,8 @@ def teardown():
     # Remove any created restart files
     remove_expt_archive_dirs(type='restart')
 
-    # Remove experiment archive
-    expt_archive_dir.rmdir()
+    # Remove experiment archive (including restart index)
+    shutil.rmtree(expt_archive_dir)
 
 
 def create_test_2Y_1_month_frequency_restarts():
@@ -245,3 +247,48 @@ def test_restart_history_with_empty_archive():
         restarts_to_prune = expt.get_restarts_to_prune()
 
     assert restarts_to_prune == []
+
+
+def test_prune_restarts_uses_restart_index():
+    # Test restart datetimes are parsed once and re-used from the index
+    write_test_config(restart_freq='2YS')
+
+    restart_datetimes = [(0, cftime.datetime(1901, 1, 1, calendar="noleap")),
+                         (1, cftime.datetime(1902, 1, 1, calendar="noleap")),
+                         (2, cftime.datetime(1903, 1, 1, calendar="noleap")),
+                         (3, cftime.datetime(1904, 1, 1, calendar="noleap"))]
+    for index, datetime in restart_datetimes:
+        make_ocean_restart_dir(start_dt=cftime.datetime(1900, 1, 1, calendar="noleap"),
+                               run_dt=datetime,
+                               restart_index=index,
+                               additional_path='ocean')
+
+    with cd(ctrldir):
+        lab = payu.laboratory.Laboratory(lab_path=str(labdir))
+        expt = payu.experiment.Experiment(lab, reproduce=False)
+        assert expt.get_restarts_to_prune() == ['restart001']
+
+    index_path = expt_archive_dir / 'payu_jobs' / 'restart_index.json'
+    assert index_path.exists()
+
+    with cd(ctrldir):
+        lab = payu.laboratory.Laboratory(lab_path=str(labdir))
+        expt = payu.experiment.Experiment(lab, reproduce=False)
+        with patch.object(expt.model, 'get_restart_datetime',
+                          side_effect=AssertionError("Restart parsed")):
+            assert expt.get_restarts_to_prune() == ['restart001']
+
+    # Modifying a restart directory invalidates its entry
+    restart_path = expt_archive_dir / 'restart003'
+    stat = restart_path.stat()
+    os.utime(restart_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+
+    with cd(ctrldir):
+        lab = payu.laboratory.Laboratory(lab_path=str(labdir))
+        expt = payu.experiment.Experiment(lab, reproduce=False)
+        parse = expt.model.get_restart_datetime
+        with patch.object(expt.model, 'get_restart_datetime',
+                          wraps=parse) as mock_parse:
+            assert expt.get_restarts_to_prune() == ['restart001']
+
+        mock_parse.assert_called_once_with(str(restart_path))
@@ -434,11 +434,21 @@ def test_setup_timing():
         expt.setup()
 
     # Check setup method time has been recorded
-    assert len(expt.timings) == 3
+    assert len(expt.timings) == 4
     assert 'payu_setup_duration_seconds' in expt.timings
     assert isinstance(expt.timings['payu_setup_duration_seconds'], float)
     assert 'setup_userscript_duration_seconds' in expt.timings
     assert isinstance(expt.timings['setup_userscript_duration_seconds'], float)
+    assert isinstance(
+        expt.timings['payu_check_manifests_duration_seconds'], float
+    )
+
+    # Check I/O of setup and the manifests has been recorded
+    assert set(expt.io_stats) == {'setup', 'manifest'}
+    assert expt.io_stats['manifest']['files_opened'] > 0
+    assert expt.io_stats['setup']['stat_calls'] > 0
+    assert (expt.io_stats['setup']['files_opened']
+            >= expt.io_stats['manifest']['files_opened'])
 
 
 def test_setup_telemetry_file(tmp_path):
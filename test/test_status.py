@@ -1,9 +1,11 @@
 import json
+import datetime
+import os
 import pytest
 from freezegun import freeze_time
 import cftime
 import shutil
-from unittest.mock import Mock, MagicMock
+from unittest.mock import Mock, MagicMock, patch
 
 from test.common import cd, tmpdir, labdir, write_config, ctrldir_basename, ctrldir
 
@@ -12,13 +14,22 @@ from payu.status import (
     find_file_match,
     get_scheduler_log,
     find_scheduler_logs,
+    scan_scheduler_logs,
+    index_scheduler_logs,
+    build_lab_job_info,
+    update_lab_job_files,
+    display_lab_job_info,
     get_job_file_list,
     build_job_info,
     display_job_info,
     collect_expt_paths,
     display_expt_paths,
+    update_model_throughput,
+    watch_job_info,
+    format_table,
 )
 
+from payu.telemetry import rebuild_job_index, read_job_index
 from payu.laboratory import Laboratory
 from payu.experiment import Experiment
 from payu.subcommands.status_cmd import runcmd
@@ -110,6 +121,46 @@ def test_find_scheduler_logs_pbs(tmp_path, scheduler, jobid, base_dir,
     assert path2 == stderr_path
 
 
+def test_scan_scheduler_logs(tmp_path):
+    """Test scheduler logs are mapped to job IDs with a single scan, and logs
+    in the control directory take precedence"""
+    control_path = tmp_path / "control"
+    pbs_logs = tmp_path / "archive" / "pbs_logs"
+    for path in [
+        control_path / "expt.o123",
+        control_path / "config.yaml",
+        pbs_logs / "expt.o123",
+        pbs_logs / "expt.e123",
+        pbs_logs / "expt_c.o456",
+        pbs_logs / "slurm-789.out",
+    ]:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+
+    log_map = scan_scheduler_logs(control_path, tmp_path / "archive")
+    assert log_map == {
+        ".o123": control_path / "expt.o123",
+        ".e123": pbs_logs / "expt.e123",
+        ".o456": pbs_logs / "expt_c.o456",
+        "slurm-789.out": pbs_logs / "slurm-789.out",
+    }
+
+    for job_id, type, expected in [
+        ("123.gadi-pbs", "pbs",
+         (control_path / "expt.o123", pbs_logs / "expt.e123")),
+        ("456", "pbs", (pbs_logs / "expt_c.o456", None)),
+        ("789", "slurm", (pbs_logs / "slurm-789.out", None)),
+        ("000", "pbs", (None, None)),
+    ]:
+        assert find_scheduler_logs(
+            job_id=job_id,
+            control_path=control_path,
+            archive_path=tmp_path / "archive",
+            type=type,
+            log_map=log_map
+        ) == expected
+
+
 def write_job_file(archive_path, job_id, run_number, job_data, type="run"):
     """Helper function to write job data to a file"""
     job_file = (
@@ -648,6 +699,188 @@ def test_build_job_info_collate(tmp_path, archive_jobs, running_collate_jobs,
     assert all_runs == expected
 
 
+@pytest.mark.parametrize(
+    "archive_jobs, running_collate_jobs, archived_collate_jobs, failed_collate_jobs",
+    [(True, True, True, True)],
+    indirect=True
+)
+@pytest.mark.parametrize("all_runs", [True, False])
+def test_build_job_info_job_index(tmp_path, archive_jobs, running_collate_jobs,
+                                  archived_collate_jobs, failed_collate_jobs,
+                                  all_runs):
+    """Test job info read from the job index matches parsing job files"""
+    archive_path = tmp_path / "archive"
+    mock_expt = MagicMock()
+    expected = build_job_info(
+        control_path=tmp_path / "control",
+        archive_path=archive_path,
+        all_runs=all_runs,
+        expt=mock_expt
+    )
+
+    rebuild_job_index(archive_path)
+    with patch("payu.status.read_job_file",
+               side_effect=AssertionError("Job file parsed")):
+        data = build_job_info(
+            control_path=tmp_path / "control",
+            archive_path=archive_path,
+            all_runs=all_runs,
+            expt=mock_expt
+        )
+    assert data == expected
+
+
+def test_build_job_info_job_index_updates(tmp_path):
+    """Test modified job files are re-read, and archived logs are recorded
+    in the job index"""
+    archive_path = tmp_path / "archive"
+    job_data = {
+        "scheduler_job_id": "123.gadi-pbs",
+        "scheduler_type": "pbs",
+        "payu_current_run": 0,
+        "stage": "model-run",
+    }
+    job_file = write_job_file(archive_path, "123.gadi-pbs", 0, job_data)
+    rebuild_job_index(archive_path)
+
+    # Job file is modified without updating the index
+    job_data.update({"stage": "archive", "payu_run_status": 0})
+    with open(job_file, 'w') as f:
+        json.dump(job_data, f)
+    os.utime(job_file, ns=(0, 0))
+
+    log_path = archive_path / "pbs_logs" / "job.o123"
+    log_path.parent.mkdir()
+    log_path.touch()
+
+    data = build_job_info(
+        control_path=tmp_path / "control",
+        archive_path=archive_path,
+        expt=MagicMock()
+    )
+    run_info = data["runs"][0]["run"][0]
+    assert run_info["stage"] == "archive"
+    assert run_info["exit_status"] == 0
+    assert run_info["stdout_file"] == str(log_path)
+
+    entry = read_job_index(archive_path)["0/run/123.gadi-pbs.json"]
+    assert entry["stage"] == "archive"
+    assert entry["stdout_file"] == str(log_path)
+
+
+def test_build_job_info_job_index_unindexed(tmp_path):
+    """Test job files missing from the job index are listed, and added to
+    the index"""
+    archive_path = tmp_path / "archive"
+    job_data = {
+        "scheduler_job_id": "123.gadi-pbs",
+        "scheduler_type": "pbs",
+        "payu_current_run": 0,
+        "stage": "archive",
+    }
+    write_job_file(archive_path, "123.gadi-pbs", 0, job_data)
+    rebuild_job_index(archive_path)
+
+    # Job file copied in without updating the index
+    job_data.update({"scheduler_job_id": "456.gadi-pbs",
+                     "payu_current_run": 1, "stage": "model-run"})
+    job_file = write_job_file(archive_path, "456.gadi-pbs", 1, job_data)
+    assert "1/run/456.gadi-pbs.json" not in read_job_index(archive_path)
+
+    data = build_job_info(
+        control_path=tmp_path / "control",
+        archive_path=archive_path,
+        all_runs=True,
+        expt=MagicMock()
+    )
+    assert data["runs"][1]["run"][0]["stage"] == "model-run"
+    assert data["runs"][0]["run"][0]["stage"] == "archive"
+
+    entry = read_job_index(archive_path)["1/run/456.gadi-pbs.json"]
+    assert entry["stage"] == "model-run"
+    assert entry["mtime_ns"] == job_file.stat().st_mtime_ns
+
+
+def test_index_scheduler_logs(tmp_path):
+    """Test log paths moved to pbs_logs are recorded in the job index"""
+    archive_path = tmp_path / "archive"
+    for job_id in ["123.gadi-pbs", "456.gadi-pbs"]:
+        write_job_file(archive_path, job_id, 0, {
+            "scheduler_job_id": job_id,
+            "scheduler_type": "pbs",
+            "payu_current_run": 0,
+            "stage": "archive",
+        })
+    rebuild_job_index(archive_path)
+
+    pbs_logs = archive_path / "pbs_logs"
+    index_scheduler_logs(archive_path, [pbs_logs / "expt.o123",
+                                        pbs_logs / "expt.e123"])
+
+    index = read_job_index(archive_path)
+    entry = index["0/run/123.gadi-pbs.json"]
+    assert entry["stdout_file"] == str(pbs_logs / "expt.o123")
+    assert entry["stderr_file"] == str(pbs_logs / "expt.e123")
+    assert "stdout_file" not in index["0/run/456.gadi-pbs.json"]
+
+
+def test_lab_job_info(tmp_path, capsys):
+    """Test the latest jobs of all experiments are updated with a single
+    scheduler query"""
+    lab_archive_path = tmp_path / "archive"
+    for expt, job_id in [("expt1", "1.gadi-pbs"), ("expt2", "2.gadi-pbs")]:
+        write_job_file(lab_archive_path / expt, "0.gadi-pbs", 0, {
+            "scheduler_job_id": "0.gadi-pbs",
+            "scheduler_type": "pbs",
+            "payu_current_run": 0,
+            "stage": "archive",
+            "payu_run_status": 0,
+        })
+        write_job_file(lab_archive_path / expt, job_id, 1, {
+            "scheduler_job_id": job_id,
+            "scheduler_type": "pbs",
+            "payu_current_run": 1,
+            "stage": "model-run",
+            "experiment_metadata": {"experiment_uuid": f"{expt}-uuid"},
+        })
+    # Directories without job files are ignored
+    (lab_archive_path / "expt3").mkdir()
+
+    data = build_lab_job_info(lab_archive_path)
+    assert list(data["experiments"]) == ["expt1", "expt2"]
+    expt1 = data["experiments"]["expt1"]
+    assert expt1["experiment_uuid"] == "expt1-uuid"
+    assert list(expt1["runs"]) == [1]
+    assert expt1["runs"][1]["run"][0]["job_id"] == "1.gadi-pbs"
+
+    job_info = {
+        job_id: {"Jobs": {job_id: {"job_state": "R"}}}
+        for job_id in ["1.gadi-pbs", "2.gadi-pbs", "3.other-expt"]
+    }
+    scheduler = Mock()
+    scheduler.get_all_job_info.return_value = job_info
+    all_jobs = update_lab_job_files(data, scheduler)
+    scheduler.get_all_job_info.assert_called_once()
+    assert set(all_jobs) == {"1.gadi-pbs", "2.gadi-pbs"}
+
+    # Job files of both experiments are updated
+    with open(lab_archive_path / "expt2" / "payu_jobs" / "1" / "run"
+              / "2.gadi-pbs.json") as f:
+        assert json.load(f)["scheduler_job_info"] == job_info["2.gadi-pbs"]
+
+    data = build_lab_job_info(lab_archive_path, all_jobs=all_jobs)
+    assert data["experiments"]["expt2"]["runs"][1]["run"][0]["job_state"] == "R"
+
+    display_lab_job_info(data)
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split() == ["Experiment", "Run", "Type", "Job", "ID",
+                                "Stage", "State", "Exit", "Model", "Finish",
+                                "Time"]
+    assert lines[2].split() == ["expt1", "1", "run", "1.gadi-pbs",
+                                "model-run", "R", "-", "-"]
+    assert len(lines) == 4
+
+
 def test_status_cmd_no_metadata(tmp_path):
     """Test error raised when metadata is not setup - rather than
     creating a new uuid"""
@@ -1110,4 +1343,138 @@ def test__sort_run_jobs():
         {"start_time": "2025-06-06T09:00:00"},
         {"job_id": "1", "start_time": "2025-06-01T09:00:00"},
         {"job_id": "3", "start_time": "2025-06-03T09:00:00"},
-    ]
\ No newline at end of file
+    ]
+
+
+def test_update_model_throughput():
+    """Test model years per day is calculated from changes in model time"""
+    throughput = {}
+    run_info = {"job_id": "123.gadi-pbs"}
+    start = datetime.datetime(2026, 1, 1, 0, 0, 0)
+    model_time = cftime.datetime(1900, 1, 1, calendar="noleap")
+
+    assert update_model_throughput(throughput, run_info,
+                                   model_time, start) is None
+
+    # Model time has not changed yet
+    assert update_model_throughput(
+        throughput, run_info, model_time,
+        start + datetime.timedelta(hours=1)
+    ) is None
+
+    # One model year in half a day
+    model_time_1 = cftime.datetime(1901, 1, 1, calendar="noleap")
+    assert update_model_throughput(
+        throughput, run_info, model_time_1,
+        start + datetime.timedelta(hours=12)
+    ) == 2.0
+
+    # Rate is kept while the model time is unchanged
+    assert update_model_throughput(
+        throughput, run_info, model_time_1,
+        start + datetime.timedelta(hours=13)
+    ) == 2.0
+
+    # Throughput is reset for a new job
+    assert update_model_throughput(
+        throughput, {"job_id": "124.gadi-pbs"}, model_time_1,
+        start + datetime.timedelta(hours=14)
+    ) is None
+
+
+def test_watch_job_info(tmp_path, capsys, monkeypatch):
+    """Test watch mode only rebuilds job information when job files change,
+    and only displays changed runs"""
+    archive_path = tmp_path / "archive"
+    for run_number in (0, 1):
+        write_job_file(archive_path, f"{run_number}.gadi-pbs", run_number, {
+            "scheduler_job_id": f"{run_number}.gadi-pbs",
+            "scheduler_type": "pbs",
+            "payu_current_run": run_number,
+            "stage": "model-run" if run_number else "archive",
+        })
+
+    model_times = [cftime.datetime(1900, 1, 1, calendar="noleap")] * 2 + [
+        cftime.datetime(1900, 7, 2, 12, calendar="noleap")
+    ]
+    mock_expt = MagicMock()
+    mock_expt.get_model_cur_expt_time.side_effect = model_times
+    monkeypatch.setattr("payu.status.time.sleep", lambda interval: None)
+
+    with patch("payu.status.build_job_info",
+               wraps=build_job_info) as mock_build:
+        watch_job_info(
+            archive_path=archive_path,
+            control_path=tmp_path / "control",
+            interval=60,
+            all_runs=True,
+            expt=mock_expt,
+            json_output=True,
+            count=3
+        )
+        # Job files are unchanged, so only built once
+        assert mock_build.call_count == 1
+
+    output = [json.loads(line)
+              for line in capsys.readouterr().out.splitlines()]
+    # Unchanged second refresh is not displayed
+    assert len(output) == 2
+    assert list(output[0]["runs"]) == ["0", "1"]
+    assert output[0]["runs"]["1"]["run"][0]["cur_expt_time"] == (
+        "1900-01-01T00:00:00"
+    )
+    assert list(output[1]["runs"]) == ["1"]
+    run_info = output[1]["runs"]["1"]["run"][0]
+    assert run_info["cur_expt_time"] == "1900-07-02T12:00:00"
+    assert "model_years_per_day" in run_info
+
+
+def test_watch_job_info_scheduler_unchanged(tmp_path, monkeypatch):
+    """Test job files are only rewritten when the scheduler information
+    changes, so unchanged runs are not re-read each refresh"""
+    archive_path = tmp_path / "archive"
+    job_file = write_job_file(archive_path, "1.gadi-pbs", 1, {
+        "scheduler_job_id": "1.gadi-pbs",
+        "scheduler_type": "pbs",
+        "payu_current_run": 1,
+        "stage": "model-run",
+    })
+
+    job_info = {"Jobs": {"1.gadi-pbs": {"job_state": "R"}}}
+    mock_scheduler = MagicMock()
+    mock_scheduler.get_all_job_info.return_value = {"1.gadi-pbs": job_info}
+    monkeypatch.setattr("payu.status.time.sleep", lambda interval: None)
+
+    with patch("payu.status.build_job_info",
+               wraps=build_job_info) as mock_build:
+        watch_job_info(
+            archive_path=archive_path,
+            control_path=tmp_path / "control",
+            interval=60,
+            all_runs=True,
+            scheduler=mock_scheduler,
+            json_output=True,
+            count=3
+        )
+        # Rebuilt once after the scheduler information is first written,
+        # and not on later refreshes
+        assert mock_build.call_count == 2
+
+    with open(job_file) as f:
+        assert json.load(f)["scheduler_job_info"] == job_info
+
+
+def test_format_table():
+    """Test columns are aligned to the widest value, with footer rows after
+    a separator"""
+    columns = [("Run", "run_number"), ("SYPD", "sypd")]
+    rows = [{"run_number": 0, "sypd": 10.25}, {"run_number": 1}]
+    footer = [{"run_number": "Median", "sypd": 10.25}]
+    assert format_table(columns, rows, footer_rows=footer).splitlines() == [
+        "Run     SYPD ",
+        "-------------",
+        "0       10.25",
+        "1       -",
+        "-------------",
+        "Median  10.25",
+    ]
@@ -2,6 +2,7 @@ import json
 import os
 import copy
 import shutil
+import subprocess
 
 import pytest
 
@@ -47,7 +48,8 @@ def setup_sync(additional_config, monkeypatch, add_envt_vars=None):
     class used to build/run rsync commands"""
 
     # Clean up all environment variables that may affect sync
-    for var in ['PAYU_CURRENT_RUN', 'PAYU_SYNC_IGNORE_LAST', 'PAYU_SYNC_RESTARTS']:
+    for var in ['PAYU_CURRENT_RUN', 'PAYU_SYNC_IGNORE_LAST', 'PAYU_SYNC_RESTARTS',
+                'PAYU_SYNC_VERIFY']:
         monkeypatch.delenv(var, raising=False)
 
     # Set experiment config
@@ -497,3 +499,567 @@ def test_sync_jobs_file_with_excludes(monkeypatch):
     remote_job_path = os.path.join(remote_archive, 'payu_jobs', job_filename)
     with open(remote_job_path, 'r') as f:
         assert json.load(f) == job_content
+
+
+def test_sync_payu_jobs_local_files(monkeypatch):
+    """Test bookkeeping files of the local archive in payu_jobs are not
+    synced"""
+    payu_jobs_path = expt_archive_dir / 'payu_jobs'
+    job_file = payu_jobs_path / '4' / 'run' / 'test-id.json'
+    local_files = [
+        payu_jobs_path / 'sync_index.json',
+        payu_jobs_path / 'sync_journal.jsonl',
+        payu_jobs_path / 'collate_journals' / 'output000.ocean.json',
+    ]
+    for path in [job_file] + local_files:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('{}')
+
+    remote_archive = tmpdir / 'remote'
+    additional_config = {
+        "sync": {
+            "path": str(remote_archive),
+            "runlog": False,
+            "engine": "local",
+        }
+    }
+    sync = setup_sync(additional_config, monkeypatch,
+                      add_envt_vars={'PAYU_CURRENT_RUN': '4'})
+    sync.run()
+
+    remote_jobs_path = remote_archive / 'payu_jobs'
+    assert (remote_jobs_path / '4' / 'run' / 'test-id.json').is_file()
+    for path in local_files:
+        assert not (remote_jobs_path / path.relative_to(
+            payu_jobs_path)).exists()
+    assert not (remote_jobs_path / 'collate_journals').exists()
+
+
+@pytest.mark.parametrize(
+    "rsync_output, expected_bytes",
+    [
+        ("Number of files: 3\nTotal transferred file size: 1,234,567 bytes\n",
+         1234567),
+        ("Total transferred file size: 42 bytes\n", 42),
+        ("sending incremental file list\n", None),
+    ]
+)
+def test_parse_transferred_bytes(rsync_output, expected_bytes):
+    assert payu.sync.parse_transferred_bytes(rsync_output) == expected_bytes
+
+
+def test_stream_command(capsys):
+    """Test command output is printed as it is produced, and the end of the
+    output is returned"""
+    n_lines = payu.sync.RSYNC_OUTPUT_TAIL_LINES + 10
+    cmd = (f'for i in $(seq {n_lines}); do echo line $i; done; '
+           'echo error >&2; exit 3')
+    result = payu.sync.stream_command(cmd, prefix='[output000] ')
+
+    output = capsys.readouterr().out.splitlines()
+    assert output[0] == '[output000] line 1'
+    assert output[-1] == '[output000] error'
+    assert len(output) == n_lines + 1
+    assert result.returncode == 3
+    lines = result.stdout.splitlines()
+    assert len(lines) == payu.sync.RSYNC_OUTPUT_TAIL_LINES
+    assert lines[-2:] == [f'line {n_lines}', 'error']
+
+
+def test_sync_workers(monkeypatch):
+    """Test rsync commands are run concurrently, and local directories are
+    only removed after their own sync succeeds"""
+    additional_config = {
+        "sync": {
+            "path": str(tmpdir / 'remote'),
+            "runlog": False,
+            "workers": 3,
+            "remove_local_dirs": True,
+        }
+    }
+    sync = setup_sync(additional_config, monkeypatch,
+                      add_envt_vars={'PAYU_CURRENT_RUN': '4'})
+
+    cmds = []
+
+    def mock_run(cmd, **kwargs):
+        cmds.append(cmd)
+        returncode = 23 if 'output001' in cmd else 0
+        return subprocess.CompletedProcess(
+            cmd, returncode,
+            stdout="Total transferred file size: 1,000 bytes\n"
+        )
+
+    monkeypatch.setattr(payu.sync, 'stream_command', mock_run)
+    with pytest.warns(UserWarning, match='Error rsyncing archive'):
+        sync.run()
+
+    assert sync.workers == 3
+    assert all('--stats' in cmd for cmd in cmds)
+
+    # Failed and protected paths are not removed
+    local_archive_dirs = os.listdir(expt_archive_dir)
+    for output in ['output000', 'output002', 'output003']:
+        assert output not in local_archive_dirs
+    assert 'output001' in local_archive_dirs
+    assert 'output004' in local_archive_dirs
+
+    # Results are recorded for every source path
+    assert list(sync.sync_paths) == [p.path for p in sync.source_paths]
+    output001 = sync.sync_paths[os.path.join(expt_archive_dir, 'output001')]
+    assert output001['returncode'] == 23
+    assert output001['transferred_bytes'] == 1000
+    assert output001['duration_seconds'] >= 0
+
+
+def test_get_dir_fingerprint(tmp_path):
+    make_random_file(tmp_path / 'a', 10)
+    (tmp_path / 'sub').mkdir()
+    make_random_file(tmp_path / 'sub' / 'b', 20)
+
+    fingerprint = payu.sync.get_dir_fingerprint(tmp_path)
+    assert fingerprint['nfiles'] == 2
+    assert fingerprint['nbytes'] == 30
+    assert payu.sync.get_dir_fingerprint(tmp_path) == fingerprint
+
+    os.utime(tmp_path / 'sub' / 'b', ns=(0, 0))
+    assert payu.sync.get_dir_fingerprint(tmp_path) != fingerprint
+
+
+def test_sync_index(monkeypatch):
+    """Test unchanged archive directories are skipped on later syncs"""
+    additional_config = {
+        "sync": {
+            "path": str(tmpdir / 'remote'),
+            "runlog": False,
+            "index": True,
+        }
+    }
+    env = {'PAYU_CURRENT_RUN': '4'}
+
+    cmds = []
+
+    def mock_run(cmd, **kwargs):
+        cmds.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, stdout="")
+
+    monkeypatch.setattr(payu.sync, 'stream_command', mock_run)
+
+    sync = setup_sync(additional_config, monkeypatch, add_envt_vars=env)
+    sync.run()
+    assert len(cmds) == 6
+    assert sync.skipped_paths == []
+
+    index_path = expt_archive_dir / 'payu_jobs' / 'sync_index.json'
+    with open(index_path) as f:
+        assert set(json.load(f)['paths']) == {
+            'output000', 'output001', 'output002', 'output003', 'output004'
+        }
+
+    # Only changed directories and always-synced files are synced again
+    make_random_file(expt_archive_dir / 'output002' / 'new-file', 10)
+    cmds.clear()
+    sync = setup_sync(additional_config, monkeypatch, add_envt_vars=env)
+    sync.run()
+    synced = [os.path.basename(cmd.split()[-2]) for cmd in cmds]
+    assert synced == ['output002', 'payu_jobs', 'metadata.yaml']
+    # The index and journal are not synced
+    assert '--exclude /payu_jobs/sync_index.json' in cmds[1]
+    assert '--exclude /payu_jobs/sync_journal.jsonl' in cmds[1]
+    assert len(sync.skipped_paths) == 4
+
+    # Changing sync options syncs all directories again
+    additional_config['sync']['exclude'] = '*.tmp'
+    cmds.clear()
+    sync = setup_sync(additional_config, monkeypatch, add_envt_vars=env)
+    sync.run()
+    assert len(cmds) == 7
+
+    # Disabling the index syncs all directories
+    additional_config['sync']['index'] = False
+    cmds.clear()
+    sync = setup_sync(additional_config, monkeypatch, add_envt_vars=env)
+    sync.run()
+    assert len(cmds) == 7
+
+    # The index is not used by default
+    additional_config['sync'].pop('index')
+    cmds.clear()
+    sync = setup_sync(additional_config, monkeypatch, add_envt_vars=env)
+    sync.run()
+    assert len(cmds) == 7
+    assert sync.skipped_paths == []
+
+
+def test_sync_journal_resume(monkeypatch):
+    """Test an interrupted sync is resumed without transferring completed
+    directories again"""
+    additional_config = {
+        "sync": {
+            "path": str(tmpdir / 'remote'),
+            "runlog": False,
+            "index": True,
+            "remove_local_dirs": True,
+        }
+    }
+    env = {'PAYU_CURRENT_RUN': '4'}
+
+    cmds = []
+
+    def mock_run_interrupted(cmd, **kwargs):
+        if 'output003' in cmd:
+            raise KeyboardInterrupt
+        cmds.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, stdout="")
+
+    monkeypatch.setattr(payu.sync, 'stream_command', mock_run_interrupted)
+    sync = setup_sync(additional_config, monkeypatch, add_envt_vars=env)
+    with pytest.raises(KeyboardInterrupt):
+        sync.run()
+
+    journal_path = expt_archive_dir / 'payu_jobs' / 'sync_journal.jsonl'
+    events = payu.sync.SyncJournal(expt_archive_dir).load()
+    assert events[str(expt_archive_dir / 'output000')]['event'] == 'removed'
+    assert events[str(expt_archive_dir / 'output004')]['event'] == 'transferred'
+    assert events[str(expt_archive_dir / 'output003')]['event'] == 'start'
+    assert not (expt_archive_dir / 'payu_jobs' / 'sync_index.json').exists()
+
+    def mock_run(cmd, **kwargs):
+        cmds.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, stdout="")
+
+    monkeypatch.setattr(payu.sync, 'stream_command', mock_run)
+    cmds.clear()
+    sync = setup_sync(additional_config, monkeypatch, add_envt_vars=env)
+    sync.run()
+
+    synced = [os.path.basename(cmd.split()[-2]) for cmd in cmds]
+    assert synced == ['output003', 'payu_jobs', 'metadata.yaml']
+    assert sync.resumed_paths == [str(expt_archive_dir / 'output004')]
+    assert not journal_path.exists()
+
+    # Resumed directories are added to the sync index
+    with open(expt_archive_dir / 'payu_jobs' / 'sync_index.json') as f:
+        assert 'output004' in json.load(f)['paths']
+
+
+def test_sync_journal_compact():
+    """Test the journal is compacted to the last event of each path"""
+    journal = payu.sync.SyncJournal(expt_archive_dir)
+    for _ in range(3):
+        journal.append('start', 'output000')
+        journal.append('failed', 'output000', returncode=23)
+    journal.append('transferred', 'output001')
+    with open(journal.path, 'a') as f:
+        f.write('{"partial": ')
+
+    events = journal.load()
+    assert {path: event['event'] for path, event in events.items()} == {
+        'output000': 'failed',
+        'output001': 'transferred',
+    }
+    with open(journal.path) as f:
+        assert [json.loads(line) for line in f] == list(events.values())
+    assert journal.load() == events
+
+
+def test_sync_batch(monkeypatch):
+    """Test output directories are synced using a single rsync command per
+    protection class"""
+    additional_config = {
+        "sync": {
+            "path": str(tmpdir / 'remote'),
+            "runlog": False,
+            "index": True,
+            "batch": True,
+            "remove_local_dirs": True,
+        }
+    }
+    env = {'PAYU_CURRENT_RUN': '4'}
+
+    cmds = []
+    files_from = {}
+
+    def mock_run(cmd, **kwargs):
+        cmds.append(cmd)
+        for arg in cmd.split():
+            if arg.startswith('--files-from='):
+                with open(arg.removeprefix('--files-from=')) as f:
+                    files_from[cmd] = f.read().split()
+        return subprocess.CompletedProcess(
+            cmd, 0, stdout="Total transferred file size: 1,000 bytes\n"
+        )
+
+    monkeypatch.setattr(payu.sync, 'stream_command', mock_run)
+    sync = setup_sync(additional_config, monkeypatch, add_envt_vars=env)
+    sync.run()
+
+    # Protected and unprotected outputs are batched, followed by metadata
+    assert len(cmds) == 3
+    assert files_from[cmds[0]] == ['output004']
+    assert files_from[cmds[1]] == [
+        'output000', 'output001', 'output002', 'output003'
+    ]
+    assert cmds[1].endswith(f' {expt_archive_dir}/ {tmpdir / "remote"}')
+
+    # Temporary file lists are removed
+    for cmd in files_from:
+        files_from_path = cmd.split('--files-from=')[1].split()[0]
+        assert not os.path.exists(files_from_path)
+
+    assert sync.sync_batches['unprotected']['transferred_bytes'] == 1000
+    assert len(sync.sync_batches['unprotected']['paths']) == 4
+    output000 = str(expt_archive_dir / 'output000')
+    assert sync.sync_paths[output000]['batch'] == 'unprotected'
+
+    # Batched directories are removed locally and added to the sync index
+    local_archive_dirs = os.listdir(expt_archive_dir)
+    assert 'output000' not in local_archive_dirs
+    assert 'output004' in local_archive_dirs
+    with open(expt_archive_dir / 'payu_jobs' / 'sync_index.json') as f:
+        assert set(json.load(f)['paths']) == {'output004'}
+
+
+@pytest.mark.parametrize(
+    "rel_path, patterns, expected",
+    [
+        ('output000/ocean.nc.0000', ['*.nc.*'], True),
+        ('output000/ocean.nc', ['*.nc.*'], False),
+        ('output000/ocean/ocean.nc.0000', ['*.nc.*'], True),
+        ('output000/ocean', ['output000/ocean'], True),
+        ('output001/ocean', ['output000/ocean'], False),
+        ('output000/ocean', [], False),
+    ]
+)
+def test_is_excluded(rel_path, patterns, expected):
+    assert payu.sync.is_excluded(rel_path, patterns) == expected
+
+
+def test_sync_local_engine(monkeypatch):
+    """Test syncing to a local destination without rsync"""
+    remote_dir = tmpdir / 'remote'
+    additional_config = {
+        "sync": {
+            "path": str(remote_dir),
+            "runlog": False,
+            "engine": "local",
+            "exclude": "*.tmp",
+            "remove_local_dirs": True,
+            "local_verify": "md5",
+        }
+    }
+    env = {'PAYU_CURRENT_RUN': '4'}
+
+    make_random_file(expt_archive_dir / 'output004' / 'excluded.tmp', 10)
+    os.symlink('test-output004-file',
+               expt_archive_dir / 'output004' / 'internal-link')
+    os.symlink('/etc/hosts', expt_archive_dir / 'output004' / 'unsafe-link')
+
+    def mock_run(cmd, **kwargs):
+        raise AssertionError(f"Unexpected command: {cmd}")
+
+    monkeypatch.setattr(payu.sync, 'stream_command', mock_run)
+    sync = setup_sync(additional_config, monkeypatch, add_envt_vars=env)
+    sync.run()
+
+    for i in range(5):
+        synced_file = remote_dir / f'output00{i}' / f'test-output00{i}-file'
+        assert synced_file.exists()
+    assert (remote_dir / 'metadata.yaml').exists()
+
+    # Files in the protected output are hardlinked, excluded files and links
+    # outside the synced tree are skipped
+    output004 = expt_archive_dir / 'output004'
+    remote_output004 = remote_dir / 'output004'
+    assert os.path.samefile(output004 / 'test-output004-file',
+                            remote_output004 / 'test-output004-file')
+    assert not (remote_output004 / 'excluded.tmp').exists()
+    assert os.readlink(remote_output004 / 'internal-link') == \
+        'test-output004-file'
+    assert not os.path.lexists(remote_output004 / 'unsafe-link')
+
+    # Unprotected outputs are removed locally
+    local_archive_dirs = os.listdir(expt_archive_dir)
+    assert 'output000' not in local_archive_dirs
+    assert 'output004' in local_archive_dirs
+
+    info = sync.sync_paths[str(output004)]
+    assert info['returncode'] == 0
+    assert info['files']['linked'] == 1
+    assert info['transferred_bytes'] > 0
+
+    # Unchanged files are not transferred again
+    additional_config['sync']['index'] = False
+    sync = setup_sync(additional_config, monkeypatch, add_envt_vars=env)
+    sync.run()
+    info = sync.sync_paths[str(output004)]
+    assert info['transferred_bytes'] == 0
+    assert info['files']['unchanged'] == 2
+
+
+def test_transfer_file_copy(tmp_path):
+    """Test files are copied with their modification times if hardlinks are
+    disabled"""
+    src = tmp_path / 'src'
+    dst = tmp_path / 'dst'
+    make_random_file(src, 100)
+    os.utime(src, ns=(0, 10**9))
+
+    method = payu.sync.transfer_file(str(src), str(dst), hardlinks=False)
+    assert method in ('reflinked', 'copied')
+    assert not os.path.samefile(src, dst)
+    assert dst.read_bytes() == src.read_bytes()
+    assert payu.sync.is_up_to_date(str(src), str(dst))
+    assert payu.sync.verify_file(str(src), str(dst), verify='md5')
+
+
+def test_sync_local_engine_remote_error(monkeypatch):
+    additional_config = {
+        "sync": {
+            "path": str(tmpdir / 'remote'),
+            "url": 'remote.url',
+            "engine": 'local',
+        }
+    }
+    sync = setup_sync(additional_config, monkeypatch)
+    with pytest.raises(errors.PayuConfigError):
+        sync.run()
+
+
+def test_sync_verify(monkeypatch):
+    """Test synced files are verified against manifest and collate mapping
+    md5 hashes"""
+    remote_dir = tmpdir / 'remote'
+    additional_config = {
+        "sync": {
+            "path": str(remote_dir),
+            "runlog": False,
+            "engine": "local",
+            "hardlinks": False,
+        }
+    }
+    env = {
+        'PAYU_CURRENT_RUN': '4',
+        'PAYU_SYNC_RESTARTS': 'True',
+        'PAYU_SYNC_VERIFY': 'True',
+    }
+
+    # Restart manifest of output001 lists files in restart000
+    restart_file = expt_archive_dir / 'restart000' / 'test-restart000-file'
+    manifest_dir = expt_archive_dir / 'output001' / 'manifests'
+    manifest_dir.mkdir()
+    manifest = payu.manifest.PayuManifest(str(manifest_dir / 'restart.yaml'))
+    manifest.add(filepaths=['work/INPUT/test-restart000-file'],
+                 fullpaths=[str(restart_file)], hashfn=['md5'])
+    manifest.dump()
+
+    # Collate mapping of a collated restart file in restart001
+    collated_file = expt_archive_dir / 'restart001' / 'ocean.nc'
+    make_random_file(collated_file, 100)
+    collated_md5 = payu.sync.hash_md5(str(collated_file))
+    job_file = expt_archive_dir / 'payu_jobs' / '1' / 'collate' / 'job.json'
+    job_file.parent.mkdir(parents=True)
+    with open(job_file, 'w') as f:
+        json.dump({'collate_mapping': {
+            'restart001': {collated_md5: ['tile-hash']}
+        }}, f)
+
+    sync = setup_sync(additional_config, monkeypatch, add_envt_vars=env)
+    sync.run()
+    assert sync.verification == {'checked_files': 2, 'mismatches': []}
+
+    # Modified and missing files are reported
+    make_random_file(remote_dir / 'restart000' / 'test-restart000-file', 10)
+    os.remove(remote_dir / 'restart001' / 'ocean.nc')
+    with pytest.warns(UserWarning, match='2 mismatched or missing files'):
+        verification = sync.verify_destination()
+
+    mismatches = verification['mismatches']
+    assert mismatches[0]['path'] == 'restart000/test-restart000-file'
+    assert mismatches[0]['status'] == 'mismatch'
+    assert mismatches[0]['source'] == 'output001/manifests/restart.yaml'
+    assert mismatches[1] == {
+        'path': 'restart001',
+        'status': 'collated_file_not_found',
+        'expected_md5': collated_md5,
+        'md5': None,
+        'source': 'collate_mapping',
+    }
+
+
+def test_sync_verify_collated_restart_tiles(monkeypatch):
+    """Test restart tiles in a manifest that were collated and removed, or
+    removed from the local archive, are not reported as missing"""
+    remote_dir = tmpdir / 'remote'
+    additional_config = {
+        "sync": {
+            "path": str(remote_dir),
+            "runlog": False,
+            "engine": "local",
+            "hardlinks": False,
+        }
+    }
+    env = {
+        'PAYU_CURRENT_RUN': '4',
+        'PAYU_SYNC_RESTARTS': 'True',
+        'PAYU_SYNC_VERIFY': 'True',
+    }
+
+    # Restart manifest of output001 lists the uncollated tiles in restart000
+    restart_dir = expt_archive_dir / 'restart000'
+    tiles = ['ocean.res.nc.0000', 'ocean.res.nc.0001']
+    removed_file = 'removed-restart-file'
+    for fname in tiles + [removed_file]:
+        make_random_file(restart_dir / fname, 10)
+    manifest_dir = expt_archive_dir / 'output001' / 'manifests'
+    manifest_dir.mkdir()
+    manifest = payu.manifest.PayuManifest(str(manifest_dir / 'restart.yaml'))
+    fnames = tiles + [removed_file]
+    manifest.add(filepaths=[f'work/INPUT/{fname}' for fname in fnames],
+                 fullpaths=[str(restart_dir / fname) for fname in fnames],
+                 hashfn=['md5'])
+    manifest.dump()
+    tile_md5s = [payu.sync.hash_md5(str(restart_dir / tile))
+                 for tile in tiles]
+
+    # Tiles are collated and removed by the collate job
+    collated_file = restart_dir / 'ocean.res.nc'
+    make_random_file(collated_file, 100)
+    collated_md5 = payu.sync.hash_md5(str(collated_file))
+    for fname in tiles + [removed_file]:
+        os.remove(restart_dir / fname)
+    job_file = expt_archive_dir / 'payu_jobs' / '1' / 'collate' / 'job.json'
+    job_file.parent.mkdir(parents=True)
+    with open(job_file, 'w') as f:
+        json.dump({'collate_mapping': {
+            'restart000': {collated_md5: tile_md5s}
+        }}, f)
+
+    sync = setup_sync(additional_config, monkeypatch, add_envt_vars=env)
+    sync.run()
+    assert sync.verification == {'checked_files': 2, 'mismatches': []}
+
+
+def test_sync_job_file_io_stats(monkeypatch):
+    """Test the I/O of the sync stage is recorded in the sync job file"""
+    additional_config = {
+        "sync": {
+            "path": str(tmpdir / 'remote'),
+            "runlog": False,
+            "engine": "local",
+        }
+    }
+    setup_sync(additional_config, monkeypatch,
+               add_envt_vars={'PAYU_CURRENT_RUN': '4'})
+    with cd(ctrldir):
+        lab = payu.laboratory.Laboratory(lab_path=str(labdir))
+        expt = payu.experiment.Experiment(lab, reproduce=False)
+        expt.sync()
+
+    with open(expt.get_job_file(type='sync'), 'r') as f:
+        job_info = json.load(f)
+    assert job_info['io_stats']['sync'] == expt.io_stats['sync']
+    assert job_info['io_stats']['sync']['dir_listings'] > 0
+    assert 'child_bytes_written' in job_info['io_stats']['sync']
+    # The sync stage duration is recorded with the I/O
+    assert 'payu_sync_duration_seconds' in job_info['timings']
@@ -1,7 +1,9 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import json
 import os
 from pathlib import Path
+import threading
 from unittest.mock import patch, Mock
 from freezegun import freeze_time
 
@@ -21,9 +23,19 @@ from payu.telemetry import (
     setup_run_job_file,
     update_run_job_file,
     update_job_file,
+    remove_job_file,
+    read_job_index,
+    rebuild_job_index,
+    JOB_INDEX_COMPACT_MIN_LINES,
+    get_run_metrics,
+    format_openmetrics,
+    flush_telemetry_spool,
+    get_telemetry_spool_path,
+    send_spooled_telemetry,
     Timeout
 )
 from payu.fsops import movetree
+from payu.trace import Tracer
 
 TELEMETRY_1_0_0_SCHEMA_PATH = (
     Path(__file__).parent / "resources" / "schema" / "telemetry" / "1-0-0.json"
@@ -110,6 +122,35 @@ def mock_telemetry_get_external_config():
         yield mock
 
 
+@pytest.fixture
+def telemetry_server():
+    """Local HTTP stand-in for the telemetry service. Set the server's
+    status_code attribute to change the response to posts"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            self.server.requests.append({
+                "headers": dict(self.headers),
+                "data": json.loads(body),
+            })
+            self.send_response(self.server.status_code)
+            self.end_headers()
+            self.wfile.write(b'{}')
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.requests = []
+    server.status_code = 200
+    server.url = f"http://127.0.0.1:{server.server_port}/telemetry"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
 @pytest.fixture
 def config_path(tmp_path):
     """Returns the path to the telemetry config file"""
@@ -276,6 +317,141 @@ def test_transform_model_datetime_warning():
     assert result == {}
 
 
+def test_get_run_metrics():
+    """Test SYPD, core-hours per simulated year and queue wait fraction are
+    calculated from the job file data"""
+    data = {
+        "scheduler_job_id": "123.gadi-pbs",
+        "scheduler_job_info": {
+            "Jobs": {
+                "123.gadi-pbs": {
+                    "Resource_List": {"ncpus": 48},
+                    "qtime": "Wed Jan  1 00:00:00 2025",
+                    "stime": "Wed Jan  1 01:00:00 2025",
+                }
+            }
+        },
+        "model_start_time": "1900-01-01T00:00:00",
+        "model_finish_time": "1902-01-01T00:00:00",
+        "model_calendar": "noleap",
+        "timings": {
+            "payu_model_run_duration_seconds": 43200,
+            "payu_total_duration_seconds": 10800,
+        },
+    }
+    assert get_run_metrics(data) == {
+        "simulated_years": 2.0,
+        "sypd": 4.0,
+        "ncpus": 48,
+        "core_hours_per_simulated_year": 288.0,
+        "queue_wait_seconds": 3600.0,
+        "queue_wait_fraction": 0.25,
+    }
+
+    # Metrics are skipped if information is not available
+    assert get_run_metrics({"timings": data["timings"]}) == {}
+
+    # Number of CPUs falls back to the payu configuration
+    del data["scheduler_job_info"]
+    data["payu_config"] = {"ncpus": 24}
+    metrics = get_run_metrics(data)
+    assert metrics["core_hours_per_simulated_year"] == 144.0
+    assert "queue_wait_fraction" not in metrics
+
+
+def test_record_run_trace(tmp_path, mock_scheduler):
+    """Test the trace of the run is written next to the job file"""
+    file_path = tmp_path / "archive" / "payu_jobs" / "0" / "run" / "1.json"
+    tracer = Tracer()
+    with tracer.span("setup"):
+        pass
+
+    record_run(
+        timings={'payu_start_time': datetime(2025, 1, 1)},
+        scheduler=mock_scheduler,
+        status=0,
+        config={},
+        file_path=file_path,
+        archive_path=tmp_path / "archive",
+        tracer=tracer,
+    )
+
+    trace_path = file_path.with_suffix(".trace")
+    with open(file_path) as f:
+        assert json.load(f)["trace_file"] == str(trace_path)
+    with open(trace_path) as f:
+        events = json.load(f)["traceEvents"]
+    assert [event["name"] for event in events] == ["process_name", "setup"]
+    # Trace files are not read as job files
+    assert list(read_job_index(tmp_path / "archive")) == ["0/run/1.json"]
+
+
+def test_format_openmetrics():
+    """Test run information is formatted as OpenMetrics gauges"""
+    run_info = {
+        "payu_current_run": 3,
+        "payu_run_status": 0,
+        "timings": {
+            "payu_start_time": "2025-01-01T00:00:00",
+            "payu_setup_duration_seconds": 12.5,
+            "archive_userscript_duration_seconds": 2,
+            "payu_check_manifests_duration_seconds": 2.0,
+        },
+        "run_metrics": {"sypd": 4.0},
+        "output_volume_gb": 1.5,
+        "manifests": {
+            "input": {"a": {}, "b": {}, "c": {}},
+            "exe": {"d": {}},
+        },
+    }
+    text = format_openmetrics(run_info, 'expt-"1"')
+    lines = text.splitlines()
+    label = 'experiment="expt-\\"1\\""'
+
+    assert lines[:3] == [
+        "# TYPE payu_stage_duration_seconds gauge",
+        "# UNIT payu_stage_duration_seconds seconds",
+        "# HELP payu_stage_duration_seconds Duration of a stage of the "
+        "payu run",
+    ]
+    assert (f'payu_stage_duration_seconds{{{label},stage="setup"}} 12.5'
+            in lines)
+    assert (f'payu_stage_duration_seconds{{{label},'
+            'stage="archive_userscript"} 2.0' in lines)
+    assert f"payu_sypd{{{label}}} 4.0" in lines
+    assert (f'payu_archive_volume_bytes{{{label},volume="output"}} '
+            f'{1.5 * 2**30}' in lines)
+    assert f'payu_manifest_files{{{label},manifest="input"}} 3.0' in lines
+    assert f"payu_manifest_hash_files_per_second{{{label}}} 2.0" in lines
+    assert f"payu_run_number{{{label}}} 3.0" in lines
+    # Metrics without values are skipped
+    assert "payu_core_hours_per_simulated_year" not in text
+    assert lines[-1] == "# EOF"
+
+
+def test_record_run_openmetrics_textfile(tmp_path, mock_scheduler):
+    """Test the OpenMetrics textfile is written if configured"""
+    archive_path = tmp_path / "archive" / "my-expt"
+    file_path = archive_path / "payu_jobs" / "0" / "run" / "1.json"
+    textfile_dir = tmp_path / "textfile_collector"
+    textfile_dir.mkdir()
+    config = {"telemetry": {"openmetrics_textfile": str(textfile_dir)}}
+
+    record_run(
+        timings={'payu_start_time': datetime(2025, 1, 1)},
+        scheduler=mock_scheduler,
+        status=0,
+        config=config,
+        file_path=file_path,
+        archive_path=archive_path,
+    )
+
+    text = (textfile_dir / "my-expt.prom").read_text()
+    assert 'payu_run_status{experiment="my-expt"} 0.0' in text
+    assert 'stage="total"' in text
+    assert list(textfile_dir.iterdir()) == [textfile_dir / "my-expt.prom"]
+
+
 def test_telemetry_not_enabled_no_environment_config(
             tmp_path,
             mock_telemetry_get_external_config,
@@ -476,6 +652,64 @@ def test_update_run_job_file(tmp_path, mock_manifests):
     assert run_info['model_calendar'] == "julian"
 
 
+def test_job_index(tmp_path, mock_scheduler, mock_metadata):
+    """Test job file updates and removals are recorded in the job index"""
+    archive_path = tmp_path / "archive"
+    payu_jobs = archive_path / "payu_jobs"
+
+    # Job files written before the index exists are added when it's built
+    old_file = payu_jobs / "0" / "run" / "old-id.json"
+    old_file.parent.mkdir(parents=True)
+    with open(old_file, 'w') as f:
+        json.dump({"payu_current_run": 0, "stage": "archive",
+                   "payu_run_status": 0}, f)
+
+    write_queued_job_file(
+        archive_path=archive_path,
+        job_id="test-id",
+        type="run",
+        scheduler=mock_scheduler,
+        metadata=mock_metadata,
+        current_run=1
+    )
+    index = read_job_index(archive_path)
+    assert set(index) == {"0/run/old-id.json", "1/run/test-id.json"}
+    assert index["0/run/old-id.json"]["exit_status"] == 0
+    entry = index["1/run/test-id.json"]
+    assert entry["stage"] == "queued"
+    assert entry["run_number"] == 1
+    assert entry["type"] == "run"
+    assert entry["job_id"] == "test-id"
+    assert entry["experiment_uuid"] == "test-uuid"
+
+    # Updates are appended, and the latest entry is used
+    job_file = payu_jobs / "1" / "run" / "test-id.json"
+    update_job_file(file_path=job_file, data={"stage": "model-run"})
+    index = read_job_index(archive_path)
+    assert index["1/run/test-id.json"]["stage"] == "model-run"
+    assert (index["1/run/test-id.json"]["mtime_ns"]
+            == job_file.stat().st_mtime_ns)
+
+    remove_job_file(job_file)
+    assert set(read_job_index(archive_path)) == {"0/run/old-id.json"}
+
+    # Rebuilding the index compacts it to one entry per job file
+    index_path = payu_jobs / "job_index.jsonl"
+    assert len(index_path.read_text().splitlines()) == 4
+    assert set(rebuild_job_index(archive_path)) == {"0/run/old-id.json"}
+    assert len(index_path.read_text().splitlines()) == 1
+
+    # Reading an index with many more entries than job files compacts it
+    for _ in range(JOB_INDEX_COMPACT_MIN_LINES):
+        update_job_file(file_path=old_file, data={"stage": "archive"})
+    assert (len(index_path.read_text().splitlines())
+            == JOB_INDEX_COMPACT_MIN_LINES + 1)
+    index = read_job_index(archive_path)
+    assert set(index) == {"0/run/old-id.json"}
+    assert index["0/run/old-id.json"]["mtime_ns"] == old_file.stat().st_mtime_ns
+    assert len(index_path.read_text().splitlines()) == 1
+
+
 @freeze_time("2026-03-04 09:01:02")
 def test_update_job_file_timeout(tmp_path):
     """Test when job file is locked, the updated info is written to a temporary file 
@@ -666,3 +900,140 @@ def test_post_telemetry_data(tmp_path, proxy_url, expected_proxies):
                 "telemetry": {"key": "value"}
             }
         )
+
+
+def post_to_server(server, tmp_path, run_id):
+    """Post telemetry of a run to the local telemetry service"""
+    archive_path = tmp_path / "archive"
+    return post_telemetry_data(
+        url=server.url,
+        token="test-token",
+        data={"payu_run_id": run_id},
+        service_name="payu",
+        archive_path=archive_path,
+        job_file_path=tmp_path / f"{run_id}.json",
+        spool_path=get_telemetry_spool_path(archive_path),
+    )
+
+
+def test_telemetry_spool(tmp_path, config_path, setup_env,
+                         telemetry_server):
+    """Test failed posts are spooled and sent later with backoff"""
+    with open(config_path, 'w') as f:
+        json.dump({
+            "telemetry_url": telemetry_server.url,
+            "telemetry_service_name": "payu",
+            "telemetry_token": "test-token",
+            "hostname": "gadi",
+        }, f)
+    archive_path = tmp_path / "archive"
+    spool_path = get_telemetry_spool_path(archive_path)
+
+    # Service is unavailable, so posts are queued in the spool
+    telemetry_server.status_code = 503
+    with pytest.warns(UserWarning, match="Error sending telemetry"):
+        assert not post_to_server(telemetry_server, tmp_path, "run-1")
+    with pytest.warns(UserWarning, match="Error sending telemetry"):
+        assert not post_to_server(telemetry_server, tmp_path, "run-2")
+    entries = sorted(spool_path.glob("*.json"))
+    assert len(entries) == 2
+    with open(entries[0], 'r') as f:
+        entry = json.load(f)
+    assert entry["attempts"] == 1
+    assert entry["payload"]["telemetry"] == {"payu_run_id": "run-1"}
+    assert "test-token" not in entries[0].read_text()
+
+    # Posts are not retried before their backoff has passed
+    telemetry_server.requests.clear()
+    assert flush_telemetry_spool(archive_path, config={}) == {
+        "sent": 0, "failed": 0, "pending": 2
+    }
+    assert telemetry_server.requests == []
+
+    # When the service is still unavailable, the rest of the batch
+    # is left and the backoff doubles
+    now = datetime.now() + timedelta(minutes=5)
+    assert flush_telemetry_spool(archive_path, config={}, now=now) == {
+        "sent": 0, "failed": 0, "pending": 2
+    }
+    assert len(telemetry_server.requests) == 1
+    with open(entries[0], 'r') as f:
+        entry = json.load(f)
+    assert entry["attempts"] == 2
+    assert (datetime.fromisoformat(entry["next_attempt_time"])
+            == now + timedelta(seconds=120))
+
+    # Telemetry disabled in config.yaml
+    telemetry_server.status_code = 200
+    telemetry_server.requests.clear()
+    now += timedelta(minutes=5)
+    config = {"telemetry": {"enable": False}}
+    assert flush_telemetry_spool(archive_path, config, now=now) is None
+
+    # No posts are sent once the time limit has passed
+    assert flush_telemetry_spool(archive_path, config={}, now=now,
+                                 time_limit=0) == {
+        "sent": 0, "failed": 0, "pending": 2
+    }
+    assert telemetry_server.requests == []
+
+    # Spooled posts are sent oldest first once the service is available
+    assert flush_telemetry_spool(archive_path, config={}, now=now) == {
+        "sent": 2, "failed": 0, "pending": 0
+    }
+    assert [r["data"]["telemetry"]["payu_run_id"]
+            for r in telemetry_server.requests] == ["run-1", "run-2"]
+    assert (telemetry_server.requests[0]["headers"]["Authorization"]
+            == "Token test-token")
+    assert list(spool_path.glob("*.json")) == []
+
+
+def test_telemetry_spool_rejected(tmp_path, telemetry_server):
+    """Test posts rejected by the service are not retried, and a
+    successful post sends any spooled posts"""
+    archive_path = tmp_path / "archive"
+    spool_path = get_telemetry_spool_path(archive_path)
+
+    telemetry_server.status_code = 400
+    with pytest.warns(UserWarning, match="Error sending telemetry"):
+        assert not post_to_server(telemetry_server, tmp_path, "run-1")
+    assert not spool_path.exists()
+
+    # Offline posts are spooled
+    offline_server = Mock(url="http://127.0.0.1:1/telemetry")
+    with pytest.warns(UserWarning, match="Error sending telemetry"):
+        assert not post_to_server(offline_server, tmp_path, "run-2")
+    entry_path, = spool_path.glob("*.json")
+    with open(entry_path, 'r') as f:
+        entry = json.load(f)
+    entry["next_attempt_time"] = datetime.now().isoformat()
+    with open(entry_path, 'w') as f:
+        json.dump(entry, f)
+
+    # A spooled post that is rejected when retried is marked as failed
+    with pytest.warns(UserWarning, match="Error sending telemetry"):
+        counts = send_spooled_telemetry(
+            spool_path=spool_path,
+            url=telemetry_server.url,
+            token="test-token",
+            archive_path=archive_path,
+        )
+    assert counts == {"sent": 0, "failed": 1, "pending": 0}
+    assert list(spool_path.glob("*.json")) == []
+    assert entry_path.with_suffix(".failed").exists()
+
+    # Spooled posts are sent after a successful post
+    with pytest.warns(UserWarning, match="Error sending telemetry"):
+        assert not post_to_server(offline_server, tmp_path, "run-4")
+    entry_path, = spool_path.glob("*.json")
+    with open(entry_path, 'r') as f:
+        entry = json.load(f)
+    entry["next_attempt_time"] = datetime.now().isoformat()
+    with open(entry_path, 'w') as f:
+        json.dump(entry, f)
+    telemetry_server.status_code = 200
+    telemetry_server.requests.clear()
+    assert post_to_server(telemetry_server, tmp_path, "run-3")
+    assert [r["data"]["telemetry"]["payu_run_id"]
+            for r in telemetry_server.requests] == ["run-3", "run-4"]
+    assert list(spool_path.glob("*.json")) == []
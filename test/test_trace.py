@@ -0,0 +1,81 @@
+import json
+import threading
+
+from payu.trace import Tracer, traced, get_trace_file_path
+
+
+def test_tracer_nested_spans(tmp_path):
+    """Test nested spans are recorded as Chrome trace complete events"""
+    tracer = Tracer()
+    with tracer.span("archive"):
+        with tracer.span("movetree", n_files=3):
+            pass
+        with tracer.span("um.archive", category="model"):
+            pass
+
+    data = tracer.to_dict()
+    metadata, *events = data["traceEvents"]
+    assert metadata["ph"] == "M"
+    assert metadata["args"] == {"name": "payu"}
+    assert [event["name"] for event in events] == [
+        "archive", "movetree", "um.archive"
+    ]
+    archive, movetree, model_archive = events
+    assert all(event["ph"] == "X" for event in events)
+    assert all(event["tid"] == threading.get_native_id() for event in events)
+    assert movetree["args"] == {"n_files": 3}
+    assert model_archive["cat"] == "model"
+
+    # Nested spans are within the enclosing span
+    for event in (movetree, model_archive):
+        assert event["ts"] >= archive["ts"]
+        assert (event["ts"] + event["dur"]
+                <= archive["ts"] + archive["dur"])
+
+    trace_path = tmp_path / "payu_jobs" / "0" / "run" / "1.gadi-pbs.trace"
+    tracer.write(trace_path)
+    with open(trace_path) as f:
+        assert json.load(f) == json.loads(json.dumps(data))
+
+
+def test_tracer_span_exception():
+    """Test spans are recorded if the traced block raises an error"""
+    tracer = Tracer()
+    try:
+        with tracer.span("setup"):
+            raise ValueError("Setup failed")
+    except ValueError:
+        pass
+    assert [event["name"] for event in tracer.events] == ["setup"]
+
+
+def test_traced():
+    """Test the traced decorator uses the tracer attribute of the object"""
+    class Expt:
+        def __init__(self, tracer):
+            self.tracer = tracer
+
+        @traced()
+        def setup_modules(self):
+            return "result"
+
+        @traced("load")
+        def load_modules(self):
+            return None
+
+    tracer = Tracer()
+    expt = Expt(tracer)
+    assert expt.setup_modules() == "result"
+    expt.load_modules()
+    assert [event["name"] for event in tracer.events] == [
+        "setup_modules", "load"
+    ]
+
+    # Objects without tracers are not traced
+    assert Expt(None).setup_modules() == "result"
+
+
+def test_get_trace_file_path(tmp_path):
+    """Test the trace file is next to the job file"""
+    job_file = tmp_path / "payu_jobs" / "0" / "run" / "1.gadi-pbs.json"
+    assert get_trace_file_path(job_file) == job_file.with_suffix(".trace")